@@ -10,6 +10,8 @@ echo.
 :: Lance le script build.py en utilisant l'exécutable Python par défaut
 :: python build.py
 "C:\Users\gchre\anaconda3\envs\suivi_objectifs_PDE_2024_2034\python.exe" export_static.py
+:: Mode surveillance (reconstruit les pages à chaque enregistrement du classeur) :
+:: python export_watch.py
 
 echo.
 echo ============================================
@@ -1,391 +1,245 @@
-import pandas as pd
-import numpy as np
-from datetime import date
-from shiny import App, Inputs, Outputs, Session, render
-from shiny.types import ImgData
-from shiny.express import ui, input
-
-
-# Configuration du thème personnalisé
-theme_obv = (
-    ui.Theme("shiny")
-    .add_defaults(
-        primary="#0083cb",
-        info="#0aa6b6",
-        success="#c3d700",
-        bg="#ffffff",
-        fg="#000000",
-    )
-)
-
-today = date.today().strftime("%Y-%m-%d")
-
-
-# Chargement et travail des données (Excel + retrait des symboles de % sur les deux colonnes pertinentes)
-df = pd.read_excel("suivi-des-objectifs_OBVFSJ.xlsx", sheet_name=1, header=1)
-df["atteinte_cible_pct"] = df["Pourcentage d'atteinte de la cible"].str.replace('%', '').astype(float)
-df["cible_pct"] = df["Cible en %"].str.replace('%', '').astype(float)
-#df["numero_objectif"] = df["Numéro d'objectif"].astype(str) + " — " + df["Libellé de l'objectif"].astype(str)
-
-# Colonnes importantes du Excel :
-    # Objectif = "numero_objectif"
-    # Échéance = "Échéance"
-    # Cible = "Cible - valeur numérique"
-    # Progression = "Résultat"
-    # Date de mise à jour = "Date du résultat"
-
-# Valeurs possibles "Orientation" :
-    # 1 - Éviter la dégradation de la qualité de l'eau
-    # 2 - Ralentir l'eutrophisation des lacs
-    # 3 - Limiter la prolifération des espèces exotiques envahissantes
-    # 4 - Freiner la perte d'habitat faunique
-    # 5 - Éviter la destruction ou la dégradation de la qualité des milieux humides et hydriques
-
-# Configuration de la page
-ui.page_opts(theme=theme_obv, fillable=True)
+from shiny import reactive, render, req
+from shiny.express import ui, input, session
+from globals import (TAILLE_PAGE, debounce, dependance_theme, index_recherche, objectifs, page_cartes, rendu_orientation,
+                     valeur)
+from rendering import APP_TABS, CARD_CSS, render_orientation_header, render_search_results
+from summary import summary_line
+from theme import entete_page, introduction, style_page, theme_obv
+from profiling import PhaseProfiler
+
+
+# Mesures de démarrage par phase (actives seulement si la variable PDE_PROFILE est définie)
+profiler = PhaseProfiler.from_env()
+
+# Chargement et travail des données : source réactive partagée (globals.py), relue à chaud
+# quand le classeur change. Le premier accès réchauffe le cache dès le démarrage.
+with profiler.phase("load"), reactive.isolate():
+    nb_objectifs = len(objectifs())
+
+
+# État propre à chaque session (ce fichier est réexécuté pour chaque session) :
+# dernière version des cartes et de la moyenne envoyée au navigateur, par orientation,
+# nombre de cartes présentes dans la page (les suivantes sont envoyées au défilement),
+# compteur forçant le re-rendu d'un panneau quand des objectifs sont ajoutés ou retirés,
+# et onglets déjà ouverts (un panneau n'est rendu qu'à la première sélection de son onglet).
+envoye = {}
+affiches = {}
+versions_structure = {orientation: valeur(0, f"versions_structure_{numero}")
+                      for numero, (_, orientation, _) in enumerate(APP_TABS, start=1)}
+onglets_ouverts = {titre: valeur(False, f"onglet_ouvert_{numero}") for numero, (titre, _, _) in enumerate(APP_TABS, start=1)}
+
+
+# Panneau « Recherche » : les critères ne sont lus qu'après une pause de frappe, puis résolus par
+# l'index partagé (globals.py) ; seules les premières correspondances sont rendues.
+DELAI_RECHERCHE = 0.3  # secondes sans frappe avant de lancer la recherche
+LIMITE_RESULTATS = 50
+with reactive.isolate():
+    echeances = objectifs()["Échéance"].dropna()
+bornes_echeance = (echeances.min().date(), echeances.max().date()) if len(echeances) else (None, None)
+
+
+def criteres_recherche():
+    atteinte_min, atteinte_max = input.recherche_atteinte()
+    echeance = input.recherche_echeance()
+    # 100 % en borne supérieure inclut les objectifs dont la cible est dépassée
+    return (input.recherche_texte(), (atteinte_min, atteinte_max if atteinte_max < 100 else float("inf")),
+            None if echeance is None or None in echeance else echeance)
+
+
+criteres = debounce(DELAI_RECHERCHE, criteres_recherche)
+
+
+@reactive.effect
+def marquer_onglet_ouvert():
+    titre = input.tabs()
+    if titre in onglets_ouverts:
+        with reactive.isolate():
+            if not onglets_ouverts[titre]():
+                onglets_ouverts[titre].set(True)
+
+
+def panneau_orientation(numero, titre, orientation, icone):
+    def contenu():
+        req(onglets_ouverts[titre]())
+        versions_structure[orientation]()
+        with reactive.isolate():
+            df = objectifs()
+        cartes, resume = rendu_orientation(df, orientation)
+        moyenne = resume["moyenne_affichee"]
+        envoye[orientation] = (cartes, (moyenne, resume["statut"], summary_line(resume)))
+        affiches[orientation] = min(TAILLE_PAGE, len(cartes))
+        return ui.TagList(
+            ui.HTML(render_orientation_header(numero, icone, moyenne, resume["statut"], summary_line(resume))),
+            # Première page des cartes seulement ; les suivantes sont demandées au défilement (ajout_cartes)
+            ui.HTML(f'<div id="cartes-{numero}">{page_cartes(df, orientation, 0)}</div>'),
+            suite_cartes(numero, len(cartes) - affiches[orientation]),
+        )
+
+    # Identifiant de sortie unique par orientation
+    contenu.__name__ = f"orientation_{numero}"
+    return render.ui(contenu)
+
+
+def suite_cartes(numero, restants):
+    # Bouton « Afficher plus », aussi déclenché automatiquement lorsqu'il approche de l'écran
+    if restants <= 0:
+        return ui.TagList()
+    return ui.HTML(f'''
+        <div class="obj-suite" id="suite-{numero}" data-numero="{numero}">
+          <button type="button" class="btn btn-outline-primary btn-sm">Afficher plus d'objectifs (<span>{restants}</span> restants)</button>
+        </div>
+    ''')
+
+
+@reactive.effect
+@reactive.event(input.cartes_suivantes)
+async def envoyer_cartes_suivantes():
+    numero = int(input.cartes_suivantes()["numero"])
+    _, orientation, _ = APP_TABS[numero - 1]
+    if orientation not in affiches:
+        return
+    with reactive.isolate():
+        df = objectifs()
+    cartes, _ = rendu_orientation(df, orientation)
+    debut = affiches[orientation]
+    html = page_cartes(df, orientation, debut // TAILLE_PAGE) if debut < len(cartes) else ""
+    affiches[orientation] = min(debut + TAILLE_PAGE, len(cartes))
+    await session.send_custom_message("ajout_cartes", {"numero": numero, "html": html,
+                                                       "restants": len(cartes) - affiches[orientation]})
+
+
+# Rechargement à chaud : à chaque nouvelle version du classeur, seules les cartes et moyennes
+# modifiées (diff par "Numéro d'objectif") sont poussées au navigateur.
+@reactive.effect
+async def pousser_mises_a_jour():
+    df = objectifs()
+    changements, moyennes = [], []
+    for numero, (_, orientation, _) in enumerate(APP_TABS, start=1):
+        if orientation not in envoye:
+            continue  # panneau pas encore rendu : il lira directement la version courante
+        ancien, ancienne_synthese = envoye[orientation]
+        nouveau, resume = rendu_orientation(df, orientation)
+        synthese = (resume["moyenne_affichee"], resume["statut"], summary_line(resume))
+        if not nouveau.index.equals(ancien.index):
+            with reactive.isolate():
+                versions_structure[orientation].set(versions_structure[orientation]() + 1)
+            continue
+        # Seules les cartes déjà présentes dans la page ; les suivantes seront rendues à jour
+        n = affiches.get(orientation, 0)
+        modifies = nouveau.iloc[:n][(nouveau.iloc[:n] != ancien.iloc[:n]).any(axis=1)]
+        changements.extend(modifies.reset_index().to_dict("records"))
+        if synthese != ancienne_synthese:
+            moyennes.append({"numero": numero, "moyenne": synthese[0], "statut": synthese[1], "synthese": synthese[2]})
+        envoye[orientation] = (nouveau, synthese)
+    if changements or moyennes:
+        await session.send_custom_message("maj_objectifs", {"objectifs": changements, "moyennes": moyennes})
+
+
+# Configuration de la page (thème compilé une seule fois, voir globals.dependance_theme)
+ui.page_opts(theme=dependance_theme(theme_obv), fillable=True)
 
 # Ajout de CSS personnalisé pour forcer le style des barres de navigation et boutons
 ui.head_content(
-    ui.tags.style(f"""
-        /* Active pill: blue background with white text for contrast */
-        .nav-pills .nav-link.active, .nav-pills .nav-link.active:focus, .nav-pills .nav-link.active:hover {{
-            background-color: #0083cb !important;
-            color: #ffffff !important;
-        }}
-        /* Inactive links keep the brand blue */
-        .nav-pills .nav-link {{ color: #0083cb; }}
-        .nav-link {{ color: #0083cb; }}
-        .card-header {{ background-color: #f8f9fa; border-bottom: 2px solid #0aa6b6; }}
-        .app-header {{ display:flex; align-items:center; gap:12px; margin-bottom: 12px; }}
-        .app-header img {{ height:80px; }}
-        .app-header .meta {{ color:#666; font-size:14px; margin-top:4px; }}
-        .section-header {{ color:#0aa6b6; margin-bottom:0px; font-size:24px; font-weight:bold;}}
-    """)
+    style_page(CARD_CSS),
+    # Réception des mises à jour ciblées (rechargement à chaud du classeur)
+    ui.tags.script("""
+        window.addEventListener("DOMContentLoaded", function () {
+            Shiny.addCustomMessageHandler("maj_objectifs", function (msg) {
+                msg.objectifs.forEach(function (o) {
+                    var carte = document.getElementById("objectif-" + o.cle);
+                    if (!carte) return;
+                    Object.keys(o).forEach(function (champ) {
+                        var el = carte.querySelector(".obj-" + champ);
+                        if (el) el.innerHTML = champ === "val" ? o[champ] + "%" : o[champ];
+                    });
+                    carte.querySelector(".obj-barre").style.width = o.val + "%";
+                });
+                msg.moyennes.forEach(function (m) {
+                    document.getElementById("moyenne-" + m.numero).textContent = m.moyenne;
+                    document.getElementById("statut-" + m.numero).textContent = m.statut;
+                    document.getElementById("synthese-" + m.numero).textContent = m.synthese;
+                });
+            });
+
+            // Cartes suivantes d'une orientation : demandées au clic ou quand le bouton approche de l'écran
+            function demanderSuite(suite) {
+                if (suite.dataset.attente) return;
+                suite.dataset.attente = "1";
+                Shiny.setInputValue("cartes_suivantes", {numero: suite.dataset.numero}, {priority: "event"});
+            }
+            var observateur = new IntersectionObserver(function (entrees) {
+                entrees.forEach(function (e) { if (e.isIntersecting) demanderSuite(e.target); });
+            }, {rootMargin: "600px"});
+            new MutationObserver(function () {
+                document.querySelectorAll(".obj-suite:not([data-observe])").forEach(function (suite) {
+                    suite.dataset.observe = "1";
+                    observateur.observe(suite);
+                });
+            }).observe(document.body, {childList: true, subtree: true});
+            document.addEventListener("click", function (e) {
+                var suite = e.target.closest(".obj-suite");
+                if (suite) demanderSuite(suite);
+            });
+            Shiny.addCustomMessageHandler("ajout_cartes", function (msg) {
+                var suite = document.getElementById("suite-" + msg.numero);
+                document.getElementById("cartes-" + msg.numero).insertAdjacentHTML("beforeend", msg.html);
+                if (!suite) return;
+                delete suite.dataset.attente;
+                if (msg.restants > 0) {
+                    suite.querySelector("span").textContent = msg.restants;
+                    // Nouvelle observation : redemande aussitôt si le bouton est encore visible
+                    observateur.unobserve(suite);
+                    observateur.observe(suite);
+                } else {
+                    suite.remove();
+                }
+            });
+        });
+    """),
 )
 
 # Header avec logo + titre + date
-ui.HTML(f'''
-    <div class="app-header">
-      <div>
-         <h1 style="margin:0">OBVFSJ - Suivi des objectifs du PDE 2024-2034</h1>
-         <div class="meta">Dernière mise à jour : {today}</div>
-      </div>
-      <img src="https://obvfleuvestjean.com/wp-content/uploads/2026/01/LogoOBV_ContourBlanc.png" alt="Logo OBVFSJ">
-    </div>
-''')
+entete_page()
 
 with ui.navset_card_pill(id="tabs"):
     
     ### SECTION 0. INTRODUCTION ###
     with ui.nav_panel("Introduction"):
-        ui.markdown("""
-        ## Démarche de suivi du Plan directeur de l'eau (PDE)
-        Bienvenue sur l'outil de suivi des objectifs du PDE de l'**Organisme de bassin versant du fleuve Saint-Jean** (OBVFSJ).
-        Ce tableau de bord présente l'état d'avancement des **47 objectifs** du PDE 2024-2034 à travers les **5 orientations**.
-        <br><br>
-        """)
-        with ui.value_box(theme="primary", value=None, max_height="250px"):
-            ui.HTML(f'''
-                <div>
-                    <h2 style="margin:0.5em ; color:#ffffff ; text-align:center">Mission de l'OBVFSJ</h2>
-                </div>
-                <div>
-                    <p style="padding-left:15% ; padding-right:15% ; color:#ffffff ; text-align:center"><i>«&nbspDans le bassin versant du fleuve Saint-Jean, le maintien d'écosystèmes intègres, source d'une  excellente qualité d'eau, constitue la base d'un héritage bâti sur de saines relations transfrontalières&nbsp»</i></p>
-                </div>
-            ''')
-
-    ### SECTION 1. QUALITÉ DE L'EAU ###
-    with ui.nav_panel("1. Qualité de l'eau"):
-        df_qualite_eau = df[df["Orientation"] == "1 - Éviter la dégradation de la qualité de l'eau"].copy()
-        df_qualite_eau["atteinte_cible_pct"] = pd.to_numeric(df_qualite_eau["atteinte_cible_pct"], errors="coerce").fillna(0)
-        icone_qualite_eau = "💧🌊"
-        moyenne_qualite_eau = int(df_qualite_eau["atteinte_cible_pct"].mean())
-        
-        ui.HTML(f'''
-            <div class="section-header">
-            <br>
-                <h2><b>{icone_qualite_eau} Moyenne d'atteinte des objectifs pour cette orientation : {moyenne_qualite_eau} %</b></h2>
-            </div>
-        ''')
-        
-        if moyenne_qualite_eau > 70:
-            ui.p("✅ Les objectifs sont en bonne voie d'être atteints.")
-        elif moyenne_qualite_eau > 30:
-            ui.p("⚠️ Des efforts constants sont encore requis.")
-        else:
-            ui.p("🚨 Priorité élevée : phase de planification.")  
-        
-        ui.hr()
-        ui.h4("Progression par objectif :", style="color: #0083cb; margin-bottom: 20px;")
-        
-        for _, row in df_qualite_eau.iterrows():
-            val = int(row["atteinte_cible_pct"])
-            libelle = row["Libellé de l'objectif"]
-            reference = row["Valeur(référence)"]
-            resultat = row["Résultat"]
-            date_resultat = row["Date du résultat"]
-            echeance = row["Échéance"]
-            cible = row["Cible - valeur numérique"]
-            
-            # Conteneur pour un seul objectif
-            with ui.div(style="margin-bottom: 45px; padding: 0 10px;"):
-                
-                # Ligne supérieure : Libellé à gauche, Valeur à droite
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px;"):
-                    ui.span(libelle, style="font-weight: 600; color: #333; font-size: 0.95rem;")
-                    ui.span(f"{val}%", style="font-weight: 600; color: #666; font-size: 0.9rem;")
-
-                # Ligne médiane : Cible, dernier résultat et date du dernier résultat en valeur absolue
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px;color: rgba(0, 0, 0, 0.6);font-size: 0.9em;line-height: 1.2;"):
-                    ui.span(f"Valeur de référence : {reference}")
-                    ui.span(f"Cible : {cible}")
-                    ui.span(f"Valeur au dernier suivi : {resultat}")
-                    ui.span(f"Suivi le : {date_resultat}")
-                    ui.span(f"Échéance : {echeance}")
-                
-                # Ligne inférieure : La barre de progression fine
-                with ui.div(style="width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden;"):
-                    ui.div(style=f"""
-                        width: {val}%; 
-                        background-color: #0aa6b6; 
-                        height: 100%; 
-                        border-radius: 4px;
-                        transition: width 1s ease-in-out;
-                    """)                
-
-    ### SECTION 2. EUTROPHISATION DES LACS ###
-    with ui.nav_panel("2. Eutrophisation des lacs"):
-        df_eutrophisation = df[df["Orientation"] == "2 - Ralentir l'eutrophisation des lacs"].copy()
-        df_eutrophisation["atteinte_cible_pct"] = pd.to_numeric(df_eutrophisation["atteinte_cible_pct"], errors="coerce").fillna(0)
-        icone_eutrophisation = "🦠🏞️"
-        moyenne_eutrophisation = int(df_eutrophisation["atteinte_cible_pct"].mean())
-        
-        ui.HTML(f'''
-            <div class="section-header">
-            <br>
-                <h2><b>{icone_eutrophisation} Moyenne d'atteinte des objectifs pour cette orientation : {moyenne_eutrophisation} %</b></h2>
-            </div>
-        ''')
-        
-        if moyenne_eutrophisation > 70:
-            ui.p("✅ Les objectifs sont en bonne voie d'être atteints.")
-        elif moyenne_eutrophisation > 30:
-            ui.p("⚠️ Des efforts constants sont encore requis.")
-        else:
-            ui.p("🚨 Priorité élevée : phase de planification.")  
-        
-        ui.hr()
-        ui.h4("Progression par objectif :", style="color: #0083cb; margin-bottom: 20px;")
-        
-        for _, row in df_eutrophisation.iterrows():
-            val = int(row["atteinte_cible_pct"])
-            libelle = row["Libellé de l'objectif"]
-            reference = row["Valeur(référence)"]
-            resultat = row["Résultat"]
-            date_resultat = row["Date du résultat"]
-            echeance = row["Échéance"]
-            cible = row["Cible - valeur numérique"]
-            
-            # Conteneur pour un seul objectif
-            with ui.div(style="margin-bottom: 45px; padding: 0 10px;"):
-                
-                # Ligne supérieure : Libellé à gauche, Valeur à droite
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px;"):
-                    ui.span(libelle, style="font-weight: 600; color: #333; font-size: 0.95rem;")
-                    ui.span(f"{val}%", style="font-weight: 600; color: #666; font-size: 0.9rem;")
-
-                # Ligne médiane : Cible, dernier résultat et date du dernier résultat en valeur absolue
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px;color: rgba(0, 0, 0, 0.6);font-size: 0.9em;line-height: 1.2;"):
-                    ui.span(f"Valeur de référence : {reference}")
-                    ui.span(f"Cible : {cible}")
-                    ui.span(f"Valeur au dernier suivi : {resultat}")
-                    ui.span(f"Suivi le : {date_resultat}")
-                    ui.span(f"Échéance : {echeance}")
-                
-                # Ligne inférieure : La barre de progression fine
-                with ui.div(style="width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden;"):
-                    ui.div(style=f"""
-                        width: {val}%; 
-                        background-color: #0aa6b6; 
-                        height: 100%; 
-                        border-radius: 4px;
-                        transition: width 1s ease-in-out;
-                    """)   
-
-    ### SECTION 3. ESPÈCES EXOTIQUES ENVAHISSANTES ###
-    with ui.nav_panel("3. Espèces exotiques envahissantes"):
-        df_EEE = df[df["Orientation"] == "3 - Limiter la prolifération des espèces exotiques envahissantes"].copy()
-        df_EEE["atteinte_cible_pct"] = pd.to_numeric(df_EEE["atteinte_cible_pct"], errors="coerce").fillna(0)
-        icone_EEE = "🌾🦪"
-        moyenne_EEE = int(df_EEE["atteinte_cible_pct"].mean())
-        
-        ui.HTML(f'''
-            <div class="section-header">
-            <br>
-                <h2><b>{icone_EEE} Moyenne d'atteinte des objectifs pour cette orientation : {moyenne_EEE} %</b></h2>
-            </div>
-        ''')
-        
-        if moyenne_EEE > 70:
-            ui.p("✅ Les objectifs sont en bonne voie d'être atteints.")
-        elif moyenne_EEE > 30:
-            ui.p("⚠️ Des efforts constants sont encore requis.")
-        else:
-            ui.p("🚨 Priorité élevée : phase de planification.")  
-        
-        ui.hr()
-        ui.h4("Progression par objectif :", style="color: #0083cb; margin-bottom: 20px;")
-        
-        for _, row in df_EEE.iterrows():
-            val = int(row["atteinte_cible_pct"])
-            libelle = row["Libellé de l'objectif"]
-            reference = row["Valeur(référence)"]
-            resultat = row["Résultat"]
-            date_resultat = row["Date du résultat"]
-            echeance = row["Échéance"]
-            cible = row["Cible - valeur numérique"]
-            
-            # Conteneur pour un seul objectif
-            with ui.div(style="margin-bottom: 45px; padding: 0 10px;"):
-                
-                # Ligne supérieure : Libellé à gauche, Valeur à droite
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px;"):
-                    ui.span(libelle, style="font-weight: 600; color: #333; font-size: 0.95rem;")
-                    ui.span(f"{val}%", style="font-weight: 600; color: #666; font-size: 0.9rem;")
-
-                # Ligne médiane : Cible, dernier résultat et date du dernier résultat en valeur absolue
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px;color: rgba(0, 0, 0, 0.6);font-size: 0.9em;line-height: 1.2;"):
-                    ui.span(f"Valeur de référence : {reference}")
-                    ui.span(f"Cible : {cible}")
-                    ui.span(f"Valeur au dernier suivi : {resultat}")
-                    ui.span(f"Suivi le : {date_resultat}")
-                    ui.span(f"Échéance : {echeance}")
-                
-                # Ligne inférieure : La barre de progression fine
-                with ui.div(style="width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden;"):
-                    ui.div(style=f"""
-                        width: {val}%; 
-                        background-color: #0aa6b6; 
-                        height: 100%; 
-                        border-radius: 4px;
-                        transition: width 1s ease-in-out;
-                    """)  
-
-    ### SECTION 4. HABITATS FAUNIQUES ###
-    with ui.nav_panel("4. Habitats fauniques"):
-        df_habitats_fauniques = df[df["Orientation"] == "4 - Freiner la perte d'habitat faunique"].copy()
-        df_habitats_fauniques["atteinte_cible_pct"] = pd.to_numeric(df_habitats_fauniques["atteinte_cible_pct"], errors="coerce").fillna(0)
-        icone_habitats_fauniques = "🐟🦎"
-        moyenne_habitats_fauniques = int(df_habitats_fauniques["atteinte_cible_pct"].mean())
-        
-        ui.HTML(f'''
-            <div class="section-header">
-            <br>
-                <h2><b>{icone_habitats_fauniques} Moyenne d'atteinte des objectifs pour cette orientation : {moyenne_habitats_fauniques} %</b></h2>
-            </div>
-        ''')
-        
-        if moyenne_habitats_fauniques > 70:
-            ui.p("✅ Les objectifs sont en bonne voie d'être atteints.")
-        elif moyenne_habitats_fauniques > 30:
-            ui.p("⚠️ Des efforts constants sont encore requis.")
-        else:
-            ui.p("🚨 Priorité élevée : phase de planification.")  
-        
-        ui.hr()
-        ui.h4("Progression par objectif :", style="color: #0083cb; margin-bottom: 20px;")
-        
-        for _, row in df_habitats_fauniques.iterrows():
-            val = int(row["atteinte_cible_pct"])
-            libelle = row["Libellé de l'objectif"]
-            reference = row["Valeur(référence)"]
-            resultat = row["Résultat"]
-            date_resultat = row["Date du résultat"]
-            echeance = row["Échéance"]
-            cible = row["Cible - valeur numérique"]
-            
-            # Conteneur pour un seul objectif
-            with ui.div(style="margin-bottom: 45px; padding: 0 10px;"):
-                
-                # Ligne supérieure : Libellé à gauche, Valeur à droite
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px;"):
-                    ui.span(libelle, style="font-weight: 600; color: #333; font-size: 0.95rem;")
-                    ui.span(f"{val}%", style="font-weight: 600; color: #666; font-size: 0.9rem;")
-
-                # Ligne médiane : Cible, dernier résultat et date du dernier résultat en valeur absolue
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px;color: rgba(0, 0, 0, 0.6);font-size: 0.9em;line-height: 1.2;"):
-                    ui.span(f"Valeur de référence : {reference}")
-                    ui.span(f"Cible : {cible}")
-                    ui.span(f"Valeur au dernier suivi : {resultat}")
-                    ui.span(f"Suivi le : {date_resultat}")
-                    ui.span(f"Échéance : {echeance}")
-                
-                # Ligne inférieure : La barre de progression fine
-                with ui.div(style="width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden;"):
-                    ui.div(style=f"""
-                        width: {val}%; 
-                        background-color: #0aa6b6; 
-                        height: 100%; 
-                        border-radius: 4px;
-                        transition: width 1s ease-in-out;
-                    """)  
-
-    ### SECTION 5. MILIEUX HUMIDES ET HYDRIQUES ###
-    with ui.nav_panel("5. Milieux humides et hydriques"):
-        df_MHH = df[df["Orientation"] == "5 - Éviter la destruction ou la dégradation de la qualité des milieux humides et hydriques"].copy()
-        df_MHH["atteinte_cible_pct"] = pd.to_numeric(df_MHH["atteinte_cible_pct"], errors="coerce").fillna(0)
-        icone_MHH = "🌿🦆"
-        moyenne_MHH = int(df_MHH["atteinte_cible_pct"].mean())
-        
-        ui.HTML(f'''
-            <div class="section-header">
-            <br>
-                <h2><b>{icone_MHH} Moyenne d'atteinte des objectifs pour cette orientation : {moyenne_MHH} %</b></h2>
-            </div>
-        ''')
-        
-        if moyenne_MHH > 70:
-            ui.p("✅ Les objectifs sont en bonne voie d'être atteints.")
-        elif moyenne_MHH > 30:
-            ui.p("⚠️ Des efforts constants sont encore requis.")
-        else:
-            ui.p("🚨 Priorité élevée : phase de planification.")  
-        
-        ui.hr()
-        ui.h4("Progression par objectif :", style="color: #0083cb; margin-bottom: 20px;")
-        
-        for _, row in df_MHH.iterrows():
-            val = int(row["atteinte_cible_pct"])
-            libelle = row["Libellé de l'objectif"]
-            reference = row["Valeur(référence)"]
-            resultat = row["Résultat"]
-            date_resultat = row["Date du résultat"]
-            echeance = row["Échéance"]
-            cible = row["Cible - valeur numérique"]
-            
-            # Conteneur pour un seul objectif
-            with ui.div(style="margin-bottom: 45px; padding: 0 10px;"):
-                
-                # Ligne supérieure : Libellé à gauche, Valeur à droite
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px;"):
-                    ui.span(libelle, style="font-weight: 600; color: #333; font-size: 0.95rem;")
-                    ui.span(f"{val}%", style="font-weight: 600; color: #666; font-size: 0.9rem;")
-
-                # Ligne médiane : Cible, dernier résultat et date du dernier résultat en valeur absolue
-                with ui.div(style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px;color: rgba(0, 0, 0, 0.6);font-size: 0.9em;line-height: 1.2;"):
-                    ui.span(f"Valeur de référence : {reference}")
-                    ui.span(f"Cible : {cible}")
-                    ui.span(f"Valeur au dernier suivi : {resultat}")
-                    ui.span(f"Suivi le : {date_resultat}")
-                    ui.span(f"Échéance : {echeance}")
-                
-                # Ligne inférieure : La barre de progression fine
-                with ui.div(style="width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden;"):
-                    ui.div(style=f"""
-                        width: {val}%; 
-                        background-color: #0aa6b6; 
-                        height: 100%; 
-                        border-radius: 4px;
-                        transition: width 1s ease-in-out;
-                    """) 
-
+        introduction(nb_objectifs)
+
+    ### SECTIONS 1 à 5. ORIENTATIONS ###
+    for numero, (titre, orientation, icone) in enumerate(APP_TABS, start=1):
+        with ui.nav_panel(titre):
+            panneau_orientation(numero, titre, orientation, icone)
+
+    ### SECTION 6. RECHERCHE ###
+    with ui.nav_panel("🔎 Recherche"):
+        ui.input_text("recherche_texte", "Mots-clés du libellé de l'objectif", placeholder="ex. : milieux humides", width="100%")
+        with ui.layout_columns():
+            ui.input_slider("recherche_atteinte", "Atteinte de la cible (%)", min=0, max=100, value=(0, 100), step=5)
+            ui.input_date_range("recherche_echeance", "Échéance", start=bornes_echeance[0], end=bornes_echeance[1],
+                                format="yyyy-mm-dd", language="fr", separator="au")
+
+        @render.ui
+        def resultats_recherche():
+            df = objectifs()
+            valeurs = criteres()
+            positions = index_recherche(df).query(*valeurs) if valeurs is not None else None
+            if positions is None:
+                return ui.p("Saisissez un mot-clé ou restreignez l'atteinte ou l'échéance pour trouver des objectifs.",
+                            style="color: rgba(0, 0, 0, 0.6);")
+            compte = f"{len(positions)} objectif(s) trouvé(s)"
+            if len(positions) > LIMITE_RESULTATS:
+                compte += f", {LIMITE_RESULTATS} premiers affichés"
+            return ui.TagList(
+                ui.p(compte, style="color: rgba(0, 0, 0, 0.6);"),
+                ui.HTML(f'''
+                    <table class="table table-sm">
+                      <thead><tr><th>Orientation</th><th>Objectif</th><th style="text-align: right;">Atteinte</th><th>Échéance</th><th>Suivi le</th></tr></thead>
+                      <tbody>{render_search_results(df.iloc[positions[:LIMITE_RESULTATS]])}</tbody>
+                    </table>
+                '''),
+            )
+
+# Affectation nécessaire : en mode Express, une expression seule serait affichée dans la page
+rapport_demarrage = profiler.finish()
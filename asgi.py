@@ -0,0 +1,11 @@
+from pathlib import Path
+
+from shiny.express import wrap_express_app
+
+# Point d'entrée ASGI de app.py pour servir les sessions avec plusieurs workers :
+#   uvicorn asgi:app --workers 4 --port 8000
+# Chaque worker importe globals.py une fois et projette en mémoire (mmap) le même cache Arrow des
+# objectifs (data_loader.py) : les pages des données sont partagées entre workers, et seul le premier
+# worker à démarrer lit le classeur Excel si le cache est absent ou périmé.
+
+app = wrap_express_app(Path(__file__).parent / "app.py")
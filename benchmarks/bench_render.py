@@ -0,0 +1,87 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rendering import STATIC_CARD, render_orientation_cards  # noqa: E402
+
+# Benchmark du rendu des cartes : rendu vectorisé par lot vs. iterrows() + f-string d'origine.
+# Le temps par objectif doit rester constant quand le nombre d'objectifs augmente (mise à l'échelle linéaire).
+
+ORIENTATIONS = [f"{i} - Orientation synthétique {i}" for i in range(1, 6)]
+
+
+def synthetic_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Orientation": rng.choice(ORIENTATIONS, n),
+        "Libellé de l'objectif": [f"D'ici 2034, objectif synthétique n° {i}" for i in range(n)],
+        "Valeur(référence)": rng.integers(0, 50, n),
+        "Cible - valeur numérique": rng.integers(1, 100, n),
+        "Résultat": rng.integers(0, 100, n),
+        "Date du résultat": "2025-11-12",
+        "Échéance": "2034-03-31",
+        "atteinte_cible_pct": rng.uniform(0, 150, n).round(2),
+    })
+
+
+def legacy_render_item(row):
+    # Copie du rendu par ligne d'origine (export_static.render_item)
+    val = int(pd.to_numeric(row.get('atteinte_cible_pct', 0), errors='coerce') or 0)
+    return f"""
+    <div class="card">
+      <div>{row.get("Libellé de l'objectif", '')}</div><div>{val}%</div>
+      <div>{row.get('Valeur(référence)', '')}</div><div>{row.get('Cible - valeur numérique', '')}</div>
+      <div>{row.get('Résultat', '')}</div><div>{row.get('Date du résultat', '')}</div>
+      <div>{row.get('Échéance', '')}</div>
+      <div class="progress" style="width:{val}%;"></div>
+    </div>
+    """
+
+
+def legacy_render(df):
+    body = ''
+    for orientation in ORIENTATIONS:
+        for _, row in df[df['Orientation'] == orientation].iterrows():
+            body += legacy_render_item(row)
+    return body
+
+
+def batch_render(df):
+    return ''.join(render_orientation_cards(df, STATIC_CARD).values())
+
+
+def timed(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rendu HTML des cartes d'objectifs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[47, 1_000, 10_000, 50_000, 100_000, 200_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000, help="taille maximale pour le rendu iterrows d'origine")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'objectifs':>10} {'lot (s)':>10} {'µs/obj':>8} {'iterrows (s)':>13} {'µs/obj':>8}")
+    for n in args.sizes:
+        df = synthetic_frame(n)
+        batch = timed(batch_render, df, args.repeat)
+        line = f"{n:>10} {batch:>10.4f} {batch / n * 1e6:>8.2f}"
+        if n <= args.legacy_max:
+            legacy = timed(legacy_render, df, 1)
+            line += f" {legacy:>13.4f} {legacy / n * 1e6:>8.2f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
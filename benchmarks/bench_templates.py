@@ -0,0 +1,99 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_render import legacy_render_item, synthetic_frame  # noqa: E402
+from rendering import APP_CARD, STATIC_CARD, render_cards  # noqa: E402
+
+try:
+    from htmltools import TagList, div, span
+except ImportError:  # installé avec shiny ; sans lui, la construction ui.span d'origine n'est pas mesurée
+    TagList = None
+
+# Benchmark des gabarits compilés depuis spec.py (rendering.card_template + compile_template) contre les
+# rendus d'origine : f-string par ligne de export_static.render_item et arbre ui.div / ui.span par
+# objectif de app.py, tous deux après iterrows().
+
+
+def legacy_app_card(row):
+    # Copie de la construction d'origine d'une carte dans app.py (ui.div / ui.span imbriqués)
+    val = int(row["atteinte_cible_pct"])
+    return div(
+        div(span(row["Libellé de l'objectif"], style="font-weight: 600; color: #333; font-size: 0.95rem;"),
+            span(f"{val}%", style="font-weight: 600; color: #666; font-size: 0.9rem;"),
+            style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px;"),
+        div(span(f"Valeur de référence : {row['Valeur(référence)']}"),
+            span(f"Cible : {row['Cible - valeur numérique']}"),
+            span(f"Valeur au dernier suivi : {row['Résultat']}"),
+            span(f"Suivi le : {row['Date du résultat']}"),
+            span(f"Échéance : {row['Échéance']}"),
+            style="display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px;color: rgba(0, 0, 0, 0.6);font-size: 0.9em;line-height: 1.2;"),
+        div(div(style=f"""
+                        width: {val}%;
+                        background-color: #0aa6b6;
+                        height: 100%;
+                        border-radius: 4px;
+                        transition: width 1s ease-in-out;
+                    """),
+            style="width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden;"),
+        style="margin-bottom: 45px; padding: 0 10px;",
+    )
+
+
+def legacy_static(df):
+    return ''.join(legacy_render_item(row) for _, row in df.iterrows())
+
+
+def legacy_app(df):
+    return str(TagList(*(legacy_app_card(row) for _, row in df.iterrows())))
+
+
+def compiled_static(df):
+    return render_cards(df, STATIC_CARD)
+
+
+def compiled_app(df):
+    return render_cards(df, APP_CARD)
+
+
+def timed(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des gabarits compilés contre les rendus par ligne d'origine")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000, help="taille maximale pour les rendus par ligne d'origine")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    columns = [('gabarit statique', compiled_static), ('f-string', legacy_static),
+               ('gabarit app', compiled_app), ('ui.span', legacy_app)]
+    print(f"{'objectifs':>10}" + ''.join(f" {name + ' (s)':>20}" for name, _ in columns))
+    for n in args.sizes:
+        df = synthetic_frame(n)
+        df['Date du résultat'] = pd.to_datetime(df['Date du résultat'])
+        df['Échéance'] = pd.to_datetime(df['Échéance'])
+        line = f"{n:>10}"
+        for name, func in columns:
+            legacy = func in (legacy_static, legacy_app)
+            if (legacy and n > args.legacy_max) or (func is legacy_app and TagList is None):
+                line += f" {'–':>20}"
+                continue
+            seconds = timed(func, df, 1 if legacy else args.repeat)
+            line += f" {seconds:>20.4f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Générateur de classeurs synthétiques au format de suivi-des-objectifs_OBVFSJ.xlsx :
+# feuille 0 « Infos sur l'exportation », feuille 1 « Suivi des objectifs (Résultats) »
+# avec une ligne de regroupement fusionnée au-dessus des en-têtes de colonnes.
+
+INFO_SHEET = "Infos sur l'exportation"
+RESULTS_SHEET = "Suivi des objectifs (Résultats)"
+
+ORIENTATIONS = [
+    "1 - Éviter la dégradation de la qualité de l'eau",
+    "2 - Ralentir l'eutrophisation des lacs",
+    "3 - Limiter la prolifération des espèces exotiques envahissantes",
+    "4 - Freiner la perte d'habitat faunique",
+    "5 - Éviter la destruction ou la dégradation de la qualité des milieux humides et hydriques",
+]
+
+# Groupes de colonnes de la première ligne : (libellé, nombre de colonnes)
+COLUMN_GROUPS = [
+    ("Objectifs", 5),
+    ("Caractéristiques de l'objectif", 7),
+    ("Référence", 4),
+    ("Producteur de la donnée du résultat", 5),
+    ("Responsable du suivi", 4),
+    ("Résultat", 4),
+]
+
+COLUMNS = [
+    "Catégorie de problématiques", "Orientation", "Type d'objectif", "Numéro d'objectif", "Libellé de l'objectif",
+    "Indicateur", "Échéance", "Verbe", "Cible en %", "Cible - valeur numérique", "Unité de mesure", "Portée territoriale",
+    "Année(référence)", "Valeur(référence)", "Valeur totale(maximale)*", "Source(référence)",
+    "Source(producteur)", "Fréquence de production", "Méthodologie de production", "Information complémentaire*",
+    "Informations de contact*",
+    "Organisation responsable", "Fréquence de collecte", "Mécanisme de collecte",
+    "Information complémentaire sur le mécanisme de collecte*",
+    "Date du résultat", "Résultat", "Pourcentage d'atteinte de la cible", "Commentaires",
+]
+
+TYPES = ["Acquisition de connaissances", "Sensibilisation", "Conservation"]
+VERBES = ["Réaliser", "Avoir", "Développer", "Mener", "Former"]
+
+
+def orientation_names(n_orientations):
+    names = ORIENTATIONS[:n_orientations]
+    names += [f"{i} - Orientation synthétique {i}" for i in range(len(names) + 1, n_orientations + 1)]
+    return names
+
+
+def objectives_frame(n_objectives, n_orientations=5, snapshot=date(2026, 1, 19), progress=1.0, seed=0):
+    # progress (0 à 1) fait avancer les résultats pour simuler des exportations successives
+    rng = np.random.default_rng(seed)
+    names = orientation_names(n_orientations)
+    orientation_idx = np.sort(rng.integers(0, n_orientations, n_objectives))
+    rank = pd.Series(orientation_idx).groupby(orientation_idx).cumcount().to_numpy() + 1
+    cible = rng.integers(1, 200, n_objectives)
+    reference = (cible * rng.uniform(0, 0.3, n_objectives)).astype(int)
+    resultat = reference + ((cible - reference) * rng.uniform(0, 1.4, n_objectives) * progress).astype(int)
+    atteinte = resultat / cible * 100
+    date_resultat = pd.Timestamp(snapshot) - pd.to_timedelta(rng.integers(0, 90, n_objectives), unit="D")
+    orientations = np.array(names, dtype=object)[orientation_idx]
+
+    return pd.DataFrame({
+        "Catégorie de problématiques": [f"{o.split(' - ')[0]} - Problématique synthétique" for o in orientations],
+        "Orientation": orientations,
+        "Type d'objectif": rng.choice(TYPES, n_objectives),
+        "Numéro d'objectif": [f"{i + 1}.{r}" for i, r in zip(orientation_idx, rank)],
+        "Libellé de l'objectif": [f"D'ici 2034, objectif synthétique n° {i + 1}" for i in range(n_objectives)],
+        "Indicateur": "Indicateur synthétique",
+        "Échéance": "2034-03-31",
+        "Verbe": rng.choice(VERBES, n_objectives),
+        "Cible en %": "100.00%",
+        "Cible - valeur numérique": cible,
+        "Unité de mesure": np.nan,
+        "Portée territoriale": "Ensemble de la zone de gestion",
+        "Année(référence)": 2024,
+        "Valeur(référence)": reference,
+        "Valeur totale(maximale)*": cible,
+        "Source(référence)": "OBVFSJ",
+        "Source(producteur)": "OBVFSJ",
+        "Fréquence de production": "Annuellement",
+        "Méthodologie de production": "Méthodologie synthétique",
+        "Information complémentaire*": np.nan,
+        "Informations de contact*": np.nan,
+        "Organisation responsable": np.nan,
+        "Fréquence de collecte": "Annuellement",
+        "Mécanisme de collecte": "Collecte interne",
+        "Information complémentaire sur le mécanisme de collecte*": np.nan,
+        "Date du résultat": date_resultat.strftime("%Y-%m-%d"),
+        "Résultat": resultat,
+        "Pourcentage d'atteinte de la cible": [f"{v:.2f}%" for v in atteinte],
+        "Commentaires": "Commentaire synthétique",
+    }, columns=COLUMNS)
+
+
+def write_workbook(path, df, organisation="Organisme de bassin versant du fleuve Saint-Jean", snapshot=date(2026, 1, 19)):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    info = pd.DataFrame([
+        ["OBV", organisation],
+        ["Date d’extraction", snapshot.strftime("%d-%m-%Y")],
+        ["Année financière", f"{snapshot.year - 1}-{snapshot.year}" if snapshot.month < 4 else f"{snapshot.year}-{snapshot.year + 1}"],
+    ])
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        info.to_excel(writer, sheet_name=INFO_SHEET, header=False, index=False)
+        df.to_excel(writer, sheet_name=RESULTS_SHEET, startrow=1, index=False)
+        sheet = writer.sheets[RESULTS_SHEET]
+        col = 1
+        for label, width in COLUMN_GROUPS:
+            sheet.cell(row=1, column=col, value=label)
+            sheet.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + width - 1)
+            col += width
+    return path
+
+
+def generate(outdir, n_objectives=47, n_orientations=5, n_snapshots=1, start=date(2026, 1, 19), seed=0):
+    # Un classeur par date d'exportation, espacées d'un mois, avec des résultats croissants
+    paths = []
+    for i in range(n_snapshots):
+        snapshot = start + timedelta(days=30 * i)
+        df = objectives_frame(n_objectives, n_orientations, snapshot, progress=(i + 1) / n_snapshots, seed=seed)
+        name = f"suivi-des-objectifs_synthetique-{n_objectives}-{snapshot:%Y%m%d}.xlsx"
+        paths.append(write_workbook(Path(outdir) / name, df, snapshot=snapshot))
+    return paths
+
+
+def generate_organisations(outdir, n_organisations, n_objectives=47, n_orientations=5, seed=0):
+    # Un classeur par organisation (mode par lots de export_batch.py)
+    paths = []
+    for i in range(n_organisations):
+        df = objectives_frame(n_objectives, n_orientations, progress=(i + 1) / n_organisations, seed=seed + i)
+        name = f"suivi-des-objectifs_OBV{i + 1:02d}.xlsx"
+        paths.append(write_workbook(Path(outdir) / name, df, organisation=f"Organisme de bassin versant synthétique {i + 1}"))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère des classeurs synthétiques de suivi des objectifs")
+    parser.add_argument("--objectives", type=int, default=47)
+    parser.add_argument("--orientations", type=int, default=5)
+    parser.add_argument("--snapshots", type=int, default=1, help="nombre de dates d'exportation successives")
+    parser.add_argument("--organisations", type=int, default=0, help="un classeur par organisation plutôt que par date")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=Path(__file__).parent / "data")
+    args = parser.parse_args()
+    if args.organisations:
+        paths = generate_organisations(args.out, args.organisations, args.objectives, args.orientations, args.seed)
+    else:
+        paths = generate(args.out, args.objectives, args.orientations, args.snapshots, seed=args.seed)
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
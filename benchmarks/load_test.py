@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cache_store import meta_file  # noqa: E402
+from data_loader import CACHE_DIR  # noqa: E402
+from generate_workbook import generate  # noqa: E402
+from spec import ORIENTATION_SPEC  # noqa: E402
+
+# Test de charge local de app.py servi par uvicorn avec plusieurs workers (asgi.py) : N sessions
+# simultanées ouvrent chacune un panneau d'orientation puis demandent la page de cartes suivante.
+# Rapporte la latence (premier panneau, page suivante) et la mémoire de chaque worker : RSS, PSS
+# (pages partagées réparties entre les processus) et part partagée, dont le cache Arrow projeté en mémoire.
+# La mémoire est lue dans /proc (Linux).
+
+
+def worker_pids(parent):
+    # Workers lancés par uvicorn (multiprocessing spawn) ; avec un seul worker, le processus parent sert
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+            cmdline = (stat.parent / "cmdline").read_bytes()
+        except OSError:
+            continue
+        if int(fields[1]) == parent and b"spawn_main" in cmdline:
+            children.append(int(stat.parent.name))
+    return sorted(children) or [parent]
+
+
+def memory(pid):
+    # Mémoire d'un processus en Mo : rss, pss et partagée (smaps_rollup)
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if rest.strip().endswith("kB"):
+            values[key] = int(rest.split()[0]) / 1024
+    return {"rss": values.get("Rss", 0), "pss": values.get("Pss", 0),
+            "shared": values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0)}
+
+
+def wait_ready(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+async def session(port, i, measured, hold):
+    # Une session : ouverture d'un onglet d'orientation, puis page de cartes suivante.
+    # Retourne (latence du panneau, latence de la page suivante ou None) en secondes.
+    orientation = ORIENTATION_SPEC[i % len(ORIENTATION_SPEC)]
+    output = f"orientation_{orientation['numero']}"
+    async with websockets.connect(f"ws://127.0.0.1:{port}/websocket/", max_size=None) as ws:
+        start = time.perf_counter()
+        await ws.send(json.dumps({"method": "init", "data": {
+            "tabs": orientation["titre"], f".clientdata_output_{output}_hidden": False}}))
+        panel = page = None
+        async for raw in ws:
+            message = json.loads(raw)
+            if message.get("errors"):
+                raise RuntimeError(message["errors"])
+            if output in message.get("values", {}):
+                panel = time.perf_counter() - start
+                break
+        start = time.perf_counter()
+        await ws.send(json.dumps({"method": "update", "data": {
+            "cartes_suivantes": {"numero": str(orientation["numero"])}}}))
+        try:
+            async with asyncio.timeout(5):
+                async for raw in ws:
+                    if "ajout_cartes" in json.loads(raw).get("custom", {}):
+                        page = time.perf_counter() - start
+                        break
+        except TimeoutError:
+            pass  # orientation sans page suivante
+        measured.release()
+        await hold.wait()
+        return panel, page
+
+
+async def run_sessions(port, n_sessions, on_all_open):
+    measured = asyncio.Semaphore(0)
+    hold = asyncio.Event()
+    tasks = [asyncio.create_task(session(port, i, measured, hold)) for i in range(n_sessions)]
+    # Mémoire relevée quand toutes les sessions ont fait leurs mesures et sont encore ouvertes
+    for _ in range(n_sessions):
+        await measured.acquire()
+    snapshot = on_all_open()
+    hold.set()
+    return await asyncio.gather(*tasks), snapshot
+
+
+def percentile(values, q):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run(datafile, workers, n_sessions, port, cold, boot_timeout):
+    if cold:
+        # Cache supprimé : tous les workers démarrent en même temps et un seul doit lire le classeur
+        meta = meta_file(datafile, CACHE_DIR)
+        meta.unlink(missing_ok=True)
+    env = dict(os.environ, PDE_DATAFILE=str(datafile))
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(workers),
+                               "--port", str(port), "--log-level", "warning"], cwd=ROOT, env=env)
+    try:
+        start = time.perf_counter()
+        if not wait_ready(port, boot_timeout):
+            raise RuntimeError("le serveur n'a pas répondu à temps")
+        boot = time.perf_counter() - start
+        pids = worker_pids(server.pid)
+        results, mem = asyncio.run(run_sessions(port, n_sessions, lambda: {pid: memory(pid) for pid in pids}))
+    finally:
+        server.terminate()
+        server.wait()
+    panels = [panel for panel, _ in results]
+    pages = [page for _, page in results]
+    return {
+        "workers": workers, "sessions": n_sessions, "boot_s": boot,
+        "panel_p50_s": statistics.median(panels), "panel_p95_s": percentile(panels, 0.95), "panel_max_s": max(panels),
+        "page_p50_s": percentile(pages, 0.5), "page_p95_s": percentile(pages, 0.95),
+        "memory_mb": mem,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de app.py avec plusieurs workers uvicorn")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=20, help="sessions simultanées")
+    parser.add_argument("--objectives", type=int, default=10_000, help="taille du classeur synthétique")
+    parser.add_argument("--datafile", type=Path, help="classeur à servir (au lieu d'un classeur synthétique)")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--cold", action="store_true", help="supprimer le cache avant chaque démarrage")
+    parser.add_argument("--boot-timeout", type=float, default=120)
+    parser.add_argument("--output", type=Path, help="ajoute les résultats (JSON) à ce fichier")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        datafile = args.datafile or generate(data_dir, args.objectives)[0]
+        runs = []
+        for workers in args.workers:
+            result = run(datafile.resolve(), workers, args.sessions, args.port, args.cold, args.boot_timeout)
+            runs.append(result)
+            mem = result["memory_mb"].values()
+            print(f"{workers} worker(s), {args.sessions} sessions : démarrage {result['boot_s']:.2f}s, "
+                  f"panneau p50 {result['panel_p50_s'] * 1000:.0f} ms / p95 {result['panel_p95_s'] * 1000:.0f} ms, "
+                  f"page suivante p50 {result['page_p50_s'] * 1000:.0f} ms / p95 {result['page_p95_s'] * 1000:.0f} ms")
+            for pid, m in result["memory_mb"].items():
+                print(f"    worker {pid} : RSS {m['rss']:.1f} Mo, PSS {m['pss']:.1f} Mo, partagée {m['shared']:.1f} Mo")
+            print(f"    total : RSS {sum(m['rss'] for m in mem):.1f} Mo, PSS {sum(m['pss'] for m in mem):.1f} Mo")
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"datafile": str(datafile), "runs": runs}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
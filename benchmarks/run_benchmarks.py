@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import changes  # noqa: E402
+import data_loader  # noqa: E402
+from cleaning import clean_objectives  # noqa: E402
+import export_static  # noqa: E402
+import forecast  # noqa: E402
+from generate_workbook import generate, objectives_frame  # noqa: E402
+from rendering import APP_CARD, STATIC_CARD, group_by_orientation, render_cards, render_orientation_cards  # noqa: E402
+import snapshots  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+import summary  # noqa: E402
+
+# Benchmarks des phases chargement / nettoyage / agrégation / rendu, sur des classeurs synthétiques.
+# Chaque exécution ajoute une ligne JSON à RESULTS pour suivre les régressions dans le temps.
+
+RESULTS = Path(__file__).parent / "results.jsonl"
+# Copies locales de substitution du logo et des icônes Creative Commons : l'export mesuré publie des
+# fichiers vendorisés sans dépendre du réseau ni du dossier assets/ du dépôt
+STAND_IN_ASSETS = Path(__file__).parent / "assets"
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def orientation_means(df):
+    return df.groupby("Orientation", sort=False, observed=True)["atteinte_cible_pct"].mean()
+
+
+def render_static(df):
+    # Comme export_static : cartes de toutes les orientations formatées en une passe
+    return render_orientation_cards(df, STATIC_CARD)
+
+
+def render_app_cards(df):
+    return {orientation: render_cards(df_o, APP_CARD) for orientation, df_o in group_by_orientation(df).items()}
+
+
+def bench_history(n_objectives, n_orientations, n_snapshots, repeat):
+    # Historique mensuel synthétique (ex. 120 instantanés = 10 ans) : lecture du magasin et requêtes de tendance
+    results = {}
+    raw = previous = None
+    with tempfile.TemporaryDirectory() as store:
+        for i in range(n_snapshots):
+            snapshot = date(2026, 1, 19) + timedelta(days=30 * i)
+            previous, raw = raw, objectives_frame(n_objectives, n_orientations, snapshot, progress=(i + 1) / n_snapshots)
+            snapshots.append_snapshot(clean_objectives(raw)[0], snapshot, store)
+        results["history_load"] = timed(lambda: snapshots.load_history(store), repeat)
+        history = snapshots.load_history(store)
+        results["history_trends"] = timed(lambda: snapshots.trend_table(history), repeat)
+        df = clean_objectives(raw)[0]
+        results["history_sparklines"] = timed(lambda: snapshots.with_trends(df, history), repeat)
+        if n_snapshots > 1:
+            # Différences entre les deux dernières versions : instantanés, puis classeurs nettoyés complets
+            dates = history.index.get_level_values(snapshots.SNAPSHOT).unique().sort_values()
+            before, after = (changes.snapshot_version(history, d) for d in dates[-2:])
+            results["diff_snapshots"] = timed(lambda: changes.diff_versions(before, after), repeat)
+            before = changes.workbook_version(clean_objectives(previous)[0])
+            after = changes.workbook_version(df)
+            results["diff_workbooks"] = timed(lambda: changes.diff_versions(before, after), repeat)
+    return results
+
+
+def render_app_ui(datafile):
+    # Construction complète de l'interface Shiny Express de app.py (exécution du fichier)
+    from shiny.express import wrap_express_app
+    os.environ["PDE_DATAFILE"] = str(datafile)
+    data_loader.DATAFILE = Path(datafile)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        wrap_express_app(ROOT / "app.py")
+    finally:
+        os.chdir(cwd)
+
+
+def bench_workbook(datafile, repeat, with_app):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        results["load_read_excel"] = timed(lambda: data_loader.read_workbook(datafile), 1)
+        cache_dir = tmp / "cache"
+        results["load_cache_cold"] = timed(lambda: data_loader.load_objectives(datafile, cache_dir), 1)
+        results["load_cache_warm"] = timed(lambda: data_loader.load_objectives(datafile, cache_dir), repeat)
+
+        raw = data_loader.read_workbook(datafile)
+        results["clean"] = timed(lambda: clean_objectives(raw), repeat)
+        df = data_loader.load_objectives(datafile, cache_dir)
+        results["forecast"] = timed(lambda: forecast.forecast_table(df), repeat)
+        results["aggregate_means"] = timed(lambda: orientation_means(df), repeat)
+        results["aggregate_summary"] = timed(lambda: summary.orientation_summary(df), repeat)
+        summary.load_summary(df, datafile, cache_dir)
+        results["aggregate_summary_cached"] = timed(lambda: summary.load_summary(df, datafile, cache_dir), repeat)
+        results["search_index_build"] = timed(lambda: SearchIndex(df), repeat)
+        index = SearchIndex(df)
+        results["search_query"] = timed(lambda: index.query("objectif n 12", (30, float("inf"))), repeat)
+        results["render_static_cards"] = timed(lambda: render_static(df), repeat)
+        results["render_app_cards"] = timed(lambda: render_app_cards(df), repeat)
+        results["export_static_full"] = timed(
+            lambda: export_static.main(force=True, datafile=datafile, outdir=tmp / "docs", history=tmp / "historique",
+                                       assets_dir=STAND_IN_ASSETS), 1)
+        if with_app:
+            render_app_ui(datafile)  # premier passage : imports de shiny
+            results["app_ui_build"] = timed(lambda: render_app_ui(datafile), 1)
+    return results, len(df)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks chargement / nettoyage / agrégation / rendu")
+    parser.add_argument("--objectives", type=int, nargs="+", default=[47, 1_000, 10_000])
+    parser.add_argument("--orientations", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--snapshots", type=int, default=120, help="instantanés de l'historique synthétique (0 : ignorer)")
+    parser.add_argument("--no-app", action="store_true", help="ne pas chronométrer la construction de l'UI de app.py")
+    parser.add_argument("--workbook", type=Path, default=data_loader.DATAFILE,
+                        help="classeur réel mesuré en plus des classeurs synthétiques (défaut : %(default)s)")
+    parser.add_argument("--output", type=Path, default=RESULTS)
+    args = parser.parse_args()
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cases": [],
+    }
+    # Classeur réel (47 objectifs) : les coûts fixes par appel y pèsent plus que sur les grands classeurs synthétiques
+    if args.workbook.exists():
+        timings, rows = bench_workbook(args.workbook, args.repeat, not args.no_app)
+        run["cases"].append({"workbook": args.workbook.name, "rows": rows, "workbook_bytes": args.workbook.stat().st_size,
+                             "seconds": timings})
+        print(f"{args.workbook.name} ({rows} objectifs) : " + ", ".join(f"{k}={v:.4f}s" for k, v in timings.items()))
+    with tempfile.TemporaryDirectory() as data_dir:
+        for n in args.objectives:
+            datafile = generate(data_dir, n, args.orientations)[0]
+            timings, rows = bench_workbook(datafile, args.repeat, not args.no_app)
+            if args.snapshots:
+                timings.update(bench_history(n, args.orientations, args.snapshots, args.repeat))
+            run["cases"].append({"objectives": n, "orientations": args.orientations, "rows": rows,
+                                 "snapshots": args.snapshots, "workbook_bytes": datafile.stat().st_size,
+                                 "seconds": timings})
+            print(f"{n:>8} objectifs : " + ", ".join(f"{k}={v:.4f}s" for k, v in timings.items()))
+
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f"Résultats ajoutés à {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,112 @@
+import argparse
+import json
+import shutil
 import subprocess
 import os
-import shutil
 import sys
 from pathlib import Path
 
-def exporter_dashboard():
+from profiling import startup_timing
+from staging import link_missing, stage_directory, swap_directory
+
+
+def taille_dossier(dossier):
+    if not dossier.exists():
+        return 0
+    return sum(f.stat().st_size for f in dossier.rglob("*") if f.is_file())
+
+
+def en_mo(octets):
+    return f"{octets / 1024 / 1024:.2f} Mo"
+
+
+def rapport_tailles(dossier_sortie, avant):
+    # Taille totale du site et part des paquets Pyodide (pandas, numpy, openpyxl...) embarqués
+    apres = taille_dossier(dossier_sortie)
+    paquets = taille_dossier(dossier_sortie / "shinylive" / "pyodide")
+    print(f"Taille de 'docs' : avant {en_mo(avant)} -> après {en_mo(apres)} (paquets Pyodide : {en_mo(paquets)})")
+
+
+def rapport_demarrage(fichier_app, libelle, env=None):
+    # Démarrage de l'application dans un processus neuf (voir profiling.startup_timing)
+    mesure = startup_timing(fichier_app, env)
+    lents = ", ".join(f"{m['module']} {m['seconds']:.2f} s" for m in mesure["imports"][:4])
+    print(f"Démarrage de {fichier_app.name} ({libelle}) : {mesure['total_seconds']:.2f} s "
+          f"(imports {mesure['imports_seconds']:.2f} s, exécution {mesure['execution_seconds']:.2f} s ; "
+          f"imports les plus lents : {lents})")
+    return mesure
+
+
+def version_shiny_shinylive():
+    # Version de Shiny embarquée par Shinylive (pyodide-lock.json de ses ressources, téléchargées au besoin
+    # comme le fait « shinylive export »), ou None si elle ne peut être déterminée
+    try:
+        from shinylive._assets import download_shinylive, pyodide_lock_json_file
+
+        verrou = pyodide_lock_json_file()
+        if not verrou.exists():
+            download_shinylive()
+        return json.loads(verrou.read_text(encoding="utf-8"))["packages"]["shiny"]["version"]
+    except Exception as e:
+        print(f"Version de Shiny de Shinylive inconnue : {e}")
+        return None
+
+
+def precalculer_cache(dossier_app):
+    # Cache préconstruit exporté avec l'application (objectifs, synthèse et thème compilé) : la page Shinylive
+    # démarre sans lire le classeur Excel ni compiler le thème. Le premier démarrage, sur un cache vide, est
+    # mesuré puis sert à le remplir ; le second mesure le démarrage avec le cache préconstruit.
+    import shiny
+    from cache_store import remove_cache
+    from data_loader import PREBUILT_CACHE_DIR, load_objectives
+    from summary import load_summary
+
+    shutil.rmtree(PREBUILT_CACHE_DIR, ignore_errors=True)
+    PREBUILT_CACHE_DIR.mkdir()
+    env = {"PDE_CACHE_DIR": str(PREBUILT_CACHE_DIR)}
+    avant = rapport_demarrage(dossier_app / "app.py", "cache vide", env)
+    load_summary(load_objectives(cache_dir=PREBUILT_CACHE_DIR), cache_dir=PREBUILT_CACHE_DIR)
+    apres = rapport_demarrage(dossier_app / "app.py", "cache préconstruit", env)
+    print(f"Cache préconstruit dans '{PREBUILT_CACHE_DIR.name}' : {en_mo(taille_dossier(PREBUILT_CACHE_DIR))}, "
+          f"démarrage {avant['total_seconds']:.2f} s -> {apres['total_seconds']:.2f} s")
+    # Le thème est compilé avec le Bootstrap de la Shiny locale et sa clé contient la version de Shiny
+    # (globals.dependance_theme) : avec une autre version dans Shinylive, il ne serait jamais relu.
+    # Il n'est alors pas exporté et la page le compile au premier démarrage avec sa propre Shiny.
+    embarquee = version_shiny_shinylive()
+    if embarquee != shiny.__version__:
+        for theme in PREBUILT_CACHE_DIR.glob("theme-*.css"):
+            remove_cache(theme)
+        if embarquee is None:
+            print("Thème non préconstruit : version de Shiny de Shinylive inconnue")
+        else:
+            print(f"Thème non préconstruit : Shiny {shiny.__version__} ici, {embarquee} dans Shinylive "
+                  f"(installer shiny=={embarquee} pour l'inclure au cache)")
+
+
+def exporter_dashboard(leger=False):
     # 1. Chemins des dossiers
     dossier_source = Path(__file__).parent
     dossier_sortie = dossier_source / "docs"
+    dossier_app = dossier_source
+
+    # Mode allégé : le classeur est prétraité en objectifs.json et seule l'application lean/app.py
+    # (sans pandas ni lecteur Excel) est exportée
+    if leger:
+        from data_loader import DATAFILE
+        from payload import PAYLOAD_NAME, write_payload
+        from theme import THEME_CSS, theme_obv
+        dossier_app = dossier_source / "lean"
+        charge = write_payload(dossier_app / PAYLOAD_NAME)
+        # Apparence commune avec app.py (theme.py), exportée avec l'application allégée, et thème compilé ici
+        # une fois pour toutes : la page ne compile pas le Sass au démarrage et n'embarque pas libsass
+        shutil.copy2(dossier_source / "theme.py", dossier_app / "theme.py")
+        (dossier_app / THEME_CSS).write_text(theme_obv.to_css(), encoding="utf-8")
+        print(f"Charge utile {charge.name} : {charge.stat().st_size / 1024:.1f} Ko "
+              f"(classeur Excel : {DATAFILE.stat().st_size / 1024:.1f} Ko)")
+        rapport_demarrage(dossier_app / "app.py", "charge utile JSON")
+    else:
+        precalculer_cache(dossier_app)
+    taille_avant = taille_dossier(dossier_sortie)
 
     # 2. Localiser l'exécutable shinylive
     # On cherche dans le dossier 'Scripts' de votre installation Python
@@ -20,24 +119,33 @@ def exporter_dashboard():
 
     print(f"--- Tentative d'exportation ---")
     
-    # Nettoyage
-    if dossier_sortie.exists():
-        shutil.rmtree(dossier_sortie)
+    # Export dans un dossier de préparation vide, complété par les fichiers actuels de 'docs' que
+    # shinylive ne produit pas (pages de export_static.py...), puis mis d'un coup à la place de 'docs' :
+    # le site servi n'est jamais à moitié écrit pendant l'export (ni vide sous Linux, voir staging.py)
+    dossier_prep = stage_directory(dossier_sortie, keep_existing=False)
 
     try:
         # 3. Exécution avec le chemin complet
         subprocess.run(
-            [str(shinylive_exe), "export", str(dossier_source), str(dossier_sortie)],
+            [str(shinylive_exe), "export", str(dossier_app), str(dossier_prep)],
             check=True,
             shell=True
         )
+        link_missing(dossier_sortie, dossier_prep)
+        swap_directory(dossier_prep, dossier_sortie)
         print(f"\n✅ Succès ! Le dossier 'docs' a été créé à : {dossier_sortie}")
+        rapport_tailles(dossier_sortie, taille_avant)
         
     except Exception as e:
+        shutil.rmtree(dossier_prep, ignore_errors=True)
         print(f"\n❌ Erreur persistante : {e}")
         print("\nAlternative de dernier recours :")
         print(f"Tapez manuellement ceci dans votre terminal VS Code :")
         print(f"python -m shinylive export . docs")
 
 if __name__ == "__main__":
-    exporter_dashboard()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Shinylive du tableau de bord dans 'docs'")
+    parser.add_argument("--lean", action="store_true",
+                        help="exporter la variante allégée lean/app.py alimentée par une charge utile JSON")
+    args = parser.parse_args()
+    exporter_dashboard(leger=args.lean)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# Fichiers du cache colonnaire : métadonnées JSON d'un classeur (empreinte, fichier de données, synthèse,
+# cellules rejetées) et tableaux enregistrés en Parquet, Arrow IPC ou pickle. Utilisé par data_loader.py
+# (objectifs), summary.py (synthèse), snapshots.py (historique) et globals.py (thème compilé).
+
+
+def meta_file(datafile, cache_dir):
+    # Métadonnées du cache d'un classeur (empreinte, fichier des objectifs, synthèse, cellules rejetées)
+    return Path(cache_dir) / f"{Path(datafile).stem}.meta.json"
+
+
+def read_meta(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_meta(path, meta):
+    write_atomic(path, lambda tmp: tmp.write_text(json.dumps(meta), encoding="utf-8"))
+
+
+def write_atomic(path, write):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def write_cache(df, cache_base, shared=False):
+    # Parquet si pyarrow est disponible et que les colonnes sont typées proprement,
+    # sinon pickle (ex. Pyodide sans pyarrow ou colonnes aux types mixtes).
+    # shared : fichier Arrow IPC non compressé au lieu de Parquet, relu par projection en mémoire (mmap)
+    # et partagé entre tous les workers de app.py au lieu d'une copie pandas par processus
+    try:
+        if not shared:
+            parquet = cache_base.with_suffix(".parquet")
+            write_atomic(parquet, lambda tmp: df.to_parquet(tmp, index=False))
+            return parquet
+        import pyarrow as pa
+
+        arrow = cache_base.with_suffix(".arrow")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        def write(tmp):
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        write_atomic(arrow, write)
+        return arrow
+    except (ImportError, ValueError, TypeError):
+        pickle = cache_base.with_suffix(".pkl")
+        write_atomic(pickle, df.to_pickle)
+        return pickle
+
+
+def read_cache(path):
+    if path.suffix == ".arrow":
+        import pyarrow as pa
+
+        # Sans copie : les colonnes numériques et les chaînes (str adossé à Arrow) pointent dans les pages
+        # du fichier projeté, que le système partage entre processus. split_blocks évite la consolidation
+        # des colonnes en blocs (qui recopierait tout) ; la projection reste ouverte tant que le tableau vit.
+        return pa.ipc.open_file(pa.memory_map(str(path))).read_all().to_pandas(split_blocks=True)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def remove_cache(path):
+    # Ancien fichier de cache ; sous Windows, il ne peut être supprimé tant qu'un autre worker le
+    # projette en mémoire : il sera retiré lors d'une prochaine reconstruction
+    try:
+        path.unlink(missing_ok=True)
+    except PermissionError:
+        pass
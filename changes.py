@@ -0,0 +1,169 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_objectives
+from data_loader import objective_keys, read_workbook
+from forecast import FORECAST_COLUMNS
+from snapshots import HISTORY_DIR, KEY, LIBELLE, SNAPSHOT, load_history, snapshot_frame
+
+# Différences entre deux versions des données (deux classeurs ou deux instantanés de l'historique) :
+# chaque ligne est réduite à une empreinte de ses colonnes communes, indexée par clé d'objectif, et les
+# deux versions sont comparées en une seule jointure vectorisée. Les objectifs ajoutés, retirés et
+# modifiés sont rapportés avec les écarts de « Résultat » et d'atteinte de la cible.
+
+# Colonnes dérivées : sparklines (elles changent avec l'historique, pas avec le classeur) et prévisions,
+# qui ne font que suivre les colonnes sources
+COLONNES_IGNOREES = {"tendance", *FORECAST_COLUMNS}
+# Colonnes numériques ajoutées par le nettoyage : comparées seulement en l'absence de leur colonne d'origine
+# (ex. instantanés de l'historique) et rapportées sous le nom de celle-ci
+COLONNES_DERIVEES = {"atteinte_cible_pct": "Pourcentage d'atteinte de la cible", "cible_pct": "Cible en %"}
+STATUTS = ("modifié", "ajouté", "retiré")
+CHANGES_COLUMNS = ["statut", "resultat_avant", "resultat_apres", "delta_resultat", "atteinte_avant", "atteinte_apres",
+                   "delta_atteinte", "colonnes"]
+
+
+def workbook_version(df):
+    # Classeur nettoyé indexé par clé d'objectif (voir data_loader.objective_keys)
+    return df.set_axis(pd.Index(objective_keys(df).to_numpy(), name=KEY))
+
+
+def snapshot_version(history, snapshot):
+    # Instantané de l'historique (snapshots.load_history), indexé par clé d'objectif. Un instantané enregistré
+    # sans libellé n'en a aucun : la colonne est retirée pour ne pas marquer tous les libellés comme modifiés
+    version = history.xs(pd.Timestamp(snapshot), level=SNAPSHOT)
+    return version.drop(columns=LIBELLE) if LIBELLE in version and version[LIBELLE].isna().all() else version
+
+
+def change_labels(ancien, nouveau):
+    # Libellé par clé d'objectif, celui de la nouvelle version d'abord ; les objectifs retirés gardent leur
+    # ancien libellé (absent des instantanés sans libellé : render_change_rows affiche alors la clé)
+    libelles = [version[LIBELLE] for version in (nouveau, ancien) if LIBELLE in version]
+    return libelles[0].combine_first(libelles[1]) if len(libelles) == 2 else (libelles or [pd.Series(dtype=object)])[0]
+
+
+def snapshot_view(df):
+    # Classeur chargé réduit aux colonnes d'un instantané (snapshots.snapshot_frame), pour le comparer à l'historique
+    return snapshot_frame(df).set_index(KEY).drop(columns=SNAPSHOT)
+
+
+def _normalise(s):
+    # Types ramenés à une forme commune, pour que des valeurs égales aient la même empreinte
+    # (ex. entiers d'un classeur, réels du même objectif dans un autre où la colonne a des vides)
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s.astype("float64")
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.as_unit("ns")
+    return s
+
+
+def compared_columns(ancien, nouveau):
+    communes = [col for col in nouveau.columns if col in ancien.columns and col not in COLONNES_IGNOREES]
+    return [col for col in communes if COLONNES_DERIVEES.get(col) not in communes]
+
+
+def column_hashes(df, colonnes):
+    # Empreinte 64 bits de chaque cellule : une ligne par objectif, une colonne par colonne comparée
+    empreintes = np.empty((len(df), len(colonnes)), dtype=np.uint64)
+    for j, col in enumerate(colonnes):
+        empreintes[:, j] = pd.util.hash_pandas_object(_normalise(df[col]), index=False).to_numpy()
+    return empreintes
+
+
+def row_hashes(empreintes):
+    # Empreinte de chaque ligne, combinaison des empreintes de ses cellules
+    return pd.util.hash_pandas_object(pd.DataFrame(empreintes), index=False).to_numpy()
+
+
+def _numeric(df, col):
+    return pd.to_numeric(df[col], errors="coerce").astype("float64").to_numpy() if col in df else np.nan
+
+
+def _changed_columns(avant, apres, colonnes):
+    # Noms des colonnes modifiées (« a, b »), d'après les empreintes des cellules des objectifs modifiés
+    if not len(avant):
+        return np.array([], dtype=object)
+    noms = np.array([COLONNES_DERIVEES.get(col, col) + ", " for col in colonnes], dtype=object)
+    return np.array([texte.removesuffix(", ") for texte in (avant != apres).astype(object).dot(noms)], dtype=object)
+
+
+def diff_versions(ancien, nouveau):
+    # Objectifs ajoutés, retirés ou modifiés entre deux versions indexées par clé d'objectif, dans l'ordre
+    # de la nouvelle feuille (objectifs retirés à la fin). Une ligne par objectif ; colonnes CHANGES_COLUMNS.
+    colonnes = compared_columns(ancien, nouveau)
+    cellules_avant, cellules_apres = column_hashes(ancien, colonnes), column_hashes(nouveau, colonnes)
+    avant = pd.DataFrame({"empreinte": row_hashes(cellules_avant), "rang": np.arange(len(ancien)),
+                          "resultat": _numeric(ancien, "Résultat"), "atteinte": _numeric(ancien, "atteinte_cible_pct")},
+                         index=ancien.index)
+    apres = pd.DataFrame({"empreinte": row_hashes(cellules_apres), "rang": np.arange(len(nouveau)),
+                          "resultat": _numeric(nouveau, "Résultat"), "atteinte": _numeric(nouveau, "atteinte_cible_pct")},
+                         index=nouveau.index)
+    joint = avant.join(apres, how="outer", lsuffix="_avant", rsuffix="_apres", sort=False)
+    present_avant, present_apres = joint["rang_avant"].notna(), joint["rang_apres"].notna()
+    statut = np.select([present_avant & present_apres, present_apres], [STATUTS[0], STATUTS[1]], STATUTS[2])
+    modifie = joint["empreinte_avant"] != joint["empreinte_apres"]
+    joint = joint.assign(statut=statut)[modifie | ~(present_avant & present_apres)]
+    joint = joint.sort_values(["rang_apres", "rang_avant"], na_position="last", kind="stable")
+
+    changes = pd.DataFrame({
+        "statut": joint["statut"],
+        "resultat_avant": joint["resultat_avant"], "resultat_apres": joint["resultat_apres"],
+        "delta_resultat": joint["resultat_apres"] - joint["resultat_avant"],
+        "atteinte_avant": joint["atteinte_avant"], "atteinte_apres": joint["atteinte_apres"],
+        "delta_atteinte": joint["atteinte_apres"] - joint["atteinte_avant"],
+        "colonnes": "",
+    }, index=joint.index)
+    modifies = (changes["statut"] == STATUTS[0]).to_numpy()
+    rangs = joint[["rang_avant", "rang_apres"]].to_numpy()[modifies].astype(np.int64)
+    changes.loc[modifies, "colonnes"] = _changed_columns(cellules_avant[rangs[:, 0]], cellules_apres[rangs[:, 1]], colonnes)
+    changes.index.name = KEY
+    return changes[CHANGES_COLUMNS]
+
+
+def change_counts(changes):
+    # Nombre d'objectifs par statut, dans l'ordre de STATUTS
+    return {statut: int(n) for statut, n in changes["statut"].value_counts().reindex(STATUTS, fill_value=0).items()}
+
+
+def previous_snapshot(history, snapshot):
+    # Dernier instantané de l'historique antérieur à snapshot, ou None
+    dates = history.index.get_level_values(SNAPSHOT).unique()
+    dates = dates[dates < pd.Timestamp(snapshot)]
+    return dates.max() if len(dates) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Objectifs ajoutés, retirés et modifiés entre deux versions des données")
+    parser.add_argument("classeurs", type=Path, nargs="*", help="ancien et nouveau classeurs (sinon : deux instantanés)")
+    parser.add_argument("--historique", type=Path, default=HISTORY_DIR)
+    parser.add_argument("--avant", help="date de l'ancien instantané (défaut : avant-dernier)")
+    parser.add_argument("--apres", help="date du nouvel instantané (défaut : dernier)")
+    args = parser.parse_args()
+
+    if args.classeurs:
+        if len(args.classeurs) != 2:
+            parser.error("deux classeurs attendus : ancien et nouveau")
+        ancien, nouveau = (workbook_version(clean_objectives(read_workbook(classeur))[0]) for classeur in args.classeurs)
+        titre = f"{args.classeurs[0].name} -> {args.classeurs[1].name}"
+    else:
+        history = load_history(args.historique)
+        dates = history.index.get_level_values(SNAPSHOT).unique().sort_values()
+        apres = pd.Timestamp(args.apres) if args.apres else dates[-1]
+        avant = pd.Timestamp(args.avant) if args.avant else previous_snapshot(history, apres)
+        if avant is None:
+            parser.error("l'historique ne contient qu'un instantané")
+        ancien, nouveau = snapshot_version(history, avant), snapshot_version(history, apres)
+        titre = f"instantanés {avant:%Y-%m-%d} -> {apres:%Y-%m-%d}"
+
+    changes = diff_versions(ancien, nouveau)
+    libelles = change_labels(ancien, nouveau)
+    print(f"{titre} : " + ", ".join(f"{n} {statut}(s)" for statut, n in change_counts(changes).items()))
+    for cle, ligne in changes.iterrows():
+        deltas = f"Résultat {ligne['delta_resultat']:+g}, atteinte {ligne['delta_atteinte']:+.0f} pts" if ligne["statut"] == STATUTS[0] else ""
+        print(f"  {ligne['statut']:<8} {cle:<10} {libelles.get(cle, cle)} {deltas} {ligne['colonnes']}".rstrip())
+
+
+if __name__ == "__main__":
+    main()
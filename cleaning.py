@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# Étape unique de nettoyage typé de la feuille des objectifs, appliquée une seule fois lors de la
+# construction du cache (data_loader) puis réutilisée par app.py, export_static.py et le build.
+
+# Colonnes dérivées : (colonne source, colonne nettoyée, type, valeur si la conversion échoue)
+PERCENT_COLUMNS = [
+    ("Pourcentage d'atteinte de la cible", "atteinte_cible_pct", np.float32, 0),
+    ("Cible en %", "cible_pct", np.float32, np.nan),
+]
+DATE_COLUMNS = ["Date du résultat", "Échéance"]
+CATEGORY_COLUMNS = ["Catégorie de problématiques", "Orientation", "Type d'objectif"]
+
+
+def parse_percent(s):
+    # Accepte les textes « 55.00% » / « 55,5 % » comme les cellules déjà numériques :
+    # une cellule numérique au format pourcentage est stockée par Excel en fraction (0.55).
+    if s.dtype.kind in "iufb":
+        return s.astype("float64") * 100
+    is_text = s.str.len().notna()
+    text = s.where(is_text).astype("string")
+    from_text = pd.to_numeric(
+        text.str.replace("%", "", regex=False).str.replace(",", ".", regex=False).str.replace(r"\s", "", regex=True),
+        errors="coerce")
+    from_number = pd.to_numeric(s.where(~is_text), errors="coerce") * 100
+    parsed = pd.Series(from_text.to_numpy(dtype="float64", na_value=np.nan), index=s.index)
+    return parsed.where(is_text, from_number)
+
+
+def parse_dates(s):
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    return pd.to_datetime(s.astype("string").str.strip(), format="ISO8601", errors="coerce")
+
+
+def clean_objectives(df):
+    # Retourne (objectifs nettoyés, rejets) ; rejets liste les cellules non vides non converties
+    df = df.copy()
+    rejects = []
+
+    def record(source, parsed):
+        failed = df[source].notna() & parsed.isna()
+        for idx in df.index[failed]:
+            # Ligne Excel : en-têtes sur la 2e ligne, données à partir de la 3e
+            rejects.append({"ligne": int(idx) + 3, "colonne": source, "valeur": str(df.at[idx, source])})
+
+    for source, target, dtype, fill in PERCENT_COLUMNS:
+        if source not in df:
+            continue
+        parsed = parse_percent(df[source])
+        record(source, parsed)
+        df[target] = parsed.fillna(fill).astype(dtype)
+
+    for col in DATE_COLUMNS:
+        if col in df:
+            parsed = parse_dates(df[col])
+            record(col, parsed)
+            df[col] = parsed
+
+    for col in CATEGORY_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype("category")
+
+    return df, pd.DataFrame(rejects, columns=["ligne", "colonne", "valeur"])
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from cache_store import meta_file, read_cache, read_meta, remove_cache, write_cache, write_meta
+from cleaning import clean_objectives
+from forecast import with_forecast
+
+# Configuration
+ROOT = Path(__file__).parent
+# PDE_DATAFILE permet de pointer vers un autre classeur (ex. classeur synthétique des benchmarks)
+DATAFILE = Path(os.environ.get("PDE_DATAFILE", ROOT / "suivi-des-objectifs_OBVFSJ.xlsx"))
+# Cache préconstruit par build.py : dossier non masqué, donc exporté avec l'application Shinylive, qui lit
+# alors les objectifs sans ouvrir le classeur Excel. Il n'est utilisé que dans le navigateur (Pyodide) :
+# ailleurs, le cache local .cache/ reste celui de l'application, même si cache/ existe après un build.
+# PDE_CACHE_DIR impose un autre dossier de cache (build.py l'utilise pour remplir cache/).
+PREBUILT_CACHE_DIR = ROOT / "cache"
+CACHE_DIR = Path(os.environ.get("PDE_CACHE_DIR")
+                 or (PREBUILT_CACHE_DIR if sys.platform == "emscripten" else ROOT / ".cache"))
+# Incrémenté lorsque le contenu du cache change (ex. nettoyage typé) pour invalider les anciens fichiers
+CACHE_FORMAT = 6
+# Au-delà de ce délai (secondes), le verrou de construction du cache est celui d'un processus arrêté
+VERROU_PERIME = 300
+
+
+# Empreinte du classeur (taille + mtime pour le chemin rapide, sha256 pour le contenu)
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def workbook_fingerprint(datafile=None):
+    # Empreinte bon marché pour le sondage (mtime + taille) ; None si le classeur est absent
+    try:
+        stat = Path(datafile or DATAFILE).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def objective_keys(df):
+    # "Numéro d'objectif" est lu comme un nombre par Excel : 1.1 et 1.10 deviennent tous deux 1.1.
+    # Les doublons reçoivent un suffixe d'occurrence (dans l'ordre de la feuille) pour rester uniques.
+    numero = df["Numéro d'objectif"]
+    numero = numero.astype(object).where(numero.notna(), "").astype(str)
+    rang = numero.groupby(numero, sort=False).cumcount()
+    return numero.where(rang == 0, numero + "#" + (rang + 1).astype(str))
+
+
+def read_workbook(datafile):
+    # Lecture brute de la feuille des résultats, telle que faite historiquement par app.py
+    return pd.read_excel(datafile, sheet_name=1, header=1)
+
+
+def read_export_info(datafile):
+    # Feuille « Infos sur l'exportation » : libellé -> valeur (OBV, Date d’extraction, Année financière)
+    info = pd.read_excel(datafile, sheet_name=0, header=None, nrows=20)
+    if info.shape[1] < 2:
+        return {}
+    return {str(label).strip(): value for label, value in zip(info[0], info[1]) if pd.notna(label)}
+
+
+def read_extraction_date(datafile, info=None):
+    # « Date d’extraction » (JJ-MM-AAAA) ; à défaut, date de modification du fichier
+    info = read_export_info(datafile) if info is None else info
+    for label, value in info.items():
+        if label.startswith("Date d") and "extraction" in label:
+            parsed = pd.to_datetime(value, format="%d-%m-%Y", errors="coerce") if isinstance(value, str) else pd.Timestamp(value)
+            if not pd.isna(parsed):
+                return parsed.normalize()
+    return pd.Timestamp(Path(datafile).stat().st_mtime_ns, unit="ns").normalize()
+
+
+@contextmanager
+def _build_lock(cache_dir, stem):
+    # Verrou inter-processus (fichier créé en exclusif) autour de la lecture du classeur : quand
+    # plusieurs workers démarrent ensemble, un seul lit le Excel et les autres relisent son cache
+    lock = Path(cache_dir) / f".{stem}.lock"
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > VERROU_PERIME:
+                    lock.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.1)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        lock.unlink(missing_ok=True)
+
+
+def _with_version(df, meta):
+    # Version des données (sha256 du classeur), utilisée comme clé par les caches de rendu,
+    # date d'extraction du classeur (date de l'instantané dans l'historique, voir snapshots.py) et organisation
+    df.attrs["version"] = meta["sha256"]
+    df.attrs["extraction"] = meta["extraction"]
+    df.attrs["organisation"] = meta["organisation"]
+    return df
+
+
+def _load_cached(datafile, cache_dir, meta_path):
+    # Objectifs du cache s'il correspond au classeur (empreinte mtime + taille, puis sha256), sinon None
+    meta = read_meta(meta_path)
+    if meta.get("format") != CACHE_FORMAT:
+        return None
+    cached = cache_dir / meta["file"] if meta.get("file") else None
+    if cached is None or not cached.exists():
+        return None
+    stat = datafile.stat()
+    try:
+        if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+            return _with_version(read_cache(cached), meta)
+        if meta.get("sha256") == file_sha256(datafile):
+            # Fichier touché sans modification (ou copié avec l'export Shinylive) : on met seulement l'empreinte à jour
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            write_meta(meta_path, meta)
+            return _with_version(read_cache(cached), meta)
+    except ImportError:
+        return None  # cache Arrow préconstruit illisible sans pyarrow (ex. Pyodide) : le classeur est relu
+    return None
+
+
+def load_objectives(datafile=None, cache_dir=CACHE_DIR):
+    # Charge la feuille des objectifs depuis le cache colonnaire, en ne relisant
+    # le classeur Excel que si son contenu a changé
+    datafile = Path(datafile or DATAFILE)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = meta_file(datafile, cache_dir)
+    df = _load_cached(datafile, cache_dir, meta_path)
+    if df is not None:
+        return df
+
+    with _build_lock(cache_dir, datafile.stem):
+        # Un autre worker a pu construire le cache pendant l'attente du verrou
+        df = _load_cached(datafile, cache_dir, meta_path)
+        if df is not None:
+            return df
+        meta = read_meta(meta_path)
+        previous = cache_dir / meta["file"] if meta.get("file") else None
+        stat = datafile.stat()
+        sha = file_sha256(datafile)
+        # Nettoyage typé fait une seule fois ici : le cache contient déjà les colonnes prêtes à l'emploi
+        # Les deux feuilles sont lues depuis une seule ouverture du classeur
+        with pd.ExcelFile(datafile) as classeur:
+            df, rejects = clean_objectives(read_workbook(classeur))
+            info = read_export_info(classeur)
+        # Prévisions d'atteinte (forecast.py) calculées une fois par version du classeur, avec les données
+        df = with_forecast(df)
+        path = write_cache(df, cache_dir / f"{datafile.stem}-{sha[:16]}", shared=True)
+        if previous is not None and previous != path:
+            remove_cache(previous)
+        meta = {"sha256": sha, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "file": path.name,
+                "format": CACHE_FORMAT, "extraction": read_extraction_date(datafile, info).strftime("%Y-%m-%d"),
+                "organisation": str(info.get("OBV") or datafile.stem),
+                "rejects": rejects.to_dict("records")}
+        write_meta(meta_path, meta)
+    # Relu depuis le fichier écrit : ce processus partage lui aussi les pages du cache
+    return _with_version(read_cache(path), meta)
+
+
+def load_rejects(datafile=None, cache_dir=CACHE_DIR):
+    # Cellules non converties lors du dernier nettoyage (ligne Excel, colonne, valeur brute)
+    meta = read_meta(meta_file(Path(datafile or DATAFILE), cache_dir))
+    return pd.DataFrame(meta.get("rejects", []), columns=["ligne", "colonne", "valeur"])
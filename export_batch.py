@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import export_static
+from data_loader import load_objectives, load_rejects
+from export_static import BASE_CSS, MANIFEST_NAME, ORIENTATIONS, ROOT, is_fresh, load_manifest, today, write_page
+from rendering import orientation_status
+from site_assets import hashed_name, minify_css, write_assets
+from snapshots import HISTORY_DIR
+from staging import replace_file
+
+# Batch mode for several organisations: every workbook of a directory is parsed and exported in its own
+# worker process (one page set per organisation), then a consolidated cross-organisation summary is written.
+#   python export_batch.py classeurs/ --out docs/organisations --jobs 8
+
+BATCH_OUTDIR = ROOT / "docs" / "organisations"
+SUMMARY_NAME = "index.html"
+SUMMARY_CSS = """
+table { border-collapse:collapse; width:100%; background:#fff }
+th, td { padding:6px 10px; border-bottom:1px solid #eee; text-align:right }
+th:first-child, td:first-child { text-align:left }
+tr.total td { font-weight:600; border-top:2px solid #0aa6b6 }
+"""
+
+
+def slugify(name):
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-') or 'organisation'
+
+
+def workbook_slug(datafile):
+    return slugify(Path(datafile).stem.removeprefix('suivi-des-objectifs_'))
+
+
+def find_workbooks(directory):
+    # Excel lock files (~$name.xlsx) are left alone
+    return sorted(p for p in Path(directory).glob('*.xlsx') if not p.name.startswith('~$'))
+
+
+def export_workbook(datafile, outroot, force=False, history_root=HISTORY_DIR):
+    # Runs in a worker process: parse (or reuse the cache of) one workbook and write its page set
+    # (rendered in-process: the parallelism is across workbooks).
+    # Returns the per-orientation sums and counts needed by the consolidated summary.
+    start = time.perf_counter()
+    df = load_objectives(datafile)
+    organisation = df.attrs['organisation']
+    slug = workbook_slug(datafile)
+    heading = f"{organisation} - Tableau de bord du suivi des objectifs du PDE"
+    # The per-page report of export_static is summarised by the parent process instead
+    with contextlib.redirect_stdout(io.StringIO()):
+        written = export_static.main(force=force, datafile=datafile, outdir=Path(outroot) / slug,
+                                     history=Path(history_root) / slug, heading=heading)
+    grouped = df.groupby('Orientation', observed=True)['atteinte_cible_pct']
+    return {
+        'organisation': organisation,
+        'slug': slug,
+        'workbook': Path(datafile).name,
+        'extraction': df.attrs['extraction'],
+        'objectives': len(df),
+        # Objectives of an orientation missing from the spec: they have no page
+        'unlisted': int((~df['Orientation'].isin(list(ORIENTATIONS))).sum()),
+        'sums': {o: float(v) for o, v in grouped.sum().items()},
+        'counts': {o: int(v) for o, v in grouped.count().items()},
+        'rejects': len(load_rejects(datafile)),
+        'written': written,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def mean_cell(total, count):
+    return f"{int(total / count)} %" if count else '–'
+
+
+def summary_orientations(results):
+    # Every orientation returned by the workers: those of the spec first (in its order), then the others.
+    # Orientation -> column header (the spec's icons, or the escaped orientation name)
+    returned = {o for r in results for o in r['counts']}
+    others = sorted(returned - set(ORIENTATIONS))
+    return {**{o: icon for o, (_, icon) in ORIENTATIONS.items() if o in returned},
+            **{o: html.escape(o) for o in others}}
+
+
+def render_summary(results, css_href):
+    # One row per organisation plus an "all organisations" row; means are recomputed from sums and counts
+    # so the consolidated figure is weighted by the number of objectives, not averaged across organisations.
+    # css_href: the hashed site stylesheet (BASE_CSS + SUMMARY_CSS)
+    columns = summary_orientations(results)
+    head = ''.join(f'<th>{label}</th>' for label in columns.values())
+    rows = []
+    totals = {o: [0.0, 0] for o in columns}
+    for r in results:
+        cells = []
+        for o in columns:
+            total, count = r['sums'].get(o, 0.0), r['counts'].get(o, 0)
+            totals[o][0] += total
+            totals[o][1] += count
+            cells.append(f'<td>{mean_cell(total, count)}</td>')
+        overall = sum(r['sums'].values()), sum(r['counts'].values())
+        rows.append(f'<tr><td><a href="{r["slug"]}/index.html">{html.escape(r["organisation"])}</a></td><td>{r["extraction"]}</td>'
+                    f'<td>{r["objectives"]}</td>{"".join(cells)}<td><b>{mean_cell(*overall)}</b></td></tr>')
+    overall = sum(t for t, _ in totals.values()), sum(c for _, c in totals.values())
+    rows.append(f'<tr class="total"><td>Ensemble des organisations</td><td></td><td>{overall[1]}</td>'
+                + ''.join(f'<td>{mean_cell(*totals[o])}</td>' for o in columns)
+                + f'<td><b>{mean_cell(*overall)}</b></td></tr>')
+    statut = orientation_status(int(overall[0] / overall[1]) if overall[1] else 0)
+    legend = ''.join(f'<li>{label} {html.escape(o)}</li>' for o, label in columns.items() if o in ORIENTATIONS)
+    return f"""
+    <!doctype html>
+    <html lang="fr">
+    <head>
+      <meta charset="utf-8">
+      <meta name="viewport" content="width=device-width,initial-scale=1">
+      <title>Synthèse des organisations</title>
+      <link rel="stylesheet" href="{css_href}">
+    </head>
+    <body>
+      <div class="header">
+        <div>
+          <h1 style="margin:0;color:#003f5b">Synthèse du suivi des objectifs des PDE</h1>
+          <div class="meta">Dernière mise à jour : {today}</div>
+        </div>
+      </div>
+      <div class="section-header">Moyenne d'atteinte des objectifs par organisation et par orientation</div>
+      <p style="text-align:center;">{statut}</p>
+      <div class="card">
+        <table>
+          <tr><th>Organisation</th><th>Extraction</th><th>Objectifs</th>{head}<th>Moyenne</th></tr>
+          {''.join(rows)}
+        </table>
+      </div>
+      <ul class="meta">{legend}</ul>
+    </body>
+    </html>
+    """
+
+
+def main(directory, outdir=BATCH_OUTDIR, jobs=None, force=False, history_root=HISTORY_DIR):
+    workbooks = find_workbooks(directory)
+    if not workbooks:
+        raise SystemExit(f"No workbook found in {directory}")
+    # Each organisation's pages and history live in a directory named after its workbook
+    slugs = {}
+    for path in workbooks:
+        slugs.setdefault(workbook_slug(path), []).append(path.name)
+    clashes = [names for names in slugs.values() if len(names) > 1]
+    if clashes:
+        raise SystemExit("Workbooks sharing an output directory: " + "; ".join(", ".join(names) for names in clashes))
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    results = []
+    # Workbooks are independent: total time follows the number of cores, not the number of workbooks
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {pool.submit(export_workbook, path, outdir, force, history_root): path for path in workbooks}
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            print(f"{r['organisation']} ({r['workbook']}): {r['objectives']} objectives, "
+                  f"{len(r['written'])} page(s) rewritten, {r['rejects']} reject(s), {r['seconds']:.2f}s")
+            if r['unlisted']:
+                print(f"  Warning: {r['unlisted']} objective(s) without a page, orientation not in the spec")
+    results.sort(key=lambda r: r['organisation'])
+
+    manifest = load_manifest(outdir)
+    css = minify_css(BASE_CSS + SUMMARY_CSS).encode('utf-8')
+    css_href = hashed_name('site', '.css', css)
+    write_assets(outdir, {css_href: css})
+    summary = render_summary(results, css_href)
+    key = hashlib.sha256(summary.replace(today, '').encode('utf-8')).hexdigest()
+    if not is_fresh(outdir, SUMMARY_NAME, key, manifest, force):
+        write_page(outdir, SUMMARY_NAME, summary, key, manifest)
+        print(f"Summary written to {outdir / SUMMARY_NAME}")
+    replace_file(outdir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True))
+    print(f"{len(results)} workbook(s) in {time.perf_counter() - start:.2f}s with {jobs or os.cpu_count()} worker(s)")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export statique de plusieurs organisations (un classeur par organisation)")
+    parser.add_argument('directory', type=Path, help="directory containing one workbook per organisation")
+    parser.add_argument('--out', type=Path, default=BATCH_OUTDIR, help="output directory (default: %(default)s)")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: number of cores)")
+    parser.add_argument('--force', action='store_true', help="rewrite every page even if its inputs are unchanged")
+    parser.add_argument('--history', type=Path, default=HISTORY_DIR,
+                        help="snapshot store root, one subdirectory per organisation (default: %(default)s)")
+    args = parser.parse_args()
+    main(args.directory, args.out, args.jobs, args.force, args.history)
@@ -0,0 +1,140 @@
+import argparse
+import hashlib
+import inspect
+import json
+from pathlib import Path
+
+from data_loader import DATAFILE, load_objectives
+from export_static import (BASE_CSS, HEADING, MANIFEST_NAME, NAV_LINKS, ORGANISATION_PROFILES, ROOT, build_page, footer_html,
+                           is_fresh, load_manifest, render_intro, template_hash, write_page)
+from payload import build_payload
+from rendering import STATIC_CARD
+from site_assets import ASSETS_DIR, build_assets, download_assets, precompress_site, write_assets
+from snapshots import HISTORY_DIR, append_snapshot, load_history, with_trends
+from summary import load_summary
+from staging import replace_file
+
+# Client-rendered alternative to export_static.py: one compact objectives.json (card values, columnar,
+# with the orientation aggregates precomputed) and a single page that renders the selected orientation
+# in the browser. A data update only replaces objectives.json; the page changes with the templates only.
+#   python export_client.py --out docs/client
+
+CLIENT_OUTDIR = ROOT / "docs" / "client"
+DATA_NAME = "objectives.json"
+PAGE_NAME = "index.html"
+
+CLIENT_SCRIPT = """
+(function () {
+  var contenu = document.getElementById("contenu");
+  var donnees = null;
+  var index = {};
+
+  // Same {field} templates as the server-side renderers (rendering.py)
+  function remplir(gabarit, valeur) {
+    return gabarit.replace(/\\{(\\w+)\\}/g, function (m, champ) {
+      var v = valeur(champ);
+      return v === undefined ? m : v;
+    });
+  }
+
+  function carte(ligne) {
+    return remplir(donnees.gabarit, function (champ) { return champ in index ? ligne[index[champ]] : undefined; });
+  }
+
+  function afficher() {
+    if (!donnees) return;
+    var n = parseInt((location.hash.match(/^#orientation-(\\d+)$/) || [])[1], 10);
+    var o = donnees.orientations[n - 1];
+    var actif = o ? location.hash : "#";
+    document.querySelectorAll("#nav a").forEach(function (a) {
+      a.style.fontWeight = a.getAttribute("href") === actif ? "700" : "";
+    });
+    if (!o) {
+      contenu.innerHTML = document.getElementById("intro").innerHTML;
+      return;
+    }
+    contenu.innerHTML = '<hr><h2 style="color:#003f5b;text-align:center;margin-top:20px"><b><u>Orientation ' + o.orientation + '</b></u></h2>'
+      + remplir(donnees.entete, function (champ) {
+          return {numero: o.numero, icones: o.icone, moyenne: o.moyenne, statut: o.statut, synthese: o.synthese}[champ];
+        })
+      + o.lignes.map(carte).join("")
+      + '<hr>' + document.getElementById("pied").innerHTML;
+  }
+
+  fetch("objectives.json", {cache: "no-cache"})
+    .then(function (r) { return r.json(); })
+    .then(function (d) {
+      donnees = d;
+      d.champs.forEach(function (champ, i) { index[champ] = i; });
+      afficher();
+    });
+  window.addEventListener("hashchange", afficher);
+})();
+"""
+
+
+def client_nav():
+    links = [f'<a href="#{href.replace(".html", "") if href != "index.html" else ""}">{label}</a>' for href, label in NAV_LINKS]
+    return '<div class="nav" id="nav">' + '|  '.join(links) + '</div>'
+
+
+def render_client_page(intro, heading=HEADING, assets=None):
+    body = f"""
+    <div id="contenu"><p class="meta">Chargement des objectifs…</p></div>
+    <noscript><p class="meta">Cette page affiche les objectifs à l'aide de JavaScript.</p></noscript>
+    <template id="intro">{intro}</template>
+    <template id="pied">{footer_html(assets)}</template>
+    <script>{CLIENT_SCRIPT}</script>
+    """
+    return build_page('PDE', body, None, heading, assets, nav=client_nav())
+
+
+def main(force=False, datafile=DATAFILE, outdir=CLIENT_OUTDIR, history=HISTORY_DIR, heading=HEADING, assets_dir=ASSETS_DIR):
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    df = load_objectives(datafile)
+    append_snapshot(df, store=history)
+    df = with_trends(df, load_history(history, current=df))
+    assets, asset_files = build_assets(BASE_CSS, assets_dir)
+    profile = ORGANISATION_PROFILES.get(df.attrs['organisation'], {})
+    if not profile.get('logo'):
+        assets = dict(assets, logo=None)
+    intro = render_intro(df, assets, profile)
+
+    # Assets first, then the page, then the data: each file is replaced atomically and only refers to
+    # files that are already published
+    manifest = load_manifest(outdir)
+    written = write_assets(outdir, asset_files)
+    # As in export_static, the "Dernière mise à jour" date is not part of the key; the introduction follows
+    # the objective count
+    page_key = hashlib.sha256((template_hash() + heading + json.dumps(assets, sort_keys=True) + intro + CLIENT_SCRIPT
+                               + inspect.getsource(client_nav) + inspect.getsource(render_client_page)).encode('utf-8')).hexdigest()
+    if not is_fresh(outdir, PAGE_NAME, page_key, manifest, force):
+        write_page(outdir, PAGE_NAME, render_client_page(intro, heading, assets), page_key, manifest)
+        written.append(PAGE_NAME)
+    data = json.dumps(build_payload(df, STATIC_CARD, load_summary(df, datafile)), ensure_ascii=False, separators=(',', ':'))
+    data_key = hashlib.sha256(data.encode('utf-8')).hexdigest()
+    if not is_fresh(outdir, DATA_NAME, data_key, manifest, force):
+        write_page(outdir, DATA_NAME, data, data_key, manifest)
+        written.append(DATA_NAME)
+    precompress_site(outdir, written)
+    replace_file(outdir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True))
+
+    sizes = {name: (outdir / name).stat().st_size for name in (PAGE_NAME, DATA_NAME)}
+    print(f"{len(written)} file(s) rewritten: {', '.join(written) or 'none'}")
+    print(', '.join(f"{name} {size / 1024:.1f} KB" for name, size in sizes.items()))
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export statique rendu côté client (objectives.json + une page)")
+    parser.add_argument('--out', type=Path, default=CLIENT_OUTDIR, help="output directory (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="rewrite the page and the data even if unchanged")
+    parser.add_argument('--history', type=Path, default=HISTORY_DIR, metavar='DIR',
+                        help="snapshot store used for the trend sparklines (default: %(default)s)")
+    parser.add_argument('--vendor-assets', action='store_true',
+                        help="download the missing logo and Creative Commons icons into assets/ first")
+    args = parser.parse_args()
+    if args.vendor_assets:
+        download_assets()
+    main(force=args.force, outdir=args.out, history=args.history)
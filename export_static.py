@@ -1,32 +1,60 @@
+import argparse
+import hashlib
+import html
+import inspect
+import json
+import shutil
+import sys
 import pandas as pd
 from pathlib import Path
 from datetime import date
+from data_loader import DATAFILE, load_objectives, load_rejects
+from forecast import FORECAST_COLUMNS
+from profiling import PhaseProfiler
+from snapshots import HISTORY_DIR, append_snapshot, load_history, with_trends
+from changes import change_counts, change_labels, diff_versions, previous_snapshot, snapshot_version, snapshot_view
+from site_assets import ASSET_URLS, ASSETS_DIR, build_assets, download_assets, precompress_site, write_assets
+from staging import replace_file, stage_directory, swap_directory
+from rendering import (CARD_CSS, CARD_FIELDS, CHANGE_ROW, ORIENTATION_HEADER, STATIC_CARD, STATUS_DEFAULT, STATUS_THRESHOLDS,
+                       group_by_orientation, render_change_rows, render_orientation_cards, render_orientation_header)
+from spec import ORIENTATION_SPEC
+from summary import STATUS_BUCKETS, load_summary, summary_line, summary_row
 
 # Configuration
 ROOT = Path(__file__).parent
-DATAFILE = ROOT / "suivi-des-objectifs_OBVFSJ.xlsx"
 OUTDIR = ROOT / "docs"
+MANIFEST_NAME = ".build-manifest.json"
 OUTDIR.mkdir(parents=True, exist_ok=True)
 today = date.today().strftime("%Y-%m-%d")
 year = date.today().year
-
-NAV_LINKS = [
-    ("index.html", "Introduction"),
-    ("orientation-1.html", "1. Qualité de l'eau"),
-    ("orientation-2.html", "2. Eutrophisation"),
-    ("orientation-3.html", "3. Espèces envahissantes"),
-    ("orientation-4.html", "4. Habitats fauniques"),
-    ("orientation-5.html", "5. Milieux humides"),
-]
-
-ORIENTATIONS = {
-    "1 - Éviter la dégradation de la qualité de l'eau": ("orientation-1.html", "💧🌊"),
-    "2 - Ralentir l'eutrophisation des lacs": ("orientation-2.html", "🦠🏞️"),
-    "3 - Limiter la prolifération des espèces exotiques envahissantes": ("orientation-3.html", "🌾🦪"),
-    "4 - Freiner la perte d'habitat faunique": ("orientation-4.html", "🐟🦎"),
-    "5 - Éviter la destruction ou la dégradation de la qualité des milieux humides et hydriques": ("orientation-5.html", "🌿🦆"),
+HEADING = "OBVFSJ - Tableau de bord du suivi des objectifs du PDE"
+# Organisation-specific content, keyed by the workbook's organisation (df.attrs['organisation']). Other
+# organisations (batch mode, export_batch.py) get the generic introduction, without mission statement nor logo
+ORGANISATION_PROFILES = {
+    "Organisme de bassin versant du fleuve Saint-Jean": {
+        'orientations_note': " qui ont été définies en concertation avec les acteurs de l'eau de la zone de gestion intégrée "
+                        "de l'eau du bassin versant du fleuve Saint-Jean",
+        'territory': "https://obvfleuvestjean.com/un-bassin-versant-transfrontalier/",
+        'mission_title': "Mission de l'OBVFSJ",
+        'mission': "Dans le bassin versant du fleuve Saint-Jean, le maintien d'écosystèmes intègres, source d'une excellente "
+                   "qualité d'eau, constitue la base d'un héritage bâti sur de saines relations transfrontalières",
+        'logo': True,
+    },
 }
 
+# Pages and navigation derived from the shared declarative spec (spec.py)
+NAV_LINKS = [("index.html", "Introduction")] + [(f"orientation-{o['numero']}.html", o["titre"]) for o in ORIENTATION_SPEC]
+ORIENTATIONS = {o["valeur"]: (f"orientation-{o['numero']}.html", o["icones"]) for o in ORIENTATION_SPEC}
+ORIENTATION_NUMBERS = {o["valeur"]: o["numero"] for o in ORIENTATION_SPEC}
+# Changes since the previous snapshot of the history (changes.py); static site only
+CHANGES_PAGE = "changements.html"
+CHANGES_TITLE = "Changements récents"
+STATIC_NAV_LINKS = NAV_LINKS + [(CHANGES_PAGE, CHANGES_TITLE)]
+# Columns rendered on an orientation page: its key depends on them only
+PAGE_COLUMNS = [*CARD_FIELDS.values(), 'atteinte_cible_pct', 'tendance', *FORECAST_COLUMNS, "Numéro d'objectif"]
+# Rows shown on the changes page (plans with tens of thousands of objectives)
+CHANGES_LIMIT = 500
+
 BASE_CSS = """
 body { font-family: system-ui, -apple-system, 'Segoe UI', Roboto, 'Helvetica Neue', Arial; color: #003f5b; margin: 18px; }
 .header { display:flex; align-items:center; justify-content:space-between }
@@ -35,49 +63,37 @@ body { font-family: system-ui, -apple-system, 'Segoe UI', Roboto, 'Helvetica Neu
 .nav a { margin-right:12px; color:#0083cb; text-decoration:none; font-weight:600 }
 .section-header { text-align:center; color:#0aa6b6; font-size:20px; font-weight:bold; margin-top:12px }
 .card { border:1px solid #e6eef0; border-radius:6px; padding:12px; background:#fff; margin-bottom:18px }
-.progress-bg { width:100%; background:#f0f0f0; height:12px; border-radius:4px; overflow:hidden }
-.progress { height:100%; background:#0aa6b6; border-radius:4px }
 .meta { color:#666; font-size:0.95rem }
+.copyright { font-size:0.9rem; color:#666; text-align:center }
+.copyright img { max-width:1em; max-height:1em; margin-left:.2em }
+""" + CARD_CSS + """
+.obj-statut, .obj-synthese, .obj-progression { text-align:center }
+.obj-progression { color:#003f5b }
 """
 
 
 def nav_html(active_href):
     links = []
-    for href, label in NAV_LINKS:
+    for href, label in STATIC_NAV_LINKS:
         cls = 'style="font-weight:700;"' if href == active_href else ''
         links.append(f'<a href="{href}" {cls}>{label}</a>')
     return '<div class="nav">' + '|  '.join(links) + '</div>'
 
 
-def render_item(row):
-    val = int(pd.to_numeric(row.get('atteinte_cible_pct', 0), errors='coerce') or 0)
-    libelle = row.get('Libellé de l\'objectif', '')
-    reference = row.get('Valeur(référence)', '')
-    resultat = row.get('Résultat', '')
-    date_resultat = row.get('Date du résultat', '')
-    echeance = row.get('Échéance', '')
-    cible = row.get('Cible - valeur numérique', '')
-
-    html = f"""
-    <div class="card">
-      <div style="display:flex;justify-content:space-between;align-items:flex-end;margin-bottom:6px;">
-        <div style="font-weight:600">{libelle}</div>
-        <div style="font-weight:600;color:#666">{val}%</div>
-      </div>
-      <div class="meta" style="display:flex;justify-content:space-between;align-items:flex-end;margin-bottom:8px;"> 
-        <div>Valeur de référence : {reference}</div>
-        <div>Cible : {cible}</div>
-        <div>Valeur au dernier suivi : {resultat}</div>
-        <div>Suivi le : {date_resultat}</div>
-        <div>Échéance : {echeance}</div>
-      </div>
-      <div class="progress-bg"><div class="progress" style="width:{val}%;"></div></div>
-    </div>
-    """
-    return html
+def footer_html(assets=None):
+    assets = assets or ASSET_URLS
+    icons = ''.join(f'<img src="{assets[name]}" alt="">' for name in ('cc', 'by', 'nc', 'sa'))
+    return (f'<p class="copyright">Copyright © {year} par l\'<a href="https://obvfleuvestjean.com/">OBV du fleuve Saint-Jean</a> '
+            f'sous license <a href="https://creativecommons.org/licenses/by-nc-sa/4.0/">CC BY-NC-SA 4.0</a> {icons}</p>')
 
 
-def build_page(title, body_html, active_href):
+def build_page(title, body_html, active_href, heading=HEADING, assets=None, nav=None):
+    # assets: hrefs from the asset stage (shared stylesheet, vendored logo); without it the CSS is inlined
+    # nav: navigation markup replacing the links to the orientation pages (client-rendered mode)
+    style = f'<link rel="stylesheet" href="{assets["css"]}">' if assets else f'<style>{BASE_CSS}</style>'
+    # assets['logo'] set to None: no logo (organisations without a profile, see ORGANISATION_PROFILES)
+    logo = (assets or ASSET_URLS)['logo']
+    logo = f'<img src="{logo}" alt="Logo">' if logo else ''
     return f"""
     <!doctype html>
     <html lang="fr">
@@ -85,18 +101,18 @@ def build_page(title, body_html, active_href):
       <meta charset="utf-8">
       <meta name="viewport" content="width=device-width,initial-scale=1">
       <title>{title}</title>
-      <style>{BASE_CSS}</style>
+      {style}
     </head>
     <body>
       <div class="header">
         <div>
-          <h1 style="margin:0;color:#003f5b">OBVFSJ - Tableau de bord du suivi des objectifs du PDE</h1>
+          <h1 style="margin:0;color:#003f5b">{heading}</h1>
           <div class="meta">Dernière mise à jour : {today}</div>
         </div>
-        <img src="https://obvfleuvestjean.com/wp-content/uploads/2026/01/LogoOBV_ContourBlanc.png" alt="Logo">
+        {logo}
       </div>
 
-      {nav_html(active_href)}
+      {nav_html(active_href) if nav is None else nav}
 
       <div>
         {body_html}
@@ -106,57 +122,280 @@ def build_page(title, body_html, active_href):
     """
 
 
-def main():
-    # Load data exactly as the app does
-    df = pd.read_excel(DATAFILE, sheet_name=1, header=1)
-    df['atteinte_cible_pct'] = df['Pourcentage d\'atteinte de la cible'].astype(str).str.replace('%','', regex=False)
-    df['atteinte_cible_pct'] = pd.to_numeric(df['atteinte_cible_pct'], errors='coerce').fillna(0)
-    df['cible_pct'] = df['Cible en %'].astype(str).str.replace('%','', regex=False)
+# Modules whose code shapes the page HTML: hashed whole, so a new or edited helper can't be missed
+TEMPLATE_SOURCES = ['spec', 'rendering', 'summary', __name__]
 
-    # Index (Introduction)
-    intro_html = f"""
-    <hr><p style="color:#003f5b;">Bienvenue sur l'outil de suivi des objectifs du PDE 2024-2034 de l'<strong>Organisme de bassin versant du fleuve Saint-Jean</strong>. Ce tableau de bord présente l'état d'avancement des <strong>47 objectifs</strong> du PDE à travers les <strong>5 orientations</strong> qui ont été définies en concertation avec les acteurs de l'eau de la zone de gestion intégrée de l'eau du bassin versant du fleuve Saint-Jean.</p>
-    <p style="color:#003f5b;">Pour de plus amples informations sur le territoire couvert par notre action collective, consultez la page suivante : <a href="https://obvfleuvestjean.com/un-bassin-versant-transfrontalier/">obvfleuvestjean.com/un-bassin-versant-transfrontalier/</a>.</p><hr>
+
+def template_hash():
+    # Any change to the page templates invalidates every page
+    digest = hashlib.sha256((BASE_CSS + STATIC_CARD + ORIENTATION_HEADER + CHANGE_ROW
+                             + repr((STATUS_THRESHOLDS, STATUS_DEFAULT, STATUS_BUCKETS, STATIC_NAV_LINKS, CHANGES_LIMIT,
+                                     PAGE_COLUMNS))).encode('utf-8'))
+    for name in TEMPLATE_SOURCES:
+        digest.update(inspect.getsource(sys.modules[name]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def frame_hash(df):
+    # Only the columns an orientation page reads (card fields, progress, trend, objective key) are hashed
+    df = df[[col for col in PAGE_COLUMNS if col in df]]
+    digest = hashlib.sha256('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def reuse(warm, name, key, compute):
+    # Value kept between the rebuilds of the watch mode (export_watch.py) while its key is unchanged;
+    # computed every time without a warm state
+    if warm is None:
+        return compute()
+    cached = warm.get(name)
+    if cached is None or cached[0] != key:
+        cached = warm[name] = (key, compute())
+    return cached[1]
+
+
+def store_state(store):
+    # Snapshot files of the history store, with their size and mtime
+    return tuple(sorted((p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in Path(store).glob('instantane-*.*')))
+
+
+def load_manifest(outdir):
+    try:
+        return json.loads((outdir / MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def is_fresh(outdir, filename, key, manifest, force=False):
+    # Pages whose inputs are unchanged are skipped so they keep their mtime (and CDN cache).
+    # The "Dernière mise à jour" date is deliberately not part of the key: it then
+    # reflects the last time the page content actually changed.
+    return not force and manifest.get(filename) == key and (outdir / filename).exists()
+
+
+def write_page(outdir, filename, content, key, manifest):
+    replace_file(outdir / filename, content)
+    manifest[filename] = key
+
+
+def render_orientation(orientation, icon, cards, resume, assets=None):
+    # cards: the orientation's cards, rendered for the whole workbook at once (rendering.render_orientation_cards);
+    # resume: the orientation's row of the summary table (summary.py), so the page never rescans its rows
+    body = [f'<hr><h2 style="color:#003f5b;text-align:center;margin-top:20px"><b><u>Orientation {orientation}</b></u></h2>']
+    body.append(render_orientation_header(ORIENTATION_NUMBERS[orientation], icon, resume['moyenne_affichee'], resume['statut'],
+                                          summary_line(resume)))
+    body.append(cards)
+    body.append('<hr>')
+    body.append(footer_html(assets))
+    return ''.join(body)
+
+
+def render_changes(changes, labels, previous, assets=None):
+    # changes: diff between the previous snapshot and the current workbook (None without an earlier snapshot)
+    # labels: objective label per key (changes.change_labels), removed objectives included
+    body = [f'<hr><h2 style="color:#003f5b;text-align:center;margin-top:20px"><b><u>{CHANGES_TITLE}</u></b></h2>']
+    if changes is None:
+        body.append('<p class="obj-statut">Aucun instantané antérieur dans l\'historique : les changements apparaîtront '
+                    'à la prochaine exportation du classeur.</p>')
+    else:
+        counts = ', '.join(f'{n} {statut}(s)' for statut, n in change_counts(changes).items())
+        body.append(f'<p class="obj-statut">Depuis l\'exportation du {previous:%Y-%m-%d}\xa0: {counts}.</p>')
+        if len(changes) > CHANGES_LIMIT:
+            body.append(f'<p class="obj-synthese">{CHANGES_LIMIT} premiers objectifs affichés, dans l\'ordre de la feuille.</p>')
+        if len(changes):
+            body.append('<table class="table"><thead><tr><th>Statut</th><th>Numéro</th><th>Objectif</th>'
+                        '<th style="text-align: right;">Résultat</th><th style="text-align: right;">Atteinte</th>'
+                        '<th>Colonnes modifiées</th></tr></thead>'
+                        f'<tbody>{render_change_rows(changes.iloc[:CHANGES_LIMIT], labels)}</tbody></table>')
+    body.append('<hr>')
+    body.append(footer_html(assets))
+    return ''.join(body)
+
+
+def render_intro(df, assets=None, profile=None):
+    # Introduction built from the workbook (organisation, objective and orientation counts);
+    # profile: the organisation's entry of ORGANISATION_PROFILES (territory link, mission statement), if any
+    profile = profile or {}
+    organisation = html.escape(df.attrs.get('organisation', ''))
+    orientations = df['Orientation'].nunique()
+    body = [f"""
+    <hr><p style="color:#003f5b;">Bienvenue sur l'outil de suivi des objectifs du PDE de l'<strong>{organisation}</strong>. Ce tableau de bord présente l'état d'avancement des <strong>{len(df)} objectifs</strong> du PDE à travers les <strong>{orientations} orientations</strong>{profile.get('orientations_note', '')}.</p>"""]
+    if 'territory' in profile:
+        body.append(f"""
+    <p style="color:#003f5b;">Pour de plus amples informations sur le territoire couvert par notre action collective, consultez la page suivante : <a href="{profile['territory']}">{profile['territory'].removeprefix('https://')}</a>.</p>""")
+    body.append('<hr>')
+    if 'mission' in profile:
+        body.append(f"""
 
     <div class="card">
-      <h2 style="text-align:center;margin-top:0;color:#0083cb"><u>Mission de l'OBVFSJ</u></h2>
-      <p style="text-align:center;color:#555"><em>« Dans le bassin versant du fleuve Saint-Jean, le maintien d'écosystèmes intègres, source d'une excellente qualité d'eau, constitue la base d'un héritage bâti sur de saines relations transfrontalières »</em></p>
+      <h2 style="text-align:center;margin-top:0;color:#0083cb"><u>{profile['mission_title']}</u></h2>
+      <p style="text-align:center;color:#555"><em>« {profile['mission']} »</em></p>
     </div>
-    <hr>
-    <p style="font-size:0.9rem;color:#666;text-align:center;">Copyright © {year} par l'<a href="https://obvfleuvestjean.com/">OBV du fleuve Saint-Jean</a> sous license <a href="https://creativecommons.org/licenses/by-nc-sa/4.0/">CC BY-NC-SA 4.0</a> <img src="https://mirrors.creativecommons.org/presskit/icons/cc.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"><img src="https://mirrors.creativecommons.org/presskit/icons/by.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"><img src="https://mirrors.creativecommons.org/presskit/icons/nc.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"><img src="https://mirrors.creativecommons.org/presskit/icons/sa.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"></p>
-    """
+    <hr>""")
+    body.append(f"""
+    {footer_html(assets)}
+    """)
+    return ''.join(body)
+
+
+def main(force=False, datafile=DATAFILE, outdir=OUTDIR, profiler=None, history=HISTORY_DIR, heading=HEADING,
+         assets_dir=ASSETS_DIR, warm=None):
+    # profiler: optional PhaseProfiler timing each phase and page (--profile)
+    # history: snapshot store the workbook is appended to (once per extraction date) for the trend sparklines
+    # assets_dir: local copies of the logo and Creative Commons icons (hotlinked while missing, see --vendor-assets)
+    # warm: dict kept by the watch mode between rebuilds (history with trends, asset build)
+    profiler = profiler or PhaseProfiler(enabled=False)
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    # Load data exactly as the app does (shared columnar cache, rebuilt only when the workbook changes)
+    with profiler.phase('load') as phase:
+        df = load_objectives(datafile)
+        if phase is not None:
+            phase['rows'] = len(df)
+    # Percentages, dates and categories are already typed by the cleaning step run when the cache was built;
+    # cells that could not be converted are reported here
+    rejects = load_rejects(datafile)
+    if len(rejects):
+        print(f"{len(rejects)} cell(s) could not be converted:")
+        for r in rejects.itertuples(index=False):
+            print(f"  row {r.ligne}, {r.colonne}: {r.valeur!r}")
+
+    with profiler.phase('history', rows=len(df)):
+        append_snapshot(df, store=history)
+        state = store_state(history)
+        past = reuse(warm, 'history', (df.attrs.get('version'), state), lambda: load_history(history, current=df))
+        df = reuse(warm, 'trends', (df.attrs.get('version'), state), lambda: with_trends(df, past))
 
-    (OUTDIR / 'index.html').write_text(build_page('Introduction', intro_html, 'index.html'), encoding='utf-8')
+    # Objectives added, removed or changed since the previous snapshot, in one vectorized join
+    with profiler.phase('changes', rows=len(df)):
+        previous = previous_snapshot(past, df.attrs['extraction'])
+        changes, labels = None, None
+        if previous is not None:
+            before, after = snapshot_version(past, previous), snapshot_view(df)
+            changes = diff_versions(before, after)
+            labels = change_labels(before, after)
+
+    # Per-orientation aggregates, computed once per data version and day and kept next to the data cache
+    with profiler.phase('summary', rows=len(df)):
+        summary = load_summary(df, datafile)
+
+    # Shared stylesheet and vendored images, published under content-hashed names
+    with profiler.phase('assets'):
+        assets, asset_files = reuse(warm, 'assets', (BASE_CSS, str(assets_dir)), lambda: build_assets(BASE_CSS, assets_dir))
+
+    profile = ORGANISATION_PROFILES.get(df.attrs['organisation'], {})
+    if not profile.get('logo'):
+        assets = dict(assets, logo=None)
+
+    # Objectives of an orientation missing from the spec have no page
+    unlisted = ~df['Orientation'].isin(list(ORIENTATIONS))
+    if unlisted.any():
+        print(f"Warning: {int(unlisted.sum())} objective(s) skipped, orientation not in the spec: "
+              f"{', '.join(map(str, df.loc[unlisted, 'Orientation'].astype(str).unique()))}")
+
+    # Index (Introduction)
+    intro_html = render_intro(df, assets, profile)
+
+    manifest = load_manifest(outdir)
+    templates = template_hash() + heading + json.dumps(assets, sort_keys=True)
+    index_key = hashlib.sha256((templates + intro_html).encode('utf-8')).hexdigest()
+    changes_html = render_changes(changes, labels, previous, assets)
+    changes_key = hashlib.sha256((templates + changes_html).encode('utf-8')).hexdigest()
 
     # Build orientation pages
+    with profiler.phase('group', rows=len(df)):
+        groups = group_by_orientation(df)
+    stale = []
     for orientation, (filename, icon) in ORIENTATIONS.items():
-        df_o = df[df['Orientation'] == orientation].copy()
-        df_o['atteinte_cible_pct'] = pd.to_numeric(df_o['atteinte_cible_pct'], errors='coerce').fillna(0)
-        moyenne = int(df_o['atteinte_cible_pct'].mean()) if len(df_o)>0 else 0
-
-        body = f'<hr><h2 style="color:#003f5b;text-align:center;margin-top:20px"><b><u>Orientation {orientation}</b></u></h2>'
-        body += f"<div class=\"section-header\">{icon} Moyenne d'atteinte des objectifs pour cette orientation : {moyenne} %</div>"
-        if moyenne > 70:
-            body += """<p style="text-align:center;">✅ Les objectifs sont en bonne voie d'être atteints.</p>"""
-        elif moyenne > 30:
-            body += """<p style="text-align:center;">⚠️ Des efforts constants sont encore requis.</p>"""
-        else:
-            body += """<p style="text-align:center;">🚨 Priorité élevée : phase de planification.</p>"""
-
-        body += '<hr><h4 style="text-align: center;color:#003f5b;"><u>Progression par objectif</u></h4>'
-        for _, row in df_o.iterrows():
-            body += render_item(row)
-        body += '<hr>'
-        body += f'''<p style="font-size:0.9rem;color:#666;text-align:center;">Copyright © {year} par l'<a href="https://obvfleuvestjean.com/">OBV du fleuve Saint-Jean</a> sous license <a href="https://creativecommons.org/licenses/by-nc-sa/4.0/">CC BY-NC-SA 4.0</a> <img src="https://mirrors.creativecommons.org/presskit/icons/cc.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"><img src="https://mirrors.creativecommons.org/presskit/icons/by.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"><img src="https://mirrors.creativecommons.org/presskit/icons/nc.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"><img src="https://mirrors.creativecommons.org/presskit/icons/sa.svg" alt="" style="max-width: 1em;max-height:1em;margin-left: .2em;"></p>'''
-        (OUTDIR / filename).write_text(build_page(filename.replace('.html',''), body, filename), encoding='utf-8')
+        df_o = groups.get(orientation, df.iloc[0:0])
+        resume = summary_row(summary, orientation)
+        # The overdue count also depends on today's date: it is part of the key through the summary row
+        key = hashlib.sha256(f'{templates}{frame_hash(df_o)}{summary_line(resume)}{icon}{year}'.encode('utf-8')).hexdigest()
+        if not is_fresh(outdir, filename, key, manifest, force):
+            stale.append((orientation, filename, icon, resume, key))
 
     # README with publish instructions
     readme = """
     # PDE static export
     """
+    readme_key = hashlib.sha256(readme.encode('utf-8')).hexdigest()
+
+    index_stale = not is_fresh(outdir, 'index.html', index_key, manifest, force)
+    changes_stale = not is_fresh(outdir, CHANGES_PAGE, changes_key, manifest, force)
+    readme_stale = not is_fresh(outdir, 'README.md', readme_key, manifest, force)
+    assets_stale = any(not (outdir / name).exists() for name in asset_files)
+    if not (index_stale or changes_stale or stale or readme_stale or assets_stale):
+        print("0 page(s) rewritten: none")
+        return []
+
+    # Everything is written into a staging copy of the site (hard links for the unchanged pages),
+    # which then replaces outdir in one step (an atomic swap on Linux only, see staging.py): the served site
+    # is never partially written. A failed run removes its staging copy
+    with profiler.phase('stage'):
+        staging = stage_directory(outdir)
+    try:
+        written = []
+        if index_stale:
+            with profiler.phase('render', page='index.html'):
+                html = build_page('Introduction', intro_html, 'index.html', heading, assets)
+            with profiler.phase('write', page='index.html'):
+                write_page(staging, 'index.html', html, index_key, manifest)
+            written.append('index.html')
+        if changes_stale:
+            with profiler.phase('render', page=CHANGES_PAGE):
+                html = build_page(CHANGES_TITLE, changes_html, CHANGES_PAGE, heading, assets)
+            with profiler.phase('write', page=CHANGES_PAGE):
+                write_page(staging, CHANGES_PAGE, html, changes_key, manifest)
+            written.append(CHANGES_PAGE)
+
+        # Cards of every stale orientation formatted in one pass over their rows, not once per orientation
+        with profiler.phase('cards', rows=len(df)):
+            rows = df if len(stale) == len(ORIENTATIONS) else df[df['Orientation'].isin([o for o, *_ in stale])]
+            cards = render_orientation_cards(rows, STATIC_CARD)
 
-    (OUTDIR / 'README.md').write_text(readme, encoding='utf-8')
+        for orientation, filename, icon, resume, key in stale:
+            with profiler.phase('render', page=filename):
+                body = render_orientation(orientation, icon, cards.get(orientation, ''), resume, assets)
+                html = build_page(filename.replace('.html',''), body, filename, heading, assets)
+            with profiler.phase('write', page=filename):
+                write_page(staging, filename, html, key, manifest)
+            written.append(filename)
 
+        if readme_stale:
+            write_page(staging, 'README.md', readme, readme_key, manifest)
+        with profiler.phase('write', page='assets'):
+            published = write_assets(staging, asset_files)
+        with profiler.phase('precompress'):
+            precompress_site(staging, written + published)
+        replace_file(staging / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True))
+        with profiler.phase('swap'):
+            swap_directory(staging, outdir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    print(f"{len(written)} page(s) rewritten: {', '.join(written) or 'none'}")
+    return written
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Export statique du tableau de bord de suivi des objectifs du PDE")
+    parser.add_argument('--force', action='store_true', help="rewrite every page even if its inputs are unchanged")
+    parser.add_argument('--history', type=Path, default=HISTORY_DIR, metavar='DIR',
+                        help="snapshot store used for the trend sparklines (default: %(default)s)")
+    parser.add_argument('--profile', nargs='?', const=ROOT / 'profile-report.json', type=Path, metavar='REPORT',
+                        help="record wall time, peak memory and row counts per phase and page as a JSON report")
+    parser.add_argument('--cprofile', type=Path, metavar='PROF', help="also dump a cProfile profile (requires --profile)")
+    parser.add_argument('--vendor-assets', action='store_true',
+                        help="download the missing logo and Creative Commons icons into assets/ first")
+    args = parser.parse_args()
+    if args.vendor_assets:
+        download_assets()
+    profiler = PhaseProfiler(report_path=args.profile, cprofile_path=args.cprofile) if args.profile else None
+    main(force=args.force, profiler=profiler, history=args.history)
+    if profiler is not None:
+        report = profiler.finish()
+        for phase in report['phases']:
+            label = phase['name'] + (f" {phase['page']}" if 'page' in phase else '')
+            print(f"{label:<32} {phase['seconds']:>9.4f}s {phase['peak_memory_bytes'] / 1e6:>9.2f} MB  rows={phase['rows']}")
+        print(f"Profile report written to {args.profile}")
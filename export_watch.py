@@ -0,0 +1,108 @@
+import argparse
+import importlib
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import openpyxl  # noqa: F401  imported up front: the first parse after an edit would otherwise pay for it
+
+import export_static
+from data_loader import DATAFILE
+from snapshots import HISTORY_DIR
+
+# Watch mode of the static exporter: one long-running process keeps the interpreter, the imports and the
+# loaded data warm, polls the workbook and the template sources, and once a burst of saves has settled
+# runs an incremental export (export_static.main only rewrites the pages whose inputs changed).
+#   python export_watch.py [--debounce 0.3]
+
+# Template modules, reloaded in dependency order when one of their sources changes; snapshots binds
+# rendering.trend_cells at import, so it is reloaded right after rendering
+TEMPLATE_MODULES = ['spec', 'rendering', 'snapshots', 'summary', 'changes', 'site_assets', 'export_static']
+DEBOUNCE = 0.3  # seconds without a new change before rebuilding
+INTERVAL = 0.1  # seconds between two polls
+
+
+def template_files():
+    return [Path(sys.modules[name].__file__) for name in TEMPLATE_MODULES]
+
+
+def fingerprint(paths):
+    # (mtime, size) of each watched file; None while it is missing (e.g. Excel replacing it on save)
+    state = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            state[path] = None
+    return state
+
+
+def reload_templates():
+    for name in TEMPLATE_MODULES:
+        importlib.import_module(name)
+        importlib.reload(sys.modules[name])
+    return sys.modules['export_static']
+
+
+def rebuild(exporter, warm, datafile, outdir, history):
+    start = time.perf_counter()
+    written = exporter.main(datafile=datafile, outdir=outdir, history=history, warm=warm)
+    return written, time.perf_counter() - start
+
+
+def watch(datafile=DATAFILE, outdir=export_static.OUTDIR, history=HISTORY_DIR, debounce=DEBOUNCE, interval=INTERVAL):
+    datafile = Path(datafile)
+    exporter = export_static
+    warm = {}
+    day = date.today()
+    written, seconds = rebuild(exporter, warm, datafile, outdir, history)
+    print(f"Watching {datafile.name} and the templates (initial build: {seconds:.2f}s). Ctrl+C to stop.")
+
+    seen = fingerprint([datafile] + template_files())
+    changed, last_change = set(), None
+    while True:
+        time.sleep(interval)
+        current = fingerprint([datafile] + template_files())
+        if current != seen:
+            changed |= {path for path in current if current[path] != seen.get(path)}
+            seen, last_change = current, time.monotonic()
+            continue
+        # The "Dernière mise à jour" date and the overdue counts change at midnight
+        new_day = date.today() != day
+        if not new_day and (not changed or time.monotonic() - last_change < debounce):
+            continue
+        if seen[datafile] is None:
+            continue  # the workbook is being replaced: wait for it to reappear
+        try:
+            if new_day or changed - {datafile}:
+                exporter = reload_templates()
+                # Trend cells come from the reloaded templates; the history and the vendored assets are kept
+                # (assets only rebuilt when site_assets.py itself changed)
+                warm.pop('trends', None)
+                if Path(sys.modules['site_assets'].__file__) in changed:
+                    warm.pop('assets', None)
+            written, seconds = rebuild(exporter, warm, datafile, outdir, history)
+        except Exception as exc:
+            # Half-saved workbook or template being edited: retried on the next change
+            print(f"Rebuild failed ({type(exc).__name__}: {exc}); waiting for the next change")
+        else:
+            # Edit-to-published latency, from the last save of a watched file to the swapped site
+            latency = time.time() - max(seen[path][0] for path in changed if seen[path] is not None) / 1e9 if changed else 0
+            print(f"{len(written)} page(s) rebuilt in {seconds:.2f}s ({latency:.2f}s after the last save)")
+        changed.clear()
+        day = date.today()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Watch the workbook and the templates and rebuild the static export on change")
+    parser.add_argument('--datafile', type=Path, default=DATAFILE)
+    parser.add_argument('--out', type=Path, default=export_static.OUTDIR)
+    parser.add_argument('--history', type=Path, default=HISTORY_DIR, metavar='DIR')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE, help="seconds without a new save before rebuilding")
+    args = parser.parse_args()
+    try:
+        watch(args.datafile, args.out, args.history, args.debounce)
+    except KeyboardInterrupt:
+        print("Stopped.")
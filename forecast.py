@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Prévision d'atteinte des cibles à partir de la version courante du classeur (sans historique) : pour chaque
+# objectif, rythme de progression observé depuis la valeur de référence (1er janvier de « Année(référence) »)
+# jusqu'au dernier résultat, rythme requis pour atteindre la cible à l'Échéance, date d'achèvement projetée au
+# rythme observé et objectifs à risque de manquer leur Échéance. Le calcul est fait en une passe NumPy sur les
+# colonnes de tous les objectifs ; data_loader l'enregistre dans le cache avec les données nettoyées.
+# Dès que l'historique compte deux instantanés d'un objectif, sa pente (snapshots.trend_table) remplace le
+# rythme de la seule ligne courante (with_history) : chaque objectif n'a qu'une projection.
+
+REFERENCE = "Valeur(référence)"
+ANNEE_REFERENCE = "Année(référence)"
+CIBLE = "Cible - valeur numérique"
+RESULTAT = "Résultat"
+DATE_RESULTAT = "Date du résultat"
+ECHEANCE = "Échéance"
+JOURS_PAR_AN = 365.25
+HORIZON_JOURS = 100 * 365  # progression trop lente : pas d'achèvement projeté (aussi pour snapshots.trend_table)
+# Rythmes en points d'atteinte de la cible par an (écart entre la valeur de référence et la cible = 100 points)
+FORECAST_COLUMNS = ["rythme_observe_pts_an", "rythme_requis_pts_an", "achevement_projete", "a_risque"]
+
+
+def _nombres(df, col):
+    if col not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _jours(df, col):
+    # Dates en jours depuis 1970 (réels, NaN si absentes)
+    if col not in df:
+        return np.full(len(df), np.nan)
+    dates = pd.to_datetime(df[col], errors="coerce").to_numpy(dtype="datetime64[D]")
+    return np.where(np.isnat(dates), np.nan, dates.astype("int64"))
+
+
+def _debut_annee(annees):
+    # 1er janvier de chaque année, en jours depuis 1970
+    jours = np.full(len(annees), np.nan)
+    connues = np.isfinite(annees)
+    jours[connues] = (annees[connues].astype("int64") - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype("int64")
+    return jours
+
+
+def forecast_table(df):
+    # Une ligne par objectif (même index que df), colonnes FORECAST_COLUMNS
+    reference, cible, resultat = _nombres(df, REFERENCE), _nombres(df, CIBLE), _nombres(df, RESULTAT)
+    debut, mesure, echeance = _debut_annee(_nombres(df, ANNEE_REFERENCE)), _jours(df, DATE_RESULTAT), _jours(df, ECHEANCE)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Avancement depuis la référence, aussi pour les cibles à la baisse (cible < référence) ;
+        # sans écart entre référence et cible, le pourcentage d'atteinte du classeur est repris
+        ecart = cible - reference
+        atteinte = np.where(ecart != 0, (resultat - reference) / ecart * 100, _nombres(df, "atteinte_cible_pct"))
+        restant = np.clip(100 - atteinte, 0, None)
+        ecoule = (mesure - debut) / JOURS_PAR_AN
+        observe = np.where(ecoule > 0, atteinte / ecoule, np.nan)
+        # Échéance passée ou atteinte le jour de la mesure : rythme requis infini si la cible n'est pas atteinte
+        a_venir = (echeance - mesure) / JOURS_PAR_AN
+        requis = np.where(restant > 0, np.where(a_venir > 0, restant / a_venir, np.inf), 0)
+        requis = np.where(np.isnan(restant) | np.isnan(a_venir), np.nan, requis)
+        delai = np.where(restant > 0, restant / np.where(observe > 0, observe, np.nan) * JOURS_PAR_AN, 0)
+
+    delai = np.where(delai <= HORIZON_JOURS, np.rint(delai), np.nan)
+    achevement = mesure + delai
+    # Sans achèvement projeté avant l'Échéance (progression nulle ou trop lente) ; pas de verdict sans mesure datée
+    a_risque = (restant > 0) & ~np.isnan(mesure) & ~np.isnan(echeance) & ~(achevement <= echeance)
+    return pd.DataFrame({
+        "rythme_observe_pts_an": observe,
+        "rythme_requis_pts_an": requis,
+        "achevement_projete": pd.to_datetime(achevement, unit="D"),
+        "a_risque": a_risque,
+    }, index=df.index)
+
+
+def with_forecast(df):
+    # Ajoute les colonnes de prévision ; copie superficielle, les colonnes existantes ne sont pas recopiées
+    out = df.copy(deep=False)
+    for col, valeurs in forecast_table(df).items():
+        out[col] = valeurs
+    return out
+
+
+def with_history(df, trends, cles):
+    # Prévisions de df dont le rythme observé, l'achèvement projeté et le risque viennent de la pente de
+    # l'historique (trends : snapshots.trend_table) pour les objectifs qui ont au moins deux instantanés ;
+    # cles : clé d'objectif de chaque ligne de df. df est modifié en place (copie superficielle de l'appelant).
+    if "a_risque" not in df:
+        return df
+    t = trends.reindex(cles)
+    historique = ((t["nb_instantanes"] >= 2) & t["vitesse_pts_an"].notna()).to_numpy()
+    df["rythme_observe_pts_an"] = np.where(historique, t["vitesse_pts_an"].to_numpy(), df["rythme_observe_pts_an"].to_numpy())
+    df["achevement_projete"] = df["achevement_projete"].where(~historique, t["achevement_prevu"].to_numpy())
+    df["a_risque"] = np.where(historique, t["en_retard"].to_numpy(dtype=bool, na_value=False), df["a_risque"].to_numpy())
+    return df
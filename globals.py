@@ -0,0 +1,168 @@
+import hashlib
+import time
+from datetime import date
+from pathlib import Path
+
+import shiny
+from htmltools import HTMLDependency
+from shiny import reactive
+
+from cache_store import remove_cache, write_atomic
+from data_loader import CACHE_DIR, load_objectives, workbook_fingerprint
+from rendering import APP_CARD, card_frame, render_cards
+from snapshots import load_history, with_trends
+from summary import load_summary, summary_row
+
+# Données partagées par toutes les sessions de app.py. Shiny Express importe ce fichier une seule
+# fois par processus (hors session), ce qui permet d'y placer une source réactive commune.
+
+INTERVALLE_SONDAGE = 2  # secondes entre deux vérifications du classeur
+TAILLE_PAGE = 50  # cartes d'objectifs envoyées à la fois par orientation
+
+
+# Le classeur n'est relu que lorsque sa date de modification ou sa taille change ;
+# load_objectives() vérifie ensuite le contenu (sha256) avant de reparser le Excel.
+# Les tendances (sparklines) viennent de l'historique des instantanés, complété du classeur courant.
+@reactive.poll(workbook_fingerprint, interval_secs=INTERVALLE_SONDAGE)
+def objectifs():
+    df = load_objectives()
+    return with_trends(df, load_history(current=df))
+
+
+# Rendu des panneaux d'orientation, mis en cache par version des données et partagé entre
+# les sessions : un panneau n'est calculé qu'une fois par version, à sa première ouverture.
+_groupes = {}
+_rendus = {}
+_syntheses = {}
+_index_recherche = {}
+_themes = {}
+
+
+def positions_orientation(df):
+    # Positions des objectifs de chaque orientation (ordre de la feuille). Seules ces positions sont
+    # conservées : les lignes restent dans le cache projeté en mémoire, partagé entre les workers,
+    # au lieu d'une copie par orientation dans chaque processus
+    version = df.attrs.get("version")
+    if version is None or version not in _groupes:
+        positions = df.groupby("Orientation", sort=False, observed=True).indices
+        if version is None:
+            return positions
+        _groupes.clear()
+        _groupes[version] = positions
+    return _groupes[version]
+
+
+def lignes_orientation(df, orientation, debut=None, fin=None):
+    # Objectifs d'une orientation, éventuellement limités à la tranche [debut, fin)
+    return df.iloc[positions_orientation(df).get(orientation, [])[debut:fin]]
+
+
+def synthese(df):
+    # Tableau de synthèse par orientation (summary.py), lu depuis le cache une fois par version et par jour
+    cle = (df.attrs.get("version"), date.today())
+    if cle[0] is None:
+        return load_summary(df)
+    if cle not in _syntheses:
+        _syntheses.clear()
+        _syntheses[cle] = load_summary(df)
+    return _syntheses[cle]
+
+
+def _en_cache(version, cle, calcul):
+    # Rendus partagés entre sessions, conservés pour la version courante des données seulement
+    if version is None:
+        return calcul()
+    if (version, *cle) not in _rendus:
+        for ancienne in [ancienne for ancienne in _rendus if ancienne[0] != version]:
+            del _rendus[ancienne]
+        _rendus[(version, *cle)] = calcul()
+    return _rendus[(version, *cle)]
+
+
+def rendu_orientation(df, orientation):
+    # Retourne (valeurs affichées par objectif, ligne de synthèse de l'orientation) ;
+    # la synthèse n'est pas mise en cache avec le rendu : son décompte des retards change avec la date
+    cartes = _en_cache(df.attrs.get("version"), (orientation,),
+                       lambda: card_frame(lignes_orientation(df, orientation)))
+    return cartes, summary_row(synthese(df), orientation)
+
+
+def page_cartes(df, orientation, page):
+    # HTML des cartes de la page (TAILLE_PAGE objectifs, dans l'ordre de la feuille) : seule la partie
+    # affichée d'une orientation est rendue et envoyée au navigateur
+    def calcul():
+        return render_cards(lignes_orientation(df, orientation, page * TAILLE_PAGE, (page + 1) * TAILLE_PAGE), APP_CARD)
+    return _en_cache(df.attrs.get("version"), (orientation, page), calcul)
+
+
+def index_recherche(df):
+    # Index du panneau « Recherche » (search_index.py), construit une fois par version des données
+    # Importé à la première recherche seulement : rien à charger au démarrage pour ce panneau
+    from search_index import SearchIndex
+
+    version = df.attrs.get("version")
+    if version is None:
+        return SearchIndex(df)
+    if version not in _index_recherche:
+        _index_recherche.clear()
+        _index_recherche[version] = SearchIndex(df)
+    return _index_recherche[version]
+
+
+def dependance_theme(theme, cache_dir=CACHE_DIR):
+    # Feuille de style d'un ui.Theme (Bootstrap compilé depuis Sass), compilée une seule fois puis relue
+    # depuis le cache, dont celui préconstruit par build.py. Passé tel quel à page_opts, le thème serait
+    # recompilé (environ une seconde) au démarrage et à chaque session, app.py étant réexécuté pour chacune.
+    # La clé ignore le dossier d'installation de Shiny, pour rester valable dans Shinylive, mais contient
+    # sa version : Shinylive embarque sa propre Shiny, et build.py n'exporte le thème préconstruit que si
+    # elle est la même qu'ici (sinon la page le compile une fois avec la sienne).
+    source = theme.to_sass().replace(str(Path(shiny.__file__).parent), "")
+    cle = hashlib.sha256(f"{shiny.__version__}\n{source}".encode("utf-8")).hexdigest()[:16]
+    if cle not in _themes:
+        css = Path(cache_dir) / f"theme-{cle}.css"
+        if not css.exists():
+            css.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(css, lambda tmp: tmp.write_text(theme.to_css(), encoding="utf-8"))
+            # Thèmes compilés pour une autre version de Shiny ou d'autres couleurs
+            for ancien in css.parent.glob("theme-*.css"):
+                if ancien != css:
+                    remove_cache(ancien)
+        _themes[cle] = HTMLDependency(name=f"theme-{cle}", version=shiny.__version__,
+                                      source={"subdir": str(css.parent)}, stylesheet={"href": css.name}, all_files=False)
+    return _themes[cle]
+
+
+def valeur(initiale, nom):
+    # reactive.value nommée : sans nom, Shiny le déduit de l'affectation en inspectant toute la pile
+    # d'appels (inspect.stack), soit plusieurs dizaines de ms par valeur à chaque ouverture de session
+    try:
+        return reactive.value(initiale, name=nom)
+    except TypeError:  # Shiny antérieur aux valeurs nommées (ex. version embarquée par Shinylive)
+        return reactive.value(initiale)
+
+
+def debounce(delai, source):
+    # Valeur de source (fonction réactive) qui ne change qu'après delai secondes sans nouvelle
+    # modification : la recherche n'est pas relancée à chaque frappe. À appeler dans une session.
+    stable = valeur(None, f"{source.__name__}_stable")
+    publier_a = valeur(None, f"{source.__name__}_publier_a")
+
+    @reactive.effect
+    def _noter():
+        source()
+        publier_a.set(time.monotonic() + delai)
+
+    @reactive.effect
+    def _publier():
+        instant = publier_a()
+        if instant is None:
+            return
+        restant = instant - time.monotonic()
+        if restant > 0:
+            reactive.invalidate_later(restant)
+            return
+        with reactive.isolate():
+            stable.set(source())
+            publier_a.set(None)
+
+    return stable
@@ -0,0 +1,53 @@
+import json
+import sys
+from pathlib import Path
+
+import shiny
+from htmltools import HTMLDependency
+from shiny.express import ui
+
+try:
+    from theme import THEME_CSS, entete_page, introduction, style_page
+except ImportError:  # lancée depuis le dépôt : theme.py n'est copié dans lean/ que par build.py --lean
+    sys.path.append(str(Path(__file__).parent.parent))
+    from theme import THEME_CSS, entete_page, introduction, style_page
+
+# Variante allégée de app.py pour Shinylive : elle ne lit que la charge utile objectifs.json et le thème
+# précompilé theme.css produits par build.py (python build.py --lean). Aucun import de pandas, numpy,
+# openpyxl ni libsass, pour que le navigateur n'ait pas à télécharger ces paquets.
+
+donnees = json.loads((Path(__file__).parent / "objectifs.json").read_text(encoding="utf-8"))
+champs = donnees["champs"]
+gabarit = donnees["gabarit"]
+entete = donnees["entete"]
+
+
+def cartes_html(lignes):
+    return "".join(gabarit.format(**dict(zip(champs, ligne))) for ligne in lignes)
+
+
+# Configuration de la page (thème déjà compilé, comme globals.dependance_theme pour app.py)
+dependance_theme = HTMLDependency(name="theme-obv", version=shiny.__version__,
+                                  source={"subdir": str(Path(__file__).parent)}, stylesheet={"href": THEME_CSS},
+                                  all_files=False)
+ui.page_opts(theme=dependance_theme, fillable=True)
+
+ui.head_content(
+    style_page(donnees["style"]),
+)
+
+# Header avec logo + titre + date
+entete_page()
+
+with ui.navset_card_pill(id="tabs"):
+
+    ### SECTION 0. INTRODUCTION ###
+    with ui.nav_panel("Introduction"):
+        introduction(donnees["nb_objectifs"])
+
+    ### SECTIONS 1 à 5. ORIENTATIONS ###
+    for o in donnees["orientations"]:
+        with ui.nav_panel(o["titre"]):
+            ui.HTML(entete.format(numero=o["numero"], icones=o["icone"], moyenne=o["moyenne"], statut=o["statut"],
+                                  synthese=o["synthese"]))
+            ui.HTML(cartes_html(o["lignes"]))
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from data_loader import DATAFILE, load_objectives
+from rendering import APP_CARD, APP_TABS, CARD_CSS, ORIENTATION_HEADER, card_frame, group_by_orientation
+from snapshots import load_history, with_trends
+from summary import load_summary, orientation_summary, summary_line, summary_row
+
+# Charge utile « données seulement » pour l'application allégée (lean/app.py) : le classeur est
+# prétraité au moment de l'export, et le navigateur n'a plus besoin de pandas ni d'un lecteur Excel.
+
+PAYLOAD_NAME = "objectifs.json"
+
+
+def build_payload(df, gabarit=APP_CARD, summary=None):
+    # Valeurs déjà formatées et échappées, en colonnes (champs + lignes) pour rester compact ;
+    # gabarit : carte à remplir côté client (APP_CARD pour lean/app.py, STATIC_CARD pour export_client.py) ;
+    # summary : tableau de synthèse (summary.py), recalculé s'il n'est pas fourni
+    groupes = group_by_orientation(df)
+    summary = orientation_summary(df) if summary is None else summary
+    champs = None
+    orientations = []
+    for numero, (titre, orientation, icone) in enumerate(APP_TABS, start=1):
+        df_o = groupes.get(orientation, df.iloc[0:0])
+        cartes = card_frame(df_o).reset_index()
+        champs = list(cartes.columns)
+        resume = summary_row(summary, orientation)
+        orientations.append({
+            "numero": numero,
+            "titre": titre,
+            "orientation": orientation,
+            "icone": icone,
+            "moyenne": resume["moyenne_affichee"],
+            "nb_objectifs": len(df_o),
+            "statut": resume["statut"],
+            "synthese": summary_line(resume),
+            "lignes": cartes.values.tolist(),
+        })
+    return {
+        "version": df.attrs.get("version"),
+        "nb_objectifs": len(df),
+        "gabarit": gabarit,
+        # En-tête d'orientation partagé avec app.py et export_static.py (rendering.ORIENTATION_HEADER)
+        "entete": ORIENTATION_HEADER,
+        # Mise en forme des cartes (classes obj-*) ; les pages de export_client.py l'ont déjà dans leur feuille de style
+        "style": CARD_CSS if gabarit == APP_CARD else "",
+        "champs": champs,
+        "orientations": orientations,
+    }
+
+
+def write_payload(path, datafile=None):
+    df = load_objectives(datafile or DATAFILE)
+    df = with_trends(df, load_history(current=df))
+    path = Path(path)
+    path.write_text(json.dumps(build_payload(df, summary=load_summary(df, datafile)), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return path
@@ -0,0 +1,135 @@
+import cProfile
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+# Instrumentation par phase : temps réel, pic mémoire (tracemalloc) et nombre de lignes,
+# avec rapport JSON et, en option, un profil cProfile complet.
+# PDE_PROFILE=rapport.json (et PDE_CPROFILE=profil.prof) active les mêmes mesures autour du démarrage de app.py.
+# startup_timing() mesure le démarrage complet de app.py dans un processus neuf (imports et exécution).
+
+# Démarrage d'une application Shiny Express tel que fait par le serveur (et par Shinylive) : imports, puis
+# exécution du fichier (chargement des données, construction de l'interface). Lancé avec -X importtime.
+SCRIPT_DEMARRAGE = """
+import sys, time
+debut = time.perf_counter()
+from pathlib import Path
+from shiny.express import wrap_express_app
+wrap_express_app(Path(sys.argv[1]).resolve())
+print(time.perf_counter() - debut)
+"""
+
+
+class PhaseProfiler:
+    def __init__(self, enabled=True, report_path=None, cprofile_path=None):
+        self.enabled = enabled
+        self.report_path = Path(report_path) if report_path else None
+        self.cprofile_path = Path(cprofile_path) if cprofile_path else None
+        self.phases = []
+        self._stack = []
+        self._profile = None
+        self._started = None
+        self._peak = 0
+        if enabled:
+            self.start()
+
+    @classmethod
+    def from_env(cls):
+        report = os.environ.get("PDE_PROFILE")
+        return cls(enabled=bool(report), report_path=report, cprofile_path=os.environ.get("PDE_CPROFILE"))
+
+    def start(self):
+        if self._started is not None:
+            return
+        self._started = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_path:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    @contextmanager
+    def phase(self, name, rows=None, **extra):
+        if not self.enabled:
+            yield None
+            return
+        # Le pic de la phase parente est conservé avant la remise à zéro pour la phase enfant
+        if self._stack:
+            parent = self._stack[-1]
+            parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        record = {"name": name, "depth": len(self._stack), "rows": rows, **extra}
+        frame = {"peak": 0, "record": record}
+        self._stack.append(frame)
+        self.phases.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            record["peak_memory_bytes"] = peak
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            self._peak = max(self._peak, peak)
+
+    def report(self):
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 6) if self._started else None,
+            "peak_memory_bytes": self._peak,
+            "phases": self.phases,
+        }
+
+    def finish(self):
+        # Écrit le rapport JSON (et le profil cProfile) ; retourne le rapport
+        if not self.enabled:
+            return None
+        if self._profile is not None:
+            self._profile.disable()
+            self.cprofile_path.parent.mkdir(parents=True, exist_ok=True)
+            self._profile.dump_stats(self.cprofile_path)
+        report = self.report()
+        if self.report_path:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        return report
+
+
+def parse_importtime(texte):
+    # Lignes « import time: self [us] | cumulative | package » de python -X importtime :
+    # liste de (module, profondeur d'imbrication, temps propre, temps cumulé) en secondes
+    modules = []
+    for ligne in texte.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        propre, cumule, nom = ligne[len("import time:"):].split("|", 2)
+        profondeur = (len(nom) - len(nom.lstrip())) // 2
+        modules.append((nom.strip(), profondeur, int(propre) / 1e6, int(cumule) / 1e6))
+    return modules
+
+
+def startup_timing(app_path, env=None, top=8):
+    # Démarrage de app_path dans un processus neuf : durée totale, part des imports (-X importtime),
+    # part de l'exécution du fichier et imports de premier niveau les plus coûteux
+    # Chemin absolu : le processus est lancé dans le dossier de l'application, où un chemin relatif ne mène plus à rien
+    app_path = Path(app_path).resolve()
+    resultat = subprocess.run([sys.executable, "-X", "importtime", "-c", SCRIPT_DEMARRAGE, str(app_path)],
+                              capture_output=True, text=True, cwd=app_path.parent, env={**os.environ, **(env or {})})
+    if resultat.returncode != 0:
+        raise RuntimeError(f"échec du démarrage de {app_path.name} :\n{resultat.stderr[-2000:]}")
+    modules = [m for m in parse_importtime(resultat.stderr) if m[1] == 0]
+    total = float(resultat.stdout.strip().splitlines()[-1])
+    imports = sum(cumule for _, _, _, cumule in modules)
+    return {
+        "total_seconds": round(total, 6),
+        "imports_seconds": round(imports, 6),
+        "execution_seconds": round(total - imports, 6),
+        "imports": [{"module": nom, "seconds": round(cumule, 6)}
+                    for nom, _, _, cumule in sorted(modules, key=lambda m: -m[3])[:top]],
+    }
@@ -0,0 +1,272 @@
+import functools
+import math
+import re
+import string
+
+import numpy as np
+import pandas as pd
+
+from data_loader import objective_keys
+from spec import CARD_SPEC, ORIENTATION_SPEC, STATUS_SPEC
+
+# Rendu HTML par lot : les cartes sont formatées colonne par colonne (une compréhension de liste par
+# colonne, sans les coûts fixes d'une opération pandas par champ) puis insérées dans un gabarit compilé,
+# au lieu d'un iterrows() + f-string par objectif.
+
+# Dérivés de la spécification (spec.py), utilisés par les points d'entrée
+CARD_FIELDS = {cle: colonne for cle, colonne, _ in CARD_SPEC}
+# Onglets des orientations : (titre de l'onglet, valeur "Orientation", icônes)
+APP_TABS = [(o["titre"], o["valeur"], o["icones"]) for o in ORIENTATION_SPEC]
+# Seuils de statut d'une orientation selon la moyenne d'atteinte des objectifs
+STATUS_THRESHOLDS = tuple((s["seuil"], s["message"]) for s in STATUS_SPEC if s["seuil"] is not None)
+STATUS_DEFAULT = next(s["message"] for s in STATUS_SPEC if s["seuil"] is None)
+
+
+def card_template(classes):
+    # Gabarit de carte compilé depuis CARD_SPEC ; même balisage pour l'application et les pages statiques,
+    # seules les classes CSS de la carte diffèrent. La mise en forme est dans CARD_CSS (une fois par page)
+    # pour que le balisage répété par objectif reste court ; les id / classes obj-* servent aussi aux
+    # mises à jour ciblées envoyées par le serveur (rechargement à chaud de app.py).
+    details = ''.join(f'<span>{libelle} : <span class="obj-{cle}">{{{cle}}}</span></span>'
+                      for cle, _, libelle in CARD_SPEC if libelle)
+    return (f'<div id="objectif-{{cle}}" class="{classes}">\n'
+            '<div class="obj-entete"><span class="obj-libelle">{libelle}</span><span class="obj-val">{val}%</span></div>\n'
+            f'<div class="obj-details">{details}</div>\n'
+            '<div class="obj-fond"><div class="obj-barre" style="width: {val}%;"></div></div>\n'
+            '<div class="obj-tendance">{tendance}</div>\n'
+            '<div class="obj-prevision">{prevision}</div>\n'
+            '</div>\n')
+
+
+# Carte de l'application Shiny (app.py, lean/app.py) et carte encadrée des pages statiques
+APP_CARD = card_template("obj-carte")
+STATIC_CARD = card_template("obj-carte card")
+CARD_CSS = """
+.obj-carte { margin-bottom: 45px; padding: 0 10px; }
+.card.obj-carte { margin-bottom: 18px; padding: 12px; }
+.obj-entete { display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 2.5px; }
+.obj-libelle { font-weight: 600; color: #333; font-size: 0.95rem; }
+.obj-val { font-weight: 600; color: #666; font-size: 0.9rem; }
+.obj-details { display: flex; justify-content: space-between; align-items: flex-end; margin-bottom: 5px; color: rgba(0, 0, 0, 0.6); font-size: 0.9em; line-height: 1.2; }
+.obj-fond { width: 100%; background-color: #f0f0f0; height: 12px; border-radius: 4px; overflow: hidden; }
+.obj-barre { background-color: #0aa6b6; height: 100%; border-radius: 4px; transition: width 1s ease-in-out; }
+.obj-tendance { color: rgba(0, 0, 0, 0.6); font-size: 0.85em; }
+.obj-tendance:empty { display: none; }
+.obj-prevision { color: rgba(0, 0, 0, 0.6); font-size: 0.85em; }
+.obj-prevision:empty { display: none; }
+.obj-synthese { color: rgba(0, 0, 0, 0.6); font-size: 0.9em; }
+.obj-progression { color: #0083cb; margin-bottom: 20px; }
+.obj-suite { text-align: center; margin-bottom: 20px; }
+"""
+
+# En-tête d'une orientation (moyenne, statut, synthèse), au-dessus de ses cartes ; les id servent aux
+# mises à jour ciblées de app.py
+ORIENTATION_HEADER = """<div class="section-header">{icones} Moyenne d'atteinte des objectifs pour cette orientation : <span id="moyenne-{numero}">{moyenne}</span> %</div>
+<p id="statut-{numero}" class="obj-statut">{statut}</p>
+<p id="synthese-{numero}" class="obj-synthese">{synthese}</p>
+<hr><h4 class="obj-progression">Progression par objectif</h4>
+"""
+
+# Ligne de résultat du panneau « Recherche » de app.py
+SEARCH_ROW = """
+<tr>
+  <td style="color: rgba(0, 0, 0, 0.6);">{onglet}</td><td>{libelle}</td><td style="text-align: right; font-weight: 600;">{val}%</td><td>{echeance}</td><td>{date_resultat}</td>
+</tr>
+"""
+
+# Ligne du tableau « Changements récents » des pages statiques (objectifs ajoutés, retirés ou modifiés,
+# voir changes.py)
+CHANGE_ROW = """
+<tr>
+  <td>{statut}</td><td>{cle}</td><td>{libelle}</td><td style="text-align: right;">{resultat}</td><td style="text-align: right;">{atteinte}</td><td style="color: rgba(0, 0, 0, 0.6);">{colonnes}</td>
+</tr>
+"""
+
+# Sparkline de progression (historique des instantanés, voir snapshots.py), en SVG en ligne
+SPARK_WIDTH = 120
+SPARK_HEIGHT = 24
+SPARKLINE = ('<svg class="sparkline" width="%d" height="%d" viewBox="0 0 %d %d" style="vertical-align: middle;">'
+             '<polyline fill="none" stroke="#0aa6b6" stroke-width="1.5" points="' % ((SPARK_WIDTH, SPARK_HEIGHT) * 2))
+
+
+ECHAPPEMENT_HTML = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+CLE_INVALIDE = re.compile(r'[^0-9A-Za-z_-]')
+
+
+def escape_html(s):
+    return (s.str.replace('&', '&amp;', regex=False)
+             .str.replace('<', '&lt;', regex=False)
+             .str.replace('>', '&gt;', regex=False))
+
+
+def text_column(df, col):
+    # Liste des valeurs affichées : manquantes vides, le reste formaté comme dans une f-string
+    if col not in df:
+        return [''] * len(df)
+    s = df[col]
+    manquantes = s.isna().to_numpy().tolist()
+    if pd.api.types.is_datetime64_any_dtype(s):
+        # Dates typées par le nettoyage : affichées au format du classeur (AAAA-MM-JJ)
+        valeurs = s.to_numpy(dtype='datetime64[D]').astype(str).tolist()
+    else:
+        valeurs = s.astype(object).tolist()
+    return ['' if manque else str(v).translate(ECHAPPEMENT_HTML) for v, manque in zip(valeurs, manquantes)]
+
+
+def card_columns(df):
+    # Colonnes affichées des cartes (une liste par champ du gabarit, dans l'ordre de df)
+    val = pd.to_numeric(df['atteinte_cible_pct'], errors='coerce').fillna(0).astype(int)
+    cols = {'val': val.astype(str).tolist()}
+    for key, col in CARD_FIELDS.items():
+        cols[key] = text_column(df, col)
+    # Tendance déjà mise en forme (snapshots.with_trends), insérée telle quelle
+    cols['tendance'] = df['tendance'].tolist() if 'tendance' in df else [''] * len(df)
+    cols['prevision'] = forecast_cells(df)
+    if "Numéro d'objectif" in df:
+        cols['cle'] = [CLE_INVALIDE.sub('-', cle) for cle in objective_keys(df).tolist()]
+    else:
+        cols['cle'] = df.index.astype(str).tolist()
+    return cols
+
+
+def sparkline_points(matrix, width=SPARK_WIDTH, height=SPARK_HEIGHT):
+    # Coordonnées des polylignes pour toute la matrice objectifs × instantanés en une passe :
+    # y est arrondi au dixième, ce qui permet de tirer chaque « x,y » d'une table précalculée
+    values = matrix.to_numpy(dtype='float64')
+    n = values.shape[1]
+    if n == 0:
+        return pd.Series('', index=matrix.index, dtype=object)
+    x = np.linspace(1, width - 1, n) if n > 1 else np.full(n, width / 2)
+    y = np.arange(10 * height + 1) / 10
+    table = np.array([[f'{xi:.1f},{yi:.1f}' for yi in y] + [''] for xi in x], dtype=object).reshape(n, -1)
+    dixiemes = np.rint(((height - 1) - np.clip(values, 0, 100) / 100 * (height - 2)) * 10)
+    dixiemes = np.where(np.isnan(values), len(y), dixiemes).astype(int)
+    coords = table[np.arange(n), dixiemes]
+    return pd.Series([' '.join(row).strip() for row in coords.tolist()], index=matrix.index, dtype=object)
+
+
+def trend_cells(trends, matrix):
+    # HTML de tendance par objectif (index : Numéro d'objectif) ; vide s'il y a moins de deux instantanés ;
+    # vitesse, achèvement prévu et retard sont affichés par forecast_cells : une seule projection par carte
+    points = sparkline_points(matrix).reindex(trends.index).fillna('')
+    texte = "Tendance sur " + trends['nb_instantanes'].astype(str) + " instantanés"
+    html = SPARKLINE + points + '"/></svg> <span>' + texte + '</span>'
+    return html.where((trends['nb_instantanes'] >= 2) & trends['vitesse_pts_an'].notna(), '')
+
+
+def forecast_cells(df):
+    # Prévision de chaque objectif (colonnes de forecast.py, pente de l'historique dès deux instantanés) :
+    # rythmes observé et requis, achèvement projeté et alerte si l'Échéance risque d'être manquée ;
+    # vide pour un objectif atteint ou sans résultat daté
+    if 'a_risque' not in df:
+        return [''] * len(df)
+    achevements = df['achevement_projete']
+    mois = achevements.to_numpy(dtype='datetime64[M]').astype(str).tolist()
+    cellules = []
+    for observe, requis, achevement, connu, risque in zip(df['rythme_observe_pts_an'].tolist(), df['rythme_requis_pts_an'].tolist(),
+                                                           mois, achevements.notna().tolist(), df['a_risque'].tolist()):
+        if observe != observe or requis == 0:  # sans rythme observé (NaN) ou cible déjà atteinte
+            cellules.append('')
+            continue
+        texte = f"Rythme observé\xa0: {observe:+.1f}\xa0pts/an"
+        if math.isfinite(requis):
+            texte += f" · requis\xa0: {requis:.1f}\xa0pts/an"
+        elif math.isinf(requis):
+            texte += " · échéance passée"
+        if connu:
+            texte += f" · achèvement projeté\xa0: {achevement}"
+        if risque:
+            texte += " ⚠️ à risque pour l'échéance"
+        cellules.append(texte)
+    return cellules
+
+
+def card_frame(df):
+    # Valeurs affichées de chaque carte, indexées par clé d'objectif (sert au diff des mises à jour)
+    cols = card_columns(df)
+    return pd.DataFrame(cols).set_index('cle')
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template):
+    # Gabarit « {champ} » compilé une seule fois en chaîne de formatage « % » et liste ordonnée des champs
+    parts = list(string.Formatter().parse(template))
+    fmt = ''.join(literal.replace('%', '%%') + ('%s' if field is not None else '') for literal, field, _, _ in parts)
+    return fmt, tuple(field for _, field, _, _ in parts if field is not None)
+
+
+def fill_rows(template, cols):
+    # Une chaîne par objectif : les colonnes déjà formatées (listes ou Series) sont insérées par le gabarit compilé
+    fmt, fields = compile_template(template)
+    return list(map(fmt.__mod__, zip(*(list(cols[field]) for field in fields))))
+
+
+def fill_template(template, cols):
+    return ''.join(fill_rows(template, cols))
+
+
+def render_cards(df, template=STATIC_CARD):
+    if df.empty:
+        return ''
+    return fill_template(template, card_columns(df))
+
+
+def render_orientation_cards(df, template=STATIC_CARD):
+    # {orientation : HTML de ses cartes} : les colonnes de tout le classeur sont formatées en une passe, au lieu
+    # d'un render_cards par orientation qui paierait chaque fois le coût fixe des opérations pandas
+    if df.empty:
+        return {}
+    cartes = fill_rows(template, card_columns(df))
+    positions = df.groupby('Orientation', sort=False, observed=True).indices
+    return {orientation: ''.join([cartes[i] for i in rangs]) for orientation, rangs in positions.items()}
+
+
+def render_orientation_header(numero, icones, moyenne, statut, synthese):
+    return ORIENTATION_HEADER.format(numero=numero, icones=icones, moyenne=moyenne, statut=statut, synthese=synthese)
+
+
+def render_search_results(df):
+    # Lignes du tableau de résultats du panneau « Recherche » de app.py (onglet de l'orientation en tête)
+    if df.empty:
+        return ''
+    cols = card_columns(df)
+    onglets = {orientation: titre for titre, orientation, _ in APP_TABS}
+    cols['onglet'] = escape_html(df['Orientation'].astype(str).map(onglets).fillna(''))
+    return fill_template(SEARCH_ROW, cols)
+
+
+def change_cell(avant, apres, ecart, unite=''):
+    # « avant → après (écart) » ; « — » pour la valeur absente d'un objectif ajouté ou retiré
+    def valeur(v):
+        return v.map('{:g}'.format).where(v.notna(), '—')
+    texte = valeur(avant.round(1)) + ' → ' + valeur(apres.round(1))
+    return texte + (' (' + ecart.round(1).map('{:+g}'.format) + unite + ')').where(ecart.notna(), '')
+
+
+def render_change_rows(changes, libelles):
+    # Lignes du tableau « Changements récents » ; changes : changes.diff_versions, libelles : libellé par clé
+    # (la clé tient lieu de libellé pour un objectif retiré d'un instantané enregistré sans libellé)
+    if changes.empty:
+        return ''
+    cles = changes.index.to_series()
+    cols = {
+        'statut': escape_html(changes['statut'].astype(str)),
+        'cle': escape_html(cles.astype(str)),
+        'libelle': escape_html(cles.map(libelles).fillna(cles).astype(str)),
+        'resultat': change_cell(changes['resultat_avant'], changes['resultat_apres'], changes['delta_resultat']),
+        'atteinte': change_cell(changes['atteinte_avant'], changes['atteinte_apres'], changes['delta_atteinte'], '\xa0pts'),
+        'colonnes': escape_html(changes['colonnes'].astype(str)),
+    }
+    return fill_template(CHANGE_ROW, cols)
+
+
+def orientation_status(moyenne):
+    for seuil, statut in STATUS_THRESHOLDS:
+        if moyenne > seuil:
+            return statut
+    return STATUS_DEFAULT
+
+
+def group_by_orientation(df):
+    # Un seul groupby au lieu d'un filtre booléen par orientation
+    return {orientation: df_o for orientation, df_o in df.groupby('Orientation', sort=False, observed=True)}
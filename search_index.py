@@ -0,0 +1,101 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Index de recherche des objectifs pour le panneau « Recherche » de app.py, construit une fois par
+# version des données (globals.py) : index inversé des mots du libellé (sans accents ni majuscules) et
+# index triés de l'atteinte de la cible et de l'Échéance. Une requête ne parcourt que les entrées qui
+# correspondent, jamais le tableau complet des objectifs.
+
+LIBELLE = "Libellé de l'objectif"
+MOT = re.compile(r"[a-z0-9]+")
+# Ligatures que la décomposition Unicode ne sépare pas
+LIGATURES = str.maketrans({"œ": "oe", "Œ": "oe", "æ": "ae", "Æ": "ae"})
+# Borne supérieure du vocabulaire ([a-z0-9]) : tous les mots commençant par p sont < p + FIN_PREFIXE
+FIN_PREFIXE = "{"
+
+
+def fold(text):
+    # Minuscules sans accents (« Échéance » -> « echeance »), pour l'index comme pour les requêtes
+    text = unicodedata.normalize("NFKD", text.translate(LIGATURES))
+    return text.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def fold_series(s):
+    return (s.astype(object).where(s.notna(), "").astype(str).str.translate(LIGATURES).str.normalize("NFKD")
+             .str.encode("ascii", "ignore").str.decode("ascii").str.lower())
+
+
+def _intersect(petit, grand):
+    # Éléments de petit présents dans grand (tous deux croissants), par dichotomie dans grand :
+    # coût proportionnel à len(petit)
+    rangs = np.searchsorted(grand, petit)
+    trouves = rangs < len(grand)
+    trouves[trouves] = grand[rangs[trouves]] == petit[trouves]
+    return petit[trouves]
+
+
+def _sorted_index(values):
+    # (valeurs croissantes, positions correspondantes), valeurs manquantes exclues
+    values = np.asarray(values)
+    positions = np.flatnonzero(~pd.isna(values))
+    ordre = positions[np.argsort(values[positions], kind="stable")]
+    return values[ordre], ordre
+
+
+class SearchIndex:
+    def __init__(self, df):
+        self.df = df
+        # Index inversé : paires (mot, position) triées, donc les positions d'un même mot et celles de
+        # tous les mots d'un même préfixe sont contiguës
+        mots = fold_series(df[LIBELLE]).reset_index(drop=True).str.findall(MOT).explode().dropna()
+        paires = pd.DataFrame({"mot": mots.to_numpy(dtype=object), "position": mots.index.to_numpy(np.int64)})
+        paires = paires.drop_duplicates().sort_values(["mot", "position"], kind="stable")
+        self.vocabulaire, debuts = np.unique(paires["mot"].to_numpy(dtype=object), return_index=True)
+        self.debuts = np.append(debuts, len(paires))
+        self.positions = paires["position"].to_numpy(np.int64)
+        # Valeurs par position (filtres appliqués aux candidats) et index triés (bornes par dichotomie)
+        self.atteinte = df["atteinte_cible_pct"].to_numpy(dtype="float64")
+        self.echeance = pd.to_datetime(df["Échéance"], errors="coerce").to_numpy()
+        self.atteinte_triee = _sorted_index(self.atteinte)
+        self.echeance_triee = _sorted_index(self.echeance)
+
+    def word_matches(self, prefixe):
+        # Positions (croissantes) des libellés contenant un mot qui commence par prefixe
+        debut, fin = np.searchsorted(self.vocabulaire, [prefixe, prefixe + FIN_PREFIXE])
+        positions = self.positions[self.debuts[debut]:self.debuts[fin]]
+        # Un seul mot : ses positions sont déjà croissantes et uniques (vue, sans copie)
+        return positions if fin - debut <= 1 else np.unique(positions)
+
+    def query(self, texte="", atteinte=None, echeance=None):
+        # Positions (ordre de la feuille) des objectifs qui satisfont tous les critères : chaque mot du
+        # texte comme préfixe d'un mot du libellé, atteinte et Échéance dans les bornes (incluses) données.
+        # Une plage qui couvre toutes les valeurs indexées n'est pas un filtre. None si aucun critère actif.
+        if echeance is not None:
+            echeance = tuple(np.datetime64(pd.Timestamp(borne)) for borne in echeance)
+        plages = []
+        for valeurs, (triees, ordre), bornes in ((self.atteinte, self.atteinte_triee, atteinte),
+                                                 (self.echeance, self.echeance_triee, echeance)):
+            if bornes is None or not len(triees):
+                continue
+            debut, fin = np.searchsorted(triees, bornes[0], "left"), np.searchsorted(triees, bornes[1], "right")
+            if debut > 0 or fin < len(triees):
+                plages.append((fin - debut, valeurs, bornes, ordre[debut:fin]))
+        mots = MOT.findall(fold(texte))
+        if not mots and not plages:
+            return None
+
+        if mots:
+            candidats = None
+            for correspondances in sorted((self.word_matches(mot) for mot in mots), key=len):
+                candidats = correspondances if candidats is None else _intersect(candidats, correspondances)
+        else:
+            # Sans texte : la plage la plus étroite fournit les candidats, les autres les filtrent
+            plages.sort(key=lambda plage: plage[0])
+            candidats = np.sort(plages.pop(0)[3])
+        for _, valeurs, (bas, haut), _ in plages:
+            retenues = valeurs[candidats]
+            candidats = candidats[(retenues >= bas) & (retenues <= haut)]
+        return candidats
@@ -0,0 +1,167 @@
+import argparse
+import gzip
+import hashlib
+import io
+import re
+import urllib.request
+from pathlib import Path
+
+from staging import replace_file
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip copies are written without it
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # optional: the logo is then vendored as-is
+    Image = None
+
+# Asset stage of the static export: one content-hashed stylesheet shared by every page, the logo and
+# Creative Commons icons vendored from assets/ and optimised, and gzip/brotli precompressed copies next
+# to each text file, so servers can send them as-is. Exports never touch the network: the local copies
+# are downloaded on request only (python site_assets.py, or --vendor-assets on the exporters).
+
+ROOT = Path(__file__).parent
+ASSETS_DIR = ROOT / "assets"
+ASSET_PREFIX = "assets"
+ASSET_URLS = {
+    'logo': "https://obvfleuvestjean.com/wp-content/uploads/2026/01/LogoOBV_ContourBlanc.png",
+    'cc': "https://mirrors.creativecommons.org/presskit/icons/cc.svg",
+    'by': "https://mirrors.creativecommons.org/presskit/icons/by.svg",
+    'nc': "https://mirrors.creativecommons.org/presskit/icons/nc.svg",
+    'sa': "https://mirrors.creativecommons.org/presskit/icons/sa.svg",
+}
+LOGO_HEIGHT = 128  # twice the 64px of .header img, for high-DPI screens
+# PNG is already compressed: precompressing it only costs space
+PRECOMPRESS_SUFFIXES = ('.html', '.css', '.svg', '.js', '.json')
+
+
+def asset_path(url, assets_dir=ASSETS_DIR):
+    return Path(assets_dir) / url.rsplit('/', 1)[-1]
+
+
+def vendor_asset(url, assets_dir=ASSETS_DIR):
+    # Local copy of a remote asset, or None when it has not been downloaded (the page keeps hotlinking the URL)
+    path = asset_path(url, assets_dir)
+    return path if path.exists() else None
+
+
+def download_assets(assets_dir=ASSETS_DIR, timeout=10):
+    # Downloads the missing local copies, which can then be committed with the repo. Each file is replaced
+    # atomically: a parallel export (export_batch.py) never reads a half-written asset.
+    # Returns the URLs that could not be downloaded.
+    failed = []
+    for url in ASSET_URLS.values():
+        path = asset_path(url, assets_dir)
+        if path.exists():
+            continue
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                data = response.read()
+        except OSError as exc:
+            print(f"Could not vendor {url} ({exc}); it stays hotlinked")
+            failed.append(url)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        replace_file(path, data)
+    return failed
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};,])\s*', r'\1', css).strip()
+
+
+def optimise_svg(data):
+    # Drops the XML prolog, comments, metadata and the whitespace between tags
+    svg = data.decode('utf-8')
+    svg = re.sub(r'<\?xml.*?\?>|<!--.*?-->|<metadata.*?</metadata>', '', svg, flags=re.S)
+    svg = re.sub(r'>\s+<', '><', svg)
+    return svg.strip().encode('utf-8')
+
+
+def optimise_png(data, height=LOGO_HEIGHT):
+    if Image is None:
+        return data
+    image = Image.open(io.BytesIO(data))
+    if image.height > height:
+        image = image.resize((round(image.width * height / image.height), height), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format='PNG', optimize=True)
+    return min(data, out.getvalue(), key=len)
+
+
+def hashed_name(stem, suffix, data):
+    return f"{ASSET_PREFIX}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{suffix}"
+
+
+def build_assets(css, assets_dir=ASSETS_DIR):
+    # Returns (hrefs, files): the URL of each asset as used by the pages, and the files to publish
+    files = {}
+    data = minify_css(css).encode('utf-8')
+    hrefs = {'css': hashed_name('site', '.css', data)}
+    files[hrefs['css']] = data
+    for key, url in ASSET_URLS.items():
+        source = vendor_asset(url, assets_dir)
+        if source is None:
+            hrefs[key] = url
+            continue
+        data = source.read_bytes()
+        if source.suffix == '.svg':
+            data = optimise_svg(data)
+        elif source.suffix == '.png':
+            data = optimise_png(data)
+        hrefs[key] = hashed_name(source.stem, source.suffix, data)
+        files[hrefs[key]] = data
+    return hrefs, files
+
+
+def write_assets(outdir, files):
+    # Content-hashed names never change content: existing files are kept, superseded ones removed
+    outdir = Path(outdir)
+    written = []
+    (outdir / ASSET_PREFIX).mkdir(parents=True, exist_ok=True)
+    current = {Path(name).name + suffix for name in files for suffix in ('', '.gz', '.br')}
+    for old in (outdir / ASSET_PREFIX).iterdir():
+        if old.is_file() and old.name not in current:
+            old.unlink()
+    for name, data in files.items():
+        if not (outdir / name).exists():
+            replace_file(outdir / name, data)
+            written.append(name)
+    return written
+
+
+def precompress(path):
+    path = Path(path)
+    data = path.read_bytes()
+    replace_file(path.with_name(path.name + '.gz'), gzip.compress(data, 9, mtime=0))
+    if brotli is not None:
+        replace_file(path.with_name(path.name + '.br'), brotli.compress(data, quality=11))
+
+
+def precompress_site(outdir, written):
+    # Compressed copies for the files written by this build and for any text file still missing one
+    outdir = Path(outdir)
+    written = {outdir / name for name in written}
+    count = 0
+    for path in list(outdir.glob('*')) + list((outdir / ASSET_PREFIX).glob('*')):
+        if not path.is_file() or path.suffix not in PRECOMPRESS_SUFFIXES or path.name.startswith('.'):
+            continue
+        missing = not path.with_name(path.name + '.gz').exists() or (
+            brotli is not None and not path.with_name(path.name + '.br').exists())
+        if path in written or missing:
+            precompress(path)
+            count += 1
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Download the logo and Creative Commons icons into assets/")
+    parser.add_argument('--assets', type=Path, default=ASSETS_DIR, help="local copies directory (default: %(default)s)")
+    args = parser.parse_args()
+    missing = download_assets(args.assets)
+    print(f"{len(ASSET_URLS) - len(missing)}/{len(ASSET_URLS)} asset(s) available in {args.assets}")
@@ -0,0 +1,147 @@
+import argparse
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from cleaning import clean_objectives
+from forecast import HORIZON_JOURS, JOURS_PAR_AN, with_history
+from cache_store import read_cache, write_cache
+from data_loader import DATAFILE, ROOT, objective_keys, read_extraction_date, read_workbook
+from rendering import trend_cells
+
+# Historique des exportations successives du classeur : un fichier par date d'extraction, réécrit
+# seulement si le classeur de cette date est modifié ou réexporté (la dernière version de la date l'emporte). Les lignes sont indexées par (Numéro d'objectif, instantané) et les
+# requêtes de tendance (progression, vitesse, achèvement prévu) sont vectorisées sur tout l'historique.
+
+HISTORY_DIR = Path(os.environ.get("PDE_HISTORY", ROOT / "historique"))
+KEY = "Numéro d'objectif"
+SNAPSHOT = "instantane"
+LIBELLE = "Libellé de l'objectif"
+# Colonnes conservées par instantané (déjà typées par le nettoyage). Le libellé permet de nommer les objectifs
+# retirés du classeur ; les instantanés enregistrés avant son ajout ne l'ont pas (relu vide)
+SNAPSHOT_COLUMNS = ["atteinte_cible_pct", "Résultat", "Date du résultat", "Échéance", LIBELLE]
+ORIGINE = pd.Timestamp("2000-01-01")
+
+
+def snapshot_frame(df, snapshot=None):
+    # Vue compacte d'un classeur nettoyé pour l'historique ; snapshot par défaut : sa date d'extraction
+    snapshot = pd.Timestamp(snapshot if snapshot is not None else df.attrs["extraction"])
+    out = pd.DataFrame({KEY: objective_keys(df).to_numpy(), SNAPSHOT: snapshot})
+    for col in SNAPSHOT_COLUMNS:
+        out[col] = df[col].to_numpy() if col in df else None
+    out["Résultat"] = pd.to_numeric(out["Résultat"], errors="coerce")
+    return out
+
+
+def _snapshot_base(store, snapshot):
+    return Path(store) / f"instantane-{pd.Timestamp(snapshot):%Y-%m-%d}"
+
+
+def append_snapshot(df, snapshot=None, store=HISTORY_DIR):
+    # Ajoute l'instantané, ou le remplace si le classeur de la même date d'extraction a changé depuis ;
+    # retourne le fichier écrit, ou None si l'instantané enregistré est identique
+    frame = snapshot_frame(df, snapshot)
+    snapshot = frame[SNAPSHOT].iloc[0] if len(frame) else pd.Timestamp(snapshot or df.attrs["extraction"])
+    base = _snapshot_base(store, snapshot)
+    anciens = list(base.parent.glob(f"{base.name}.*"))
+    if len(anciens) == 1 and read_cache(anciens[0]).equals(frame):
+        return None
+    Path(store).mkdir(parents=True, exist_ok=True)
+    path = write_cache(frame, base)
+    # Version précédente enregistrée dans un autre format (ex. pickle sans pyarrow)
+    for ancien in anciens:
+        if ancien != path:
+            ancien.unlink(missing_ok=True)
+    return path
+
+
+def ingest_workbook(datafile, store=HISTORY_DIR):
+    # Ajout d'une ancienne exportation du classeur (rattrapage de l'historique)
+    df, _ = clean_objectives(read_workbook(datafile))
+    return append_snapshot(df, read_extraction_date(datafile), store)
+
+
+def load_history(store=HISTORY_DIR, current=None):
+    # Historique complet indexé par (Numéro d'objectif, instantané) ; current (classeur chargé) remplace
+    # en mémoire l'instantané de sa date d'extraction, enregistré ou non : le dernier point des tendances
+    # est toujours celui des cartes
+    store = Path(store)
+    paths = sorted(store.glob("instantane-*.*")) if store.exists() else []
+    if current is not None:
+        base = _snapshot_base(store, current.attrs["extraction"])
+        paths = [path for path in paths if path.with_suffix("") != base]
+    frames = [read_cache(path) for path in paths]
+    if current is not None:
+        frames.append(snapshot_frame(current))
+    if not frames:
+        frames = [snapshot_frame(pd.DataFrame(columns=[KEY]), ORIGINE)]
+    history = pd.concat(frames, ignore_index=True)
+    history["atteinte_cible_pct"] = history["atteinte_cible_pct"].astype("float32")
+    return history.set_index([KEY, SNAPSHOT]).sort_index()
+
+
+def progress_matrix(history):
+    # Objectifs × instantanés (pourcentage d'atteinte), pour les sparklines
+    return history["atteinte_cible_pct"].unstack(SNAPSHOT)
+
+
+def trend_table(history):
+    # Par objectif : nombre d'instantanés, dernière atteinte, vitesse (points de % par an, régression
+    # linéaire sur tous les instantanés), date d'achèvement prévue et retard par rapport à l'Échéance
+    h = history.reset_index()
+    x = (h[SNAPSHOT] - ORIGINE).dt.days.astype("float64")
+    y = h["atteinte_cible_pct"].astype("float64")
+    x = x.where(y.notna())
+    sommes = pd.DataFrame({"n": y.notna().astype("int64"), "x": x, "y": y, "xx": x * x, "xy": x * y}).groupby(
+        h[KEY], sort=False).sum()
+    denominateur = sommes["n"] * sommes["xx"] - sommes["x"] ** 2
+    pente = (sommes["n"] * sommes["xy"] - sommes["x"] * sommes["y"]) / denominateur.where(denominateur > 0)
+
+    derniers = h.groupby(KEY, sort=False)[[SNAPSHOT, "atteinte_cible_pct", "Échéance"]].last()
+    restant = (100 - derniers["atteinte_cible_pct"].astype("float64")).clip(lower=0)
+    jours = (restant / pente.where(pente > 0)).where(restant > 0, 0)
+    jours = jours.where(jours <= HORIZON_JOURS)  # progression trop lente : pas d'achèvement prévisible
+    achevement = derniers[SNAPSHOT] + pd.to_timedelta(jours.round(), unit="D")
+    echeance = pd.to_datetime(derniers["Échéance"], errors="coerce")
+    en_retard = (restant > 0) & (achevement.isna() | (achevement > echeance))
+
+    return pd.DataFrame({
+        "nb_instantanes": sommes["n"],
+        "dernier_instantane": derniers[SNAPSHOT],
+        "atteinte": derniers["atteinte_cible_pct"],
+        "vitesse_pts_an": pente * JOURS_PAR_AN,
+        "achevement_prevu": achevement,
+        "echeance": echeance,
+        "en_retard": en_retard.where(echeance.notna(), False),
+    })
+
+
+def with_trends(df, history):
+    # Ajoute la colonne « tendance » (sparkline + résumé HTML) utilisée par les gabarits de cartes et, pour les
+    # objectifs suivis sur au moins deux instantanés, la projection tirée de l'historique (forecast.with_history)
+    # Copie superficielle (copy-on-write) : les colonnes du cache projeté en mémoire ne sont pas recopiées
+    out = df.copy(deep=False)
+    trends = trend_table(history)
+    cles = objective_keys(df)
+    out["tendance"] = cles.map(trend_cells(trends, progress_matrix(history))).fillna("").to_numpy()
+    # Instantanés pris en compte : les décomptes « à risque » de la synthèse en dépendent (summary.load_summary)
+    instantanes = history.index.get_level_values(SNAPSHOT).unique()
+    out.attrs["historique"] = f"{len(instantanes)}-{instantanes.max():%Y-%m-%d}" if len(instantanes) else ""
+    return with_history(out, trends, cles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajoute des exportations du classeur à l'historique des instantanés")
+    parser.add_argument("classeurs", type=Path, nargs="*", default=[DATAFILE])
+    parser.add_argument("--historique", type=Path, default=HISTORY_DIR)
+    args = parser.parse_args()
+    for classeur in args.classeurs:
+        path = ingest_workbook(classeur, args.historique)
+        print(f"{classeur} : " + (f"ajouté ({path.name})" if path else "instantané déjà présent"))
+    history = load_history(args.historique)
+    print(f"{len(history)} lignes, {history.index.get_level_values(SNAPSHOT).nunique()} instantané(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Spécification déclarative du tableau de bord, seule source des orientations, des seuils de statut et
+# des champs des cartes d'objectifs. rendering.py la compile une fois en gabarits (cartes, en-tête
+# d'orientation) partagés par app.py, export_static.py, export_client.py et l'application allégée.
+
+# Orientations, dans l'ordre des onglets et des pages
+ORIENTATION_SPEC = [
+    {
+        "numero": 1,
+        "valeur": "1 - Éviter la dégradation de la qualité de l'eau",  # valeur de la colonne "Orientation"
+        "titre": "1. Qualité de l'eau",  # onglet de app.py et lien de navigation des pages statiques
+        "icones": "💧🌊",
+    },
+    {
+        "numero": 2,
+        "valeur": "2 - Ralentir l'eutrophisation des lacs",
+        "titre": "2. Eutrophisation des lacs",
+        "icones": "🦠🏞️",
+    },
+    {
+        "numero": 3,
+        "valeur": "3 - Limiter la prolifération des espèces exotiques envahissantes",
+        "titre": "3. Espèces exotiques envahissantes",
+        "icones": "🌾🦪",
+    },
+    {
+        "numero": 4,
+        "valeur": "4 - Freiner la perte d'habitat faunique",
+        "titre": "4. Habitats fauniques",
+        "icones": "🐟🦎",
+    },
+    {
+        "numero": 5,
+        "valeur": "5 - Éviter la destruction ou la dégradation de la qualité des milieux humides et hydriques",
+        "titre": "5. Milieux humides et hydriques",
+        "icones": "🌿🦆",
+    },
+]
+
+# Statut d'une orientation selon la moyenne d'atteinte de ses objectifs (premier seuil dépassé),
+# et compartiment correspondant de chaque objectif dans le tableau de synthèse (summary.py)
+STATUS_SPEC = [
+    {"seuil": 70, "message": "✅ Les objectifs sont en bonne voie d'être atteints.",
+     "colonne": "nb_bonne_voie", "libelle": "en bonne voie"},
+    {"seuil": 30, "message": "⚠️ Des efforts constants sont encore requis.",
+     "colonne": "nb_efforts", "libelle": "efforts requis"},
+    {"seuil": None, "message": "🚨 Priorité élevée : phase de planification.",
+     "colonne": "nb_priorite", "libelle": "priorité élevée"},
+]
+
+# Champs des cartes d'objectifs : (clé du gabarit, colonne du classeur nettoyé, libellé affiché ou None
+# pour les champs placés ailleurs dans la carte), dans l'ordre d'affichage des détails
+CARD_SPEC = [
+    ("libelle", "Libellé de l'objectif", None),
+    ("reference", "Valeur(référence)", "Valeur de référence"),
+    ("cible", "Cible - valeur numérique", "Cible"),
+    ("resultat", "Résultat", "Valeur au dernier suivi"),
+    ("date_resultat", "Date du résultat", "Suivi le"),
+    ("echeance", "Échéance", "Échéance"),
+]
@@ -0,0 +1,114 @@
+import ctypes
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+# Publication d'un dossier de sortie (docs/) : tout est écrit dans un dossier de préparation voisin,
+# propre à chaque processus (build.py et export_static.py peuvent préparer docs/ en même temps), puis
+# mis à la place du dossier publié. L'échange n'est atomique que sous Linux (renameat2) : le site servi
+# n'y est jamais vide ni à moitié écrit. Ailleurs (Windows, macOS), il n'existe pas d'échange atomique
+# de deux dossiers : docs/ est renommé puis remplacé, et reste absent entre ces deux renommages.
+
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+# Windows refuse de renommer un dossier dont un fichier est ouvert (antivirus, indexation, serveur) :
+# le renommage est retenté quelques fois avant d'abandonner
+ESSAIS_RENOMMAGE = 5
+PAUSE_RENOMMAGE = 0.2
+
+
+def _previous_path(staging):
+    # Ancien dossier publié, mis de côté le temps du remplacement ; voisin de staging, donc unique lui aussi
+    return staging.with_name(staging.name.replace(".staging-", ".previous-", 1))
+
+
+def _link_or_copy(src, dst):
+    # Lien physique (rapide, conserve la date de modification) ; copie si le système de fichiers le refuse
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def stage_directory(outdir, keep_existing=True):
+    # Crée un dossier de préparation au nom unique à côté de outdir (même système de fichiers, donc simples
+    # renommages) ; keep_existing le remplit de liens physiques vers le site actuel. Un fichier lié ne doit
+    # jamais être réécrit sur place (voir replace_file) : il est partagé avec le site servi.
+    outdir = Path(outdir)
+    outdir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{outdir.name}.staging-", dir=outdir.parent))
+    # mkdtemp crée un dossier privé (0700) : docs/ doit rester lisible par le serveur une fois échangé
+    if outdir.exists():
+        shutil.copymode(outdir, staging)
+    else:
+        os.chmod(staging, 0o755)
+    if keep_existing and outdir.exists():
+        shutil.copytree(outdir, staging, copy_function=_link_or_copy, symlinks=True, dirs_exist_ok=True)
+    return staging
+
+
+def link_missing(source, staging):
+    # Complète staging avec les fichiers de source qu'il ne contient pas encore
+    source = Path(source)
+    if not source.exists():
+        return
+    for path in source.rglob("*"):
+        cible = staging / path.relative_to(source)
+        if path.is_file() and not cible.exists():
+            cible.parent.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(path, cible)
+
+
+def replace_file(path, content):
+    # Fichier temporaire puis os.replace : nouvel inode (un éventuel lien physique vers le site servi
+    # n'est pas modifié) et remplacement atomique ; content : texte ou octets
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if isinstance(content, bytes):
+        tmp.write_bytes(content)
+    else:
+        tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _exchange(a, b):
+    # Échange atomique de deux chemins (Linux : renameat2 avec RENAME_EXCHANGE) ; False si indisponible
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError, TypeError):
+        return False
+    return renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0
+
+
+def _rename(src, dst):
+    for essai in range(ESSAIS_RENOMMAGE):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if essai == ESSAIS_RENOMMAGE - 1:
+                raise
+            time.sleep(PAUSE_RENOMMAGE)
+
+
+def swap_directory(staging, outdir):
+    # Met staging en place. Sous Linux, échange atomique des deux dossiers. Ailleurs, outdir est mis de côté
+    # puis remplacé par deux renommages consécutifs (outdir est absent entre les deux) ; si le second
+    # échoue, l'ancien outdir est remis en place et l'erreur remonte.
+    staging, outdir = Path(staging), Path(outdir)
+    if outdir.exists() and _exchange(staging, outdir):
+        shutil.rmtree(staging)
+        return
+    if not outdir.exists():
+        _rename(staging, outdir)
+        return
+    previous = _previous_path(staging)
+    _rename(outdir, previous)
+    try:
+        _rename(staging, outdir)
+    except OSError:
+        os.replace(previous, outdir)
+        raise
+    shutil.rmtree(previous, ignore_errors=True)
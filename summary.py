@@ -0,0 +1,112 @@
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from cache_store import meta_file, read_cache, read_meta, remove_cache, write_cache, write_meta
+from data_loader import CACHE_DIR, DATAFILE
+from rendering import STATUS_THRESHOLDS, orientation_status
+from spec import STATUS_SPEC
+
+# Tableau de synthèse par orientation (moyenne, médiane, nombre d'objectifs, répartition par statut,
+# objectifs en retard sur l'Échéance ou à risque de la manquer (forecast.py), dernier résultat),
+# calculé en une seule agrégation sur tout le classeur puis enregistré à côté du cache des données. app.py, export_static.py et la charge utile
+# de l'application allégée le lisent au lieu de reparcourir les objectifs à chaque rendu.
+
+# Répartition des objectifs selon les mêmes seuils que le statut d'une orientation (spec.py)
+STATUS_BUCKETS = tuple((s["colonne"], s["libelle"]) for s in STATUS_SPEC)
+SUMMARY_COLUMNS = ["nb_objectifs", "moyenne", "moyenne_affichee", "mediane", *(col for col, _ in STATUS_BUCKETS),
+                   "nb_en_retard", "nb_a_risque", "dernier_resultat", "statut"]
+
+
+def status_bucket(pct):
+    # Indice du compartiment de statut de chaque objectif (0 : premier seuil dépassé, ..., dernier : défaut)
+    codes = pd.Series(len(STATUS_THRESHOLDS), index=pct.index)
+    for i, (seuil, _) in reversed(list(enumerate(STATUS_THRESHOLDS))):
+        codes = codes.mask(pct > seuil, i)
+    return codes
+
+
+def orientation_summary(df, today=None):
+    # Une ligne par orientation ; today (date du jour par défaut) sert au décompte des retards
+    today = pd.Timestamp(today or date.today()).normalize()
+    pct = df["atteinte_cible_pct"]
+    codes = status_bucket(pct)
+    travail = pd.DataFrame({
+        "pct": pct,
+        "en_retard": (pd.to_datetime(df["Échéance"], errors="coerce") < today) & (pct < 100),
+        "date": pd.to_datetime(df["Date du résultat"], errors="coerce"),
+        "a_risque": df["a_risque"] if "a_risque" in df else False,
+    })
+    for i, (col, _) in enumerate(STATUS_BUCKETS):
+        travail[col] = codes == i
+    summary = travail.groupby(df["Orientation"].astype(str), sort=False).agg(
+        nb_objectifs=("pct", "size"),
+        moyenne=("pct", "mean"),
+        mediane=("pct", "median"),
+        **{col: (col, "sum") for col, _ in STATUS_BUCKETS},
+        nb_en_retard=("en_retard", "sum"),
+        nb_a_risque=("a_risque", "sum"),
+        dernier_resultat=("date", "max"),
+    )
+    # Moyenne tronquée à l'entier, telle qu'affichée dans les pages et l'application
+    summary["moyenne_affichee"] = summary["moyenne"].fillna(0).astype(int)
+    summary["statut"] = summary["moyenne_affichee"].map(orientation_status)
+    summary.index.name = "Orientation"
+    return summary[SUMMARY_COLUMNS]
+
+
+def summary_row(summary, orientation):
+    # Ligne d'une orientation sous forme de dict ; valeurs neutres si elle n'a aucun objectif
+    if orientation in summary.index:
+        return summary.loc[orientation].to_dict()
+    vide = {col: 0 for col in SUMMARY_COLUMNS}
+    vide.update(moyenne=float("nan"), mediane=float("nan"), dernier_resultat=pd.NaT, statut=orientation_status(0))
+    return vide
+
+
+def load_summary(df, datafile=None, cache_dir=CACHE_DIR, today=None):
+    # Synthèse de la version chargée, relue depuis le cache si elle a été calculée le même jour
+    # (le décompte des retards dépend de la date du jour) et sur le même historique d'instantanés (le
+    # décompte « à risque » suit la pente de l'historique, snapshots.with_trends) ; recalculée et enregistrée sinon
+    datafile = Path(datafile or DATAFILE)
+    cache_dir = Path(cache_dir)
+    jour = pd.Timestamp(today or date.today()).strftime("%Y-%m-%d")
+    meta_path = meta_file(datafile, cache_dir)
+    meta = read_meta(meta_path)
+    version = df.attrs.get("version")
+    historique = df.attrs.get("historique", "")
+    info = meta.get("summary") or {}
+    cached = cache_dir / info["file"] if info.get("file") else None
+    if (cached is not None and cached.exists() and info.get("date") == jour
+            and info.get("version") == version and version is not None
+            and info.get("historique", "") == historique):
+        return read_cache(cached).set_index("Orientation")
+
+    summary = orientation_summary(df, jour)
+    if version is None or meta.get("sha256") != version:
+        return summary  # données hors cache (ex. benchmarks) : rien à enregistrer
+    path = write_cache(summary.reset_index(), cache_dir / f"{datafile.stem}-{version[:16]}-synthese", shared=True)
+    # Synthèses des versions précédentes du classeur
+    for ancien in cache_dir.glob(f"{datafile.stem}-*-synthese.*"):
+        if ancien != path:
+            remove_cache(ancien)
+    meta["summary"] = {"file": path.name, "date": jour, "version": version, "historique": historique}
+    write_meta(meta_path, meta)
+    return summary
+
+
+def summary_line(resume):
+    # Ligne de synthèse affichée sous le statut de l'orientation (pages statiques et application)
+    if not resume["nb_objectifs"]:
+        return ""
+    parties = [
+        f"{resume['nb_objectifs']} objectif(s)",
+        f"médiane {int(resume['mediane'])}\xa0%",
+        ", ".join(f"{resume[col]} {libelle}" for col, libelle in STATUS_BUCKETS),
+        f"{resume['nb_en_retard']} en retard sur l'échéance",
+        f"{resume['nb_a_risque']} à risque de la manquer",
+    ]
+    if pd.notna(resume["dernier_resultat"]):
+        parties.append(f"dernier résultat\xa0: {pd.Timestamp(resume['dernier_resultat']):%Y-%m-%d}")
+    return " · ".join(parties)
@@ -0,0 +1,25 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# Cache des objectifs hors du dépôt : data_loader lit PDE_CACHE_DIR à son import, avant celui des tests
+CACHE_TESTS = tempfile.mkdtemp(prefix="pde-tests-cache-")
+os.environ["PDE_CACHE_DIR"] = CACHE_TESTS
+atexit.register(shutil.rmtree, CACHE_TESTS, ignore_errors=True)
+
+
+@pytest.fixture
+def classeur(tmp_path):
+    # Classeur synthétique de 47 objectifs (benchmarks/generate_workbook.py), taille du classeur réel
+    from generate_workbook import generate
+
+    return generate(tmp_path / "classeurs", n_objectives=47)[0]
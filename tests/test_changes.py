@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from changes import change_counts, change_labels, diff_versions, workbook_version
+from snapshots import LIBELLE
+
+
+def version(numeros, libelles, resultats, atteintes):
+    # Classeur nettoyé minimal ; « Numéro d'objectif » lu comme un nombre, comme le fait Excel
+    return workbook_version(pd.DataFrame({
+        "Numéro d'objectif": numeros,
+        LIBELLE: libelles,
+        "Résultat": resultats,
+        "atteinte_cible_pct": np.array(atteintes, dtype=np.float32),
+    }))
+
+
+def test_workbook_version_keeps_duplicate_keys_apart():
+    # 1.1 et 1.10 sont tous deux lus 1.1 : le second reçoit un suffixe d'occurrence
+    ancien = version([1.1, 1.1, 1.2], ["a", "b", "c"], [1, 2, 3], [10, 20, 30])
+    assert ancien.index.tolist() == ["1.1", "1.1#2", "1.2"]
+
+
+def test_diff_versions_added_removed_changed():
+    ancien = version([1.1, 1.1, 1.2, 2.1], ["a", "b", "c", "d"], [10, 20, 30, 40], [10, 20, 30, 40])
+    # « 1.10 » (1.1#2) progresse, 1.2 est retiré, 3.1 est ajouté ; 1.1 et 2.1 sont inchangés
+    nouveau = version([1.1, 1.1, 2.1, 3.1], ["a", "b", "d", "e"], [10, 25, 40, 5], [10, 25, 40, 5])
+
+    changes = diff_versions(ancien, nouveau)
+
+    # Ordre de la nouvelle feuille, objectifs retirés à la fin
+    assert changes.index.tolist() == ["1.1#2", "3.1", "1.2"]
+    assert changes["statut"].tolist() == ["modifié", "ajouté", "retiré"]
+    assert change_counts(changes) == {"modifié": 1, "ajouté": 1, "retiré": 1}
+
+    modifie = changes.loc["1.1#2"]
+    assert (modifie["resultat_avant"], modifie["resultat_apres"], modifie["delta_resultat"]) == (20, 25, 5)
+    assert modifie["delta_atteinte"] == 5
+    # Colonne dérivée rapportée sous le nom de sa colonne d'origine
+    assert modifie["colonnes"] == "Résultat, Pourcentage d'atteinte de la cible"
+
+    assert np.isnan(changes.loc["3.1", "resultat_avant"]) and changes.loc["3.1", "resultat_apres"] == 5
+    assert changes.loc["1.2", "resultat_avant"] == 30 and np.isnan(changes.loc["1.2", "resultat_apres"])
+    assert changes.loc[["3.1", "1.2"], "colonnes"].tolist() == ["", ""]
+
+    # Les objectifs retirés gardent leur ancien libellé
+    libelles = change_labels(ancien, nouveau)
+    assert libelles["1.2"] == "c" and libelles["3.1"] == "e"
+
+
+def test_diff_versions_ignores_equal_values_of_other_types():
+    # Mêmes valeurs, entières dans un classeur et réelles dans l'autre : aucune différence
+    ancien = version([1.1, 1.2], ["a", "b"], [10, 20], [10, 20])
+    nouveau = version([1.1, 1.2], ["a", "b"], [10.0, 20.0], [10, 20])
+    changes = diff_versions(ancien, nouveau)
+    assert changes.empty
+    assert change_counts(changes) == {"modifié": 0, "ajouté": 0, "retiré": 0}
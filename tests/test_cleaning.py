@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_objectives, parse_percent
+
+POURCENTAGE = "Pourcentage d'atteinte de la cible"
+
+
+def test_parse_percent_text_and_numbers():
+    # Textes « 55.00% » / « 55,5 % » et cellules numériques au format pourcentage (fraction) dans une même colonne
+    parsed = parse_percent(pd.Series(["55.00%", "55,5 %", 0.25, "12 %", None], dtype=object))
+    np.testing.assert_allclose(parsed.to_numpy(), [55.0, 55.5, 25.0, 12.0, np.nan])
+
+
+def test_parse_percent_numeric_column():
+    parsed = parse_percent(pd.Series([0.5, 1.0, 0.0]))
+    np.testing.assert_allclose(parsed.to_numpy(), [50.0, 100.0, 0.0])
+
+
+def test_clean_objectives_types_and_rejects():
+    df = pd.DataFrame({
+        POURCENTAGE: ["40.00%", "n/d", None, "75,5 %"],
+        "Cible en %": ["100.00%", "100.00%", "abc", None],
+        "Échéance": ["2034-03-31", "bientôt", None, "2030-12-31"],
+        "Orientation": ["1 - A", "1 - A", "2 - B", "2 - B"],
+    })
+    propre, rejets = clean_objectives(df)
+
+    # Atteinte non convertie ou vide : 0 ; cible non convertie ou vide : NaN
+    np.testing.assert_allclose(propre["atteinte_cible_pct"].to_numpy(), [40.0, 0.0, 0.0, 75.5])
+    assert propre["atteinte_cible_pct"].dtype == np.float32
+    np.testing.assert_allclose(propre["cible_pct"].to_numpy(), [100.0, 100.0, np.nan, np.nan])
+    assert pd.api.types.is_datetime64_any_dtype(propre["Échéance"])
+    assert propre["Échéance"].iloc[0] == pd.Timestamp("2034-03-31")
+    assert pd.isna(propre["Échéance"].iloc[1])
+    assert isinstance(propre["Orientation"].dtype, pd.CategoricalDtype)
+    # Colonnes d'origine conservées, données d'entrée non modifiées
+    assert propre[POURCENTAGE].tolist() == df[POURCENTAGE].tolist()
+    assert df["Échéance"].iloc[0] == "2034-03-31"
+
+    # Seules les cellules non vides non converties sont rapportées, avec leur ligne Excel (données dès la 3e)
+    assert rejets.to_dict("records") == [
+        {"ligne": 4, "colonne": POURCENTAGE, "valeur": "n/d"},
+        {"ligne": 5, "colonne": "Cible en %", "valeur": "abc"},
+        {"ligne": 4, "colonne": "Échéance", "valeur": "bientôt"},
+    ]
+
+
+def test_clean_objectives_without_rejects():
+    _, rejets = clean_objectives(pd.DataFrame({POURCENTAGE: ["10%", None]}))
+    assert rejets.empty
+    assert list(rejets.columns) == ["ligne", "colonne", "valeur"]
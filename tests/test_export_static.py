@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import export_static
+
+# Stand-in logo and Creative Commons icons, so the export never touches the network
+ASSETS = Path(__file__).resolve().parent.parent / "benchmarks" / "assets"
+PAGES = ['index.html', export_static.CHANGES_PAGE] + [f"orientation-{i}.html" for i in range(1, 6)]
+
+
+def export(classeur, tmp_path, force=False):
+    return export_static.main(force=force, datafile=classeur, outdir=tmp_path / "docs", history=tmp_path / "historique",
+                              assets_dir=ASSETS)
+
+
+def test_first_run_writes_every_page(classeur, tmp_path):
+    written = export(classeur, tmp_path)
+    assert sorted(written) == sorted(PAGES)
+    for page in PAGES:
+        assert (tmp_path / "docs" / page).read_text(encoding='utf-8').lstrip().startswith('<!doctype html>')
+    assert (tmp_path / "docs" / export_static.MANIFEST_NAME).exists()
+
+
+def test_second_run_rewrites_nothing(classeur, tmp_path):
+    export(classeur, tmp_path)
+    docs = tmp_path / "docs"
+    before = {p: p.stat().st_mtime_ns for p in docs.rglob('*') if p.is_file()}
+
+    assert export(classeur, tmp_path) == []
+    assert {p: p.stat().st_mtime_ns for p in docs.rglob('*') if p.is_file()} == before
+    # No staging copy left next to the site
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["classeurs", "docs", "historique"]
+
+
+def test_force_rewrites_every_page(classeur, tmp_path):
+    export(classeur, tmp_path)
+    assert sorted(export(classeur, tmp_path, force=True)) == sorted(PAGES)
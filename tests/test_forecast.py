@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast import FORECAST_COLUMNS, JOURS_PAR_AN, forecast_table, with_forecast
+
+
+def objectifs(**colonnes):
+    # Référence 0 en 2020, cible 100 et mesure au 2022-01-01 (731 jours après la référence) par défaut
+    n = max(len(v) for v in colonnes.values())
+    base = {
+        "Valeur(référence)": [0] * n, "Année(référence)": [2020] * n, "Cible - valeur numérique": [100] * n,
+        "Résultat": [50] * n, "Date du résultat": ["2022-01-01"] * n, "Échéance": ["2030-01-01"] * n,
+    }
+    base.update(colonnes)
+    return pd.DataFrame(base)
+
+
+def test_rates_and_projected_date():
+    prevision = forecast_table(objectifs(Résultat=[50]))
+    ecoule = 731 / JOURS_PAR_AN
+    a_venir = (pd.Timestamp("2030-01-01") - pd.Timestamp("2022-01-01")).days / JOURS_PAR_AN
+    assert prevision["rythme_observe_pts_an"].iloc[0] == pytest.approx(50 / ecoule)
+    assert prevision["rythme_requis_pts_an"].iloc[0] == pytest.approx(50 / a_venir)
+    # 50 points restants au rythme observé : autant de jours que pour les 50 premiers
+    assert prevision["achevement_projete"].iloc[0] == pd.Timestamp("2022-01-01") + pd.Timedelta(days=731)
+    assert not prevision["a_risque"].iloc[0]
+
+
+def test_at_risk_when_projection_passes_due_date():
+    prevision = forecast_table(objectifs(Échéance=["2023-12-31", "2024-01-02"]))
+    # Achèvement projeté le 2024-01-02 : un jour trop tard pour la première Échéance, à temps pour la seconde
+    assert prevision["a_risque"].tolist() == [True, False]
+
+
+def test_target_reached_and_no_progress():
+    prevision = forecast_table(objectifs(Résultat=[100, 0]))
+    atteint, immobile = prevision.iloc[0], prevision.iloc[1]
+    assert atteint["rythme_requis_pts_an"] == 0
+    assert atteint["achevement_projete"] == pd.Timestamp("2022-01-01")
+    assert not atteint["a_risque"]
+    # Aucune progression : pas d'achèvement projeté, donc à risque
+    assert immobile["rythme_observe_pts_an"] == 0
+    assert pd.isna(immobile["achevement_projete"])
+    assert immobile["a_risque"]
+
+
+def test_decreasing_target():
+    # Cible à la baisse : de 10 vers 0, un résultat de 5 est à mi-chemin
+    prevision = forecast_table(objectifs(**{"Valeur(référence)": [10], "Cible - valeur numérique": [0], "Résultat": [5]}))
+    assert prevision["rythme_observe_pts_an"].iloc[0] == pytest.approx(50 / (731 / JOURS_PAR_AN))
+
+
+def test_missing_due_date_or_measure():
+    prevision = forecast_table(objectifs(Échéance=[None, "2030-01-01"], **{"Date du résultat": ["2022-01-01", None]}))
+    sans_echeance, sans_mesure = prevision.iloc[0], prevision.iloc[1]
+    # Sans Échéance : pas de rythme requis ni de verdict, mais une date d'achèvement projetée
+    assert np.isnan(sans_echeance["rythme_requis_pts_an"])
+    assert sans_echeance["achevement_projete"] == pd.Timestamp("2024-01-02")
+    assert not sans_echeance["a_risque"]
+    # Sans mesure datée : aucun rythme ni verdict
+    assert np.isnan(sans_mesure["rythme_observe_pts_an"])
+    assert pd.isna(sans_mesure["achevement_projete"])
+    assert not sans_mesure["a_risque"]
+
+
+def test_with_forecast_adds_columns_without_touching_input():
+    df = objectifs(Résultat=[50, 100])
+    out = with_forecast(df)
+    assert list(out.columns[-len(FORECAST_COLUMNS):]) == FORECAST_COLUMNS
+    assert not set(FORECAST_COLUMNS) & set(df.columns)
+    assert out.index.equals(df.index)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from search_index import LIBELLE, SearchIndex, fold
+
+
+def index():
+    return SearchIndex(pd.DataFrame({
+        LIBELLE: [
+            "Réduire les apports de phosphore dans les lacs",
+            "Protéger les milieux humides et hydriques",
+            "Suivre la qualité de l'eau des lacs",
+            "Cœur des écosystèmes aquatiques",
+            None,
+        ],
+        "atteinte_cible_pct": np.array([10, 40, 60, 100, 50], dtype=np.float32),
+        "Échéance": pd.to_datetime(["2026-12-31", "2030-03-31", "2034-03-31", None, "2028-06-30"]),
+    }))
+
+
+def test_fold_removes_accents_case_and_ligatures():
+    assert fold("Échéance Cœur") == "echeance coeur"
+
+
+def test_prefix_matching():
+    recherche = index()
+    # Préfixe de mot, sans accents ni majuscules ; résultats dans l'ordre de la feuille
+    assert recherche.query("lac").tolist() == [0, 2]
+    assert recherche.query("HYDR").tolist() == [1]
+    assert recherche.query("ecosys").tolist() == [3]
+    assert recherche.query("coeur").tolist() == [3]
+    # Chaque mot doit correspondre : intersection
+    assert recherche.query("lacs qualité").tolist() == [2]
+    # Un préfixe au milieu d'un mot ne correspond pas
+    assert recherche.query("phore").tolist() == []
+    assert recherche.query("zzz").tolist() == []
+
+
+def test_no_active_criterion():
+    recherche = index()
+    assert recherche.query() is None
+    assert recherche.query("  , ") is None
+    # Plages qui couvrent toutes les valeurs indexées : pas de filtre
+    assert recherche.query(atteinte=(0, 100), echeance=("2020-01-01", "2040-01-01")) is None
+
+
+def test_range_filters():
+    recherche = index()
+    # Bornes incluses
+    assert recherche.query(atteinte=(40, 60)).tolist() == [1, 2, 4]
+    assert recherche.query(echeance=("2028-06-30", "2034-03-31")).tolist() == [1, 2, 4]
+    # Échéance absente : exclue dès que la plage filtre, gardée si la plage couvre toutes les Échéances connues
+    assert recherche.query(echeance=("2027-01-01", "2034-03-31")).tolist() == [1, 2, 4]
+    assert recherche.query(echeance=("2026-01-01", "2034-03-31")) is None
+    assert recherche.query(atteinte=(40, 60), echeance=("2029-01-01", "2040-01-01")).tolist() == [1, 2]
+
+
+def test_text_and_range():
+    recherche = index()
+    assert recherche.query("lacs", atteinte=(50, 100)).tolist() == [2]
+    assert recherche.query("lacs", echeance=("2020-01-01", "2027-01-01")).tolist() == [0]
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+import staging
+from staging import link_missing, replace_file, stage_directory, swap_directory
+
+
+@pytest.fixture
+def site(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "assets").mkdir(parents=True)
+    (docs / "index.html").write_text("ancien", encoding="utf-8")
+    (docs / "assets" / "logo.png").write_bytes(b"png")
+    return docs
+
+
+def contenu(dossier):
+    return {p.relative_to(dossier).as_posix(): p.read_bytes() for p in dossier.rglob("*") if p.is_file()}
+
+
+def test_stage_directory_is_unique_and_keeps_site(site):
+    prep = stage_directory(site)
+    autre = stage_directory(site, keep_existing=False)
+    assert prep != autre and prep.parent == autre.parent == site.parent
+    assert contenu(prep) == contenu(site)
+    assert contenu(autre) == {}
+    # Lisible par le serveur une fois mis en place (mkdtemp crée un dossier privé)
+    assert os.stat(prep).st_mode & 0o777 == os.stat(site).st_mode & 0o777
+
+
+def test_replace_file_leaves_served_site_untouched(site):
+    prep = stage_directory(site)
+    replace_file(prep / "index.html", "nouveau")
+    assert (site / "index.html").read_text(encoding="utf-8") == "ancien"
+    assert (prep / "index.html").read_text(encoding="utf-8") == "nouveau"
+
+
+def test_link_missing(site, tmp_path):
+    prep = stage_directory(site, keep_existing=False)
+    (prep / "index.html").write_text("export", encoding="utf-8")
+    link_missing(site, prep)
+    assert contenu(prep) == {"index.html": b"export", "assets/logo.png": b"png"}
+
+
+@pytest.mark.parametrize("echange", [True, False], ids=["linux", "sans-echange"])
+def test_swap_directory(site, monkeypatch, echange):
+    if not echange:
+        monkeypatch.setattr(staging, "_exchange", lambda a, b: False)
+    prep = stage_directory(site)
+    replace_file(prep / "index.html", "nouveau")
+    swap_directory(prep, site)
+    assert contenu(site) == {"index.html": b"nouveau", "assets/logo.png": b"png"}
+    # Ni dossier de préparation ni ancien site laissés à côté
+    assert [p.name for p in site.parent.iterdir()] == ["docs"]
+
+
+def test_swap_directory_creates_missing_outdir(tmp_path):
+    docs = tmp_path / "docs"
+    prep = stage_directory(docs)
+    (prep / "index.html").write_text("premier", encoding="utf-8")
+    swap_directory(prep, docs)
+    assert contenu(docs) == {"index.html": b"premier"}
+
+
+def test_swap_directory_rolls_back(site, monkeypatch):
+    # Sans échange atomique, le second renommage échoue : l'ancien site est remis en place
+    monkeypatch.setattr(staging, "_exchange", lambda a, b: False)
+    monkeypatch.setattr(staging, "PAUSE_RENOMMAGE", 0)
+    prep = stage_directory(site)
+    replace_file(prep / "index.html", "nouveau")
+    remplace = os.replace
+
+    def echoue_depuis_prep(src, dst):
+        if src == prep:
+            raise PermissionError("fichier ouvert")
+        remplace(src, dst)
+
+    monkeypatch.setattr(staging.os, "replace", echoue_depuis_prep)
+    with pytest.raises(PermissionError):
+        swap_directory(prep, site)
+    assert contenu(site) == {"index.html": b"ancien", "assets/logo.png": b"png"}
+    assert sorted(p.name for p in site.parent.iterdir()) == sorted(["docs", prep.name])
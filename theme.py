@@ -0,0 +1,80 @@
+from datetime import date
+
+from shiny.express import expressify, ui
+
+# Apparence commune à app.py et à sa variante allégée lean/app.py : thème, feuille de style, en-tête et
+# introduction. Aucun import de pandas ni des modules de données : lean/app.py l'importe dans le navigateur
+# (build.py --lean le copie dans lean/, seul dossier exporté par Shinylive).
+
+LOGO_URL = "https://obvfleuvestjean.com/wp-content/uploads/2026/01/LogoOBV_ContourBlanc.png"
+
+# Configuration du thème personnalisé
+theme_obv = (
+    ui.Theme("shiny")
+    .add_defaults(
+        primary="#0083cb",
+        info="#0aa6b6",
+        success="#c3d700",
+        bg="#ffffff",
+        fg="#000000",
+    )
+)
+
+# Feuille de style compilée de theme_obv, écrite dans lean/ par build.py --lean : l'application allégée la
+# charge telle quelle au lieu de compiler le thème (Sass) à chaque démarrage dans le navigateur
+THEME_CSS = "theme.css"
+
+# CSS personnalisé pour forcer le style des barres de navigation et boutons
+PAGE_CSS = """
+        /* Active pill: blue background with white text for contrast */
+        .nav-pills .nav-link.active, .nav-pills .nav-link.active:focus, .nav-pills .nav-link.active:hover {
+            background-color: #0083cb !important;
+            color: #ffffff !important;
+        }
+        /* Inactive links keep the brand blue */
+        .nav-pills .nav-link { color: #0083cb; }
+        .nav-link { color: #0083cb; }
+        .card-header { background-color: #f8f9fa; border-bottom: 2px solid #0aa6b6; }
+        .app-header { display:flex; align-items:center; gap:12px; margin-bottom: 12px; }
+        .app-header img { height:80px; }
+        .app-header .meta { color:#666; font-size:14px; margin-top:4px; }
+        .section-header { color:#0aa6b6; margin-top:20px; margin-bottom:10px; font-size:24px; font-weight:bold;}
+"""
+
+
+def style_page(css_cartes):
+    # Feuille de style de la page suivie de celle des cartes (rendering.CARD_CSS, ou sa copie dans la charge utile)
+    return ui.tags.style(PAGE_CSS + css_cartes)
+
+
+def entete_page():
+    # En-tête de la page : titre, date de mise à jour et logo
+    return ui.HTML(f'''
+    <div class="app-header">
+      <div>
+         <h1 style="margin:0">OBVFSJ - Suivi des objectifs du PDE 2024-2034</h1>
+         <div class="meta">Dernière mise à jour : {date.today():%Y-%m-%d}</div>
+      </div>
+      <img src="{LOGO_URL}" alt="Logo OBVFSJ">
+    </div>
+''')
+
+
+@expressify
+def introduction(nb_objectifs):
+    # Contenu de l'onglet « Introduction » (à appeler dans son ui.nav_panel)
+    ui.markdown(f"""
+    ## Démarche de suivi du Plan directeur de l'eau (PDE)
+    Bienvenue sur l'outil de suivi des objectifs du PDE de l'**Organisme de bassin versant du fleuve Saint-Jean** (OBVFSJ).
+    Ce tableau de bord présente l'état d'avancement des **{nb_objectifs} objectifs** du PDE 2024-2034 à travers les **5 orientations**.
+    <br><br>
+    """)
+    with ui.value_box(theme="primary", value=None, max_height="250px"):
+        ui.HTML('''
+            <div>
+                <h2 style="margin:0.5em ; color:#ffffff ; text-align:center">Mission de l'OBVFSJ</h2>
+            </div>
+            <div>
+                <p style="padding-left:15% ; padding-right:15% ; color:#ffffff ; text-align:center"><i>«&nbspDans le bassin versant du fleuve Saint-Jean, le maintien d'écosystèmes intègres, source d'une  excellente qualité d'eau, constitue la base d'un héritage bâti sur de saines relations transfrontalières&nbsp»</i></p>
+            </div>
+        ''')